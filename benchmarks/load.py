@@ -0,0 +1,256 @@
+"""Load test of the REST API endpoints, with a baseline to compare against.
+
+    python benchmarks/load.py --output baseline.json
+    python benchmarks/load.py --baseline baseline.json --threshold 20
+
+A server (see serving.py) is started against a temporary SQLite database
+seeded with ``manage.py seed_data``, or ``--url`` points at a running one that
+was seeded with the same --users and --password. Each scenario runs for
+``--duration`` seconds with ``--concurrency`` keep-alive clients, each logged
+in as a different seeded user. The results are printed (or written to
+``--output``) as JSON with throughput and p50/p95/p99 latency. With
+``--baseline``, a scenario whose p95 grows, or whose throughput drops, by more
+than ``--threshold`` percent fails the run (exit status 1). The response
+cache is disabled.
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from serving import run_manage, start_server
+
+SCENARIOS = [
+    "token",
+    "task_list",
+    "task_detail",
+    "task_comments",
+    "complete",
+    "assign",
+]
+
+
+class Client:
+    # One keep-alive connection, logged in as one seeded user.
+    def __init__(self, host, port, username, password):
+        self.host, self.port = host, port
+        self.credentials = json.dumps({"username": username, "password": password})
+        self.connect()
+        status, body = self.request("POST", "/api/auth/token/", self.credentials)
+        if status != 200:
+            raise RuntimeError(f"cannot log in as {username}: {body!r}")
+        token = json.loads(body)["access"]
+        payload = token.split(".")[1]
+        self.user_id = json.loads(base64.urlsafe_b64decode(payload + "=="))["user_id"]
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+        status, body = self.request(
+            "GET", f"/api/tasks/?creator={self.user_id}&page_size=100"
+        )
+        self.task_ids = [task["id"] for task in json.loads(body)["results"]]
+        if not self.task_ids:
+            raise RuntimeError(f"{username} has no tasks; seed more of them")
+
+    def connect(self):
+        self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def request(self, method, path, body=None):
+        headers = getattr(self, "headers", {"Content-Type": "application/json"})
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connect()
+            return None, b""
+
+    def run(self, scenario):
+        # Returns True on success.
+        task_id = random.choice(self.task_ids)
+        if scenario == "token":
+            status, _ = self.request("POST", "/api/auth/token/", self.credentials)
+        elif scenario == "task_list":
+            status, _ = self.request("GET", "/api/tasks/")
+        elif scenario == "task_detail":
+            status, _ = self.request("GET", f"/api/tasks/{task_id}/")
+        elif scenario == "task_comments":
+            status, _ = self.request("GET", f"/api/comments/?task={task_id}")
+        elif scenario == "complete":
+            status, _ = self.request("POST", f"/api/tasks/{task_id}/complete/")
+        else:
+            body = json.dumps({"assignee_id": self.user_id})
+            status, _ = self.request("POST", f"/api/tasks/{task_id}/assign/", body)
+        return status == 200
+
+
+def percentile(latencies, q):
+    # Nearest rank, in milliseconds; ``latencies`` is sorted.
+    return latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+
+
+def load(clients, scenario, duration):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def work(client):
+        nonlocal errors
+        local, failed = [], 0
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            if client.run(scenario):
+                local.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    threads = [threading.Thread(target=work, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    result = {"requests": len(latencies), "errors": errors}
+    if latencies:
+        result.update(
+            throughput=round(len(latencies) / duration, 1),
+            p50_ms=round(percentile(latencies, 0.50), 2),
+            p95_ms=round(percentile(latencies, 0.95), 2),
+            p99_ms=round(percentile(latencies, 0.99), 2),
+        )
+    return result
+
+
+def compare(results, baseline, threshold):
+    # Returns the regressions as lines of text.
+    regressions = []
+    limit = threshold / 100
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if base is None or "p95_ms" not in base:
+            continue
+        if "p95_ms" not in result:
+            regressions.append(f"{scenario}: no successful requests")
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + limit):
+            regressions.append(
+                f"{scenario}: p95 {result['p95_ms']} ms, baseline {base['p95_ms']} ms"
+            )
+        if result["throughput"] < base["throughput"] * (1 - limit):
+            regressions.append(
+                f"{scenario}: {result['throughput']} req/s, "
+                f"baseline {base['throughput']} req/s"
+            )
+        if result["errors"] > base["errors"]:
+            regressions.append(
+                f"{scenario}: {result['errors']} errors, baseline {base['errors']}"
+            )
+    return regressions
+
+
+def run(args, host, port):
+    clients = [
+        Client(host, port, f"{args.prefix}{n % args.users + 1}", args.password)
+        for n in range(args.concurrency)
+    ]
+    for scenario in ["task_list", "task_detail"]:
+        load(clients, scenario, 1.0)  # warm-up
+    results = {}
+    for scenario in args.scenarios:
+        results[scenario] = load(clients, scenario, args.duration)
+        print(scenario, json.dumps(results[scenario]), file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="A running, seeded server.")
+    parser.add_argument("--mode", choices=["dev", "wsgi", "asgi"], default="wsgi")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--comments", type=int, default=50000)
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here.")
+    parser.add_argument("--baseline", help="A JSON report to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=20.0,
+        help="Allowed regression against the baseline, in percent.",
+    )
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    config = {
+        key: getattr(args, key)
+        for key in ["mode", "concurrency", "duration", "users", "tasks", "comments"]
+    }
+    if args.url:
+        url = urlsplit(args.url)
+        config["url"] = args.url
+        results = run(args, url.hostname, url.port or 80)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "SQLITE_PATH": os.path.join(directory, "load.sqlite3"),
+                "DJANGO_SETTINGS_MODULE": "config.settings",
+                "TASKS_CACHE_BACKEND": "django.core.cache.backends.dummy.DummyCache",
+            }
+            run_manage(env, "migrate", "--noinput")
+            run_manage(
+                env,
+                "seed_data",
+                f"--users={args.users}",
+                f"--tasks={args.tasks}",
+                f"--comments={args.comments}",
+                f"--prefix={args.prefix}",
+                f"--password={args.password}",
+                f"--seed={args.seed}",
+            )
+            process = start_server(args.mode, env, args.port, args.workers)
+            try:
+                results = run(args, "127.0.0.1", args.port)
+            finally:
+                process.terminate()
+                process.wait()
+
+    report = json.dumps({"config": config, "scenarios": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["scenarios"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"Regression: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
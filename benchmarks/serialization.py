@@ -0,0 +1,109 @@
+"""Serialization throughput of the task and comment lists (TASKS_FAST_LISTS).
+
+    python benchmarks/serialization.py --rows 500 --repeat 20
+
+Runs in one process against a temporary, migrated and seeded SQLite database.
+Each round reads a page of ``--rows`` rows, serializes it and renders JSON,
+as GET /api/tasks/ and /api/comments/ do: once with the ModelSerializers and
+JSONRenderer, once with the compiled .values() rows and FastJSONRenderer.
+The two outputs are checked to be identical.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def measure(function, repeat):
+    # Best of ``repeat`` runs, in seconds.
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(args, directory):
+    os.environ.update(
+        DJANGO_SETTINGS_MODULE="config.settings",
+        SQLITE_PATH=os.path.join(directory, "bench.sqlite3"),
+    )
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from rest_framework.renderers import JSONRenderer
+
+    from tasks.fastpath import compile_serializer
+    from tasks.models import Comment, Task
+    from tasks.query_plan import optimize_queryset
+    from tasks.renderers import FastJSONRenderer, orjson
+    from tasks.serializers import CommentSerializer, TaskListSerializer
+
+    call_command("migrate", verbosity=0)
+    User = get_user_model()
+    users = [
+        User.objects.create_user(username=f"bench{i}", email=f"bench{i}@example.com")
+        for i in range(20)
+    ]
+    tasks = Task.objects.bulk_create(
+        Task(
+            title=f"Task {i}",
+            creator=users[i % 20],
+            assignee=users[(i + 1) % 20] if i % 3 else None,
+        )
+        for i in range(args.rows)
+    )
+    Comment.objects.bulk_create(
+        Comment(task=tasks[i % len(tasks)], author=users[i % 20], text=f"Comment {i}")
+        for i in range(args.rows)
+    )
+
+    print(
+        f"{args.rows} rows per page, best of {args.repeat}, "
+        f"orjson {'installed' if orjson else 'not installed'}\n"
+        f"{'endpoint':<10} {'path':<8} {'rows/s':>9} {'ms/page':>8}"
+    )
+    for name, model, serializer_class in [
+        ("tasks", Task, TaskListSerializer),
+        ("comments", Comment, CommentSerializer),
+    ]:
+        queryset = model.objects.order_by("-created_at", "-id")[: args.rows]
+        row_serializer = compile_serializer(serializer_class)
+
+        def regular():
+            page = list(optimize_queryset(queryset, serializer_class))
+            return JSONRenderer().render(serializer_class(page, many=True).data)
+
+        def fast():
+            page = list(queryset.values(*row_serializer.lookups))
+            return FastJSONRenderer().render(row_serializer.serialize(page))
+
+        assert regular() == fast(), "outputs differ"
+        for path, function in [("regular", regular), ("fast", fast)]:
+            seconds = measure(function, args.repeat)
+            print(
+                f"{name:<10} {path:<8} {args.rows / seconds:>9.0f} "
+                f"{seconds * 1000:>8.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        run(args, directory)
+
+
+if __name__ == "__main__":
+    main()
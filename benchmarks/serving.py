@@ -0,0 +1,188 @@
+"""Compare read throughput of the serving modes (see entrypoint.sh).
+
+    python benchmarks/serving.py --modes dev wsgi asgi --concurrency 8 64
+
+The response cache is disabled. Each mode is started against a freshly migrated and seeded SQLite database in
+a temporary directory, then hammered with GET /api/tasks/, /api/tasks/{id}/
+and /api/comments/?task={id} from keep-alive client threads.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SEED = """
+from django.contrib.auth import get_user_model
+from tasks.models import Comment, Task
+
+User = get_user_model()
+user = User.objects.create_user(username="bench", password="bench-pass")
+tasks = Task.objects.bulk_create(
+    Task(title=f"Task {i}", description="Benchmark task", creator=user)
+    for i in range({tasks})
+)
+Comment.objects.bulk_create(
+    Comment(task=task, author=user, text=f"Comment {j}")
+    for task in tasks
+    for j in range({comments})
+)
+Task.objects.update(comments_count={comments})
+"""
+
+
+def run_manage(env, *args):
+    subprocess.run(
+        [sys.executable, "manage.py", *args],
+        cwd=BASE_DIR,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def start_server(mode, env, port, workers):
+    env = {
+        **env,
+        "SERVER_MODE": mode,
+        "WEB_CONCURRENCY": str(workers),
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_ACCESS_LOG": "",
+    }
+    if mode == "dev":
+        command = ["manage.py", "runserver", "--noreload", f"127.0.0.1:{port}"]
+    else:
+        command = ["-m", "gunicorn", "-c", "config/gunicorn.conf.py"]
+    process = subprocess.Popen(
+        [sys.executable, *command],
+        cwd=BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def get_token(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    body = json.dumps({"username": "bench", "password": "bench-pass"})
+    connection.request(
+        "POST",
+        "/api/auth/token/",
+        body,
+        {"Content-Type": "application/json"},
+    )
+    return json.loads(connection.getresponse().read())["access"]
+
+
+def load(port, token, paths, concurrency, duration):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        nonlocal errors
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        headers = {"Authorization": f"Bearer {token}"}
+        local, failed = [], 0
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                connection.request("GET", random.choice(paths), headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=["dev", "wsgi", "asgi"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[8, 64])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--comments", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "SQLITE_PATH": os.path.join(directory, "bench.sqlite3"),
+            "DJANGO_SETTINGS_MODULE": "config.settings",
+            # Measure serving, not the response cache (which dev mode would
+            # keep in process and the production modes disable by default).
+            "TASKS_CACHE_BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        }
+        run_manage(env, "migrate", "--noinput")
+        seed = SEED.replace("{tasks}", str(args.tasks))
+        run_manage(env, "shell", "-c", seed.replace("{comments}", str(args.comments)))
+        paths = ["/api/tasks/?page_size=20"]
+        for task_id in random.sample(range(1, args.tasks + 1), 50):
+            paths.append(f"/api/tasks/{task_id}/")
+            paths.append(f"/api/comments/?task={task_id}")
+
+        print(
+            f"{'mode':<6} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} errors"
+        )
+        for mode in args.modes:
+            process = start_server(mode, env, args.port, args.workers)
+            try:
+                token = get_token(args.port)
+                load(args.port, token, paths, 4, 1.0)  # warm-up
+                for concurrency in args.concurrency:
+                    latencies, errors = load(
+                        args.port, token, paths, concurrency, args.duration
+                    )
+                    latencies.sort()
+                    p50 = statistics.median(latencies) * 1000
+                    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+                    rate = len(latencies) / args.duration
+                    print(
+                        f"{mode:<6} {concurrency:>7} {rate:>9.0f} "
+                        f"{p50:>8.1f} {p99:>8.1f} {errors}"
+                    )
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
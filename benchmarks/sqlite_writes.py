@@ -0,0 +1,177 @@
+"""Concurrent write benchmark for the SQLite profiles (SQLITE_PROFILE).
+
+    python benchmarks/sqlite_writes.py --profiles default tuned
+
+For each profile a temporary database is migrated and seeded, then several
+processes with several threads each (like gunicorn workers with threads)
+run the write paths of the API against it: ``complete`` and ``assign``
+(Model.save with update_fields) and a bulk-style transaction that reads a
+few tasks and updates them. Failed operations ("database is locked") are
+counted, not retried.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SEED = """
+from django.contrib.auth import get_user_model
+from tasks.models import Task
+
+User = get_user_model()
+users = [User.objects.create_user(username=f"bench{i}") for i in range(10)]
+Task.objects.bulk_create(
+    Task(title=f"Task {i}", creator=users[i % 10]) for i in range({tasks})
+)
+"""
+
+
+def worker(threads, duration, tasks):
+    # Runs inside a child process with DJANGO_SETTINGS_MODULE set.
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, connection, transaction
+
+    from tasks.models import Task
+    from tasks.signals import tasks_bulk_updated
+
+    user_ids = list(get_user_model().objects.values_list("pk", flat=True))
+    connection.close()
+    stop_at = time.monotonic() + duration
+    results = {"latencies": [], "errors": 0}
+    lock = threading.Lock()
+
+    def complete():
+        task = Task.objects.get(pk=random.randint(1, tasks))
+        task.is_completed = not task.is_completed
+        task.save(update_fields=["is_completed", "updated_at"])
+
+    def assign():
+        task = Task.objects.get(pk=random.randint(1, tasks))
+        task.assignee_id = random.choice(user_ids)
+        task.save(update_fields=["assignee", "updated_at"])
+
+    def bulk_complete():
+        ids = random.sample(range(1, tasks + 1), 10)
+        with transaction.atomic():
+            selected = list(Task.objects.filter(pk__in=ids))
+            Task.objects.filter(pk__in=ids).update(is_completed=True)
+            tasks_bulk_updated.send(
+                sender=Task, tasks=selected, fields=["is_completed", "updated_at"]
+            )
+
+    operations = [complete, complete, assign, bulk_complete]
+
+    def run():
+        latencies, errors = [], 0
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                random.choice(operations)()
+            except OperationalError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            results["latencies"].extend(latencies)
+            results["errors"] += errors
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    json.dump(results, sys.stdout)
+
+
+def run_profile(profile, args, directory):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "config.settings",
+        "SQLITE_PROFILE": profile,
+        "SQLITE_PATH": os.path.join(directory, f"{profile}.sqlite3"),
+        "TASKS_CACHE_BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    }
+
+    def manage(*command):
+        subprocess.run(
+            [sys.executable, "manage.py", *command],
+            cwd=BASE_DIR,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    manage("migrate", "--noinput")
+    manage("shell", "-c", SEED.replace("{tasks}", str(args.tasks)))
+
+    command = [
+        sys.executable,
+        __file__,
+        "--worker",
+        "--threads",
+        str(args.threads),
+        "--duration",
+        str(args.duration),
+        "--tasks",
+        str(args.tasks),
+    ]
+    processes = [
+        subprocess.Popen(command, env=env, stdout=subprocess.PIPE)
+        for _ in range(args.processes)
+    ]
+    latencies, errors = [], 0
+    for process in processes:
+        output, _ = process.communicate()
+        result = json.loads(output)
+        latencies.extend(result["latencies"])
+        errors += result["errors"]
+
+    latencies.sort()
+    total = len(latencies) + errors
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    print(
+        f"{profile:<8} {len(latencies) / args.duration:>9.0f} {p50:>8.1f} "
+        f"{p99:>8.1f} {errors:>7} ({100 * errors / max(total, 1):.1f}%)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=["default", "tuned"])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.threads, args.duration, args.tasks)
+        return
+
+    print(
+        f"{args.processes} processes x {args.threads} threads, {args.duration:g}s\n"
+        f"{'profile':<8} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in args.profiles:
+            run_profile(profile, args, directory)
+
+
+if __name__ == "__main__":
+    main()
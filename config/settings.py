@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "tasks.instrumentation.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -52,6 +54,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "tasks.db_router.ReplicaMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -77,12 +80,151 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Serving mode, set by entrypoint.sh: "dev" (runserver), "wsgi" (gunicorn with
+# threads) or "asgi" (gunicorn with uvicorn workers). Under ASGI the hot read
+# endpoints are served by the async views in tasks/async_views.py.
+SERVER_MODE = os.environ.get("SERVER_MODE", "dev")
+TASKS_ASYNC_READS = SERVER_MODE == "asgi"
+
+# DB_ENGINE selects the backend: "sqlite" (default) or "postgresql".
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgresql":
+
+    def postgres_database(host):
+        return {
+            "ENGINE": "django.db.backends.postgresql",
+            "HOST": host,
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            "NAME": os.environ.get("POSTGRES_DB", "task_manager"),
+            "USER": os.environ.get("POSTGRES_USER", "task_manager"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            # psycopg's connection pool, one per process; it replaces
+            # persistent connections (CONN_MAX_AGE must stay 0).
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 2)),
+                    "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 10)),
+                    "timeout": int(os.environ.get("POSTGRES_POOL_TIMEOUT", 10)),
+                },
+            },
+        }
+
+    DATABASES = {
+        "default": postgres_database(os.environ.get("POSTGRES_HOST", "localhost")),
+    }
+    # Optional streaming replica for the task and comment read endpoints,
+    # see tasks/db_router.py.
+    if os.environ.get("POSTGRES_REPLICA_HOST"):
+        DATABASES["replica"] = {
+            **postgres_database(os.environ["POSTGRES_REPLICA_HOST"]),
+            "TEST": {"MIRROR": "default"},
+        }
+        TASKS_READ_REPLICA = "replica"
+        # How long a client keeps reading from the primary after a write.
+        TASKS_REPLICA_STICKY_SECONDS = int(
+            os.environ.get("TASKS_REPLICA_STICKY_SECONDS", 5)
+        )
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+        }
+    }
+
+# SQLITE_PROFILE=tuned (the default) makes SQLite usable with several
+# concurrent writers: WAL lets readers run alongside the single writer,
+# transactions take the write lock up front (BEGIN IMMEDIATE) so they wait for
+# it instead of failing with "database is locked" on upgrade, and the busy
+# timeout bounds that wait. SQLITE_PROFILE=default keeps Django's defaults.
+SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "tuned")
+if DB_ENGINE == "sqlite" and SQLITE_PROFILE == "tuned":
+    DATABASES["default"]["OPTIONS"] = {
+        "timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 20)),
+        "transaction_mode": "IMMEDIATE",
+        "init_command": (
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 2**20))};"
+            # Negative cache_size is in KiB: 64 MiB of page cache per connection.
+            "PRAGMA cache_size=-65536;"
+            "PRAGMA temp_store=MEMORY;"
+        ),
+    }
+    # Keep connections (and their warm page cache) between requests. Under
+    # ASGI connections are per request, as Django recommends.
+    DATABASES["default"]["CONN_MAX_AGE"] = (
+        0 if TASKS_ASYNC_READS else int(os.environ.get("CONN_MAX_AGE", 600))
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+DATABASE_ROUTERS = ["tasks.db_router.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Task responses are cached in the "tasks" alias. The default is an in-process
+# LRU bounded by TASKS_CACHE_MAX_ENTRIES; point TASKS_CACHE_BACKEND at
+# django.core.cache.backends.filebased.FileBasedCache or
+# django.core.cache.backends.redis.RedisCache (with TASKS_CACHE_LOCATION) to
+# share it between workers. An in-process cache cannot see invalidations made by
+# other worker processes, so the production modes disable caching unless a
+# shared backend is configured.
+TASKS_CACHE_BACKEND = os.environ.get(
+    "TASKS_CACHE_BACKEND",
+    "django.core.cache.backends.locmem.LocMemCache"
+    if SERVER_MODE == "dev"
+    else "django.core.cache.backends.dummy.DummyCache",
+)
+TASKS_CACHE_TIMEOUT = int(os.environ.get("TASKS_CACHE_TIMEOUT", 300))
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "tasks": {
+        "BACKEND": TASKS_CACHE_BACKEND,
+        "LOCATION": os.environ.get("TASKS_CACHE_LOCATION", "tasks"),
+        "TIMEOUT": TASKS_CACHE_TIMEOUT,
+    },
+}
+if not TASKS_CACHE_BACKEND.endswith("RedisCache"):
+    CACHES["tasks"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.environ.get("TASKS_CACHE_MAX_ENTRIES", 10000)),
     }
+
+# Users resolved from JWTs (tasks.authentication). Each worker keeps its own
+# bounded LRU by default: a change to a user is seen by the other workers
+# within TASKS_AUTH_CACHE_TIMEOUT seconds, or at once with a shared backend.
+TASKS_AUTH_CACHE_BACKEND = os.environ.get(
+    "TASKS_AUTH_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+CACHES["auth"] = {
+    "BACKEND": TASKS_AUTH_CACHE_BACKEND,
+    "LOCATION": os.environ.get("TASKS_AUTH_CACHE_LOCATION", "auth"),
+    "TIMEOUT": int(os.environ.get("TASKS_AUTH_CACHE_TIMEOUT", 60)),
 }
+if not TASKS_AUTH_CACHE_BACKEND.endswith("RedisCache"):
+    CACHES["auth"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.environ.get("TASKS_AUTH_CACHE_MAX_ENTRIES", 10000)),
+    }
+
+# Requests that run more queries than this are logged as warnings (0 turns
+# the check off). GET /metrics serves Prometheus metrics; with
+# TASKS_METRICS_TOKEN set, it requires "Authorization: Bearer <token>".
+TASKS_QUERY_BUDGET = int(os.environ.get("TASKS_QUERY_BUDGET", 20))
+TASKS_METRICS_TOKEN = os.environ.get("TASKS_METRICS_TOKEN", "")
+
+# Webhooks: task and comment events (tasks.outbox) are written to an outbox
+# table in the transaction of the change and POSTed to each of these
+# comma-separated URLs by "manage.py run_worker".
+TASKS_WEBHOOK_URLS = [
+    url for url in os.environ.get("TASKS_WEBHOOK_URLS", "").split(",") if url
+]
+TASKS_OUTBOX_TIMEOUT = float(os.environ.get("TASKS_OUTBOX_TIMEOUT", 5))
+TASKS_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("TASKS_OUTBOX_MAX_ATTEMPTS", 10))
 
 
 # Password validation
@@ -128,7 +270,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "tasks.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -136,6 +278,16 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Opt-in fast path for the task and comment lists (tasks.fastpath): rows are
+# serialized from .values() and rendered with orjson when it is installed.
+# The output is the same as with the regular serializers.
+TASKS_FAST_LISTS = os.environ.get("TASKS_FAST_LISTS", "0") == "1"
+if TASKS_FAST_LISTS:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
+        "tasks.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    )
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
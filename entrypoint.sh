@@ -3,4 +3,21 @@
 set -e
 
 python manage.py migrate --noinput
-python manage.py runserver 0.0.0.0:8000
+
+# SERVER_MODE: dev (runserver), wsgi or asgi (gunicorn, see config/gunicorn.conf.py),
+# or worker (webhook delivery, see tasks/outbox.py)
+case "${SERVER_MODE:-dev}" in
+    dev)
+        exec python manage.py runserver 0.0.0.0:8000
+        ;;
+    wsgi|asgi)
+        exec gunicorn -c config/gunicorn.conf.py
+        ;;
+    worker)
+        exec python manage.py run_worker
+        ;;
+    *)
+        echo "Unknown SERVER_MODE: ${SERVER_MODE}" >&2
+        exit 1
+        ;;
+esac
@@ -1,14 +1,38 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
 
-from tasks.models import Comment, Task
+from tasks import deletion
+from tasks.models import Comment, OutboxEvent, Task
+
+User = get_user_model()
+
+
+class DeferredDeletionAdmin(admin.ModelAdmin):
+    # Deletion hides the objects at once and leaves their dependents to the
+    # reap_deleted command, so the confirmation page does not collect them.
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        return (
+            [str(obj) for obj in objs],
+            {self.model._meta.verbose_name_plural: len(objs)},
+            set(),
+            [],
+        )
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(DeferredDeletionAdmin):
     list_display = ["title", "creator", "assignee", "is_completed", "created_at"]
     list_filter = ["is_completed", "created_at"]
     search_fields = ["title", "description"]
-    readonly_fields = ["created_at", "updated_at"]
+    readonly_fields = ["created_at", "updated_at", "deleted_at"]
+
+    def delete_model(self, request, obj):
+        deletion.soft_delete_tasks(Task.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        deletion.soft_delete_tasks(queryset)
 
 
 @admin.register(Comment)
@@ -17,3 +41,23 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ["created_at"]
     search_fields = ["text"]
     readonly_fields = ["created_at"]
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ["topic", "target", "attempts", "available_at", "failed_at"]
+    list_filter = ["topic", "failed_at"]
+    readonly_fields = ["created_at"]
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class DeferredUserAdmin(DeferredDeletionAdmin, UserAdmin):
+    def delete_model(self, request, obj):
+        deletion.delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            deletion.delete_user(user)
@@ -0,0 +1,278 @@
+import asyncio
+import time
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404, StreamingHttpResponse
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from tasks import cache, changes, export
+from tasks.authentication import (
+    CachedJWTAuthentication,
+    afetch_user,
+    check_user,
+    get_user_id,
+)
+from tasks.cache import CachedResponseMixin
+from tasks.conditional import ConditionalGetMixin, timestamp
+from tasks.fastpath import FastListMixin
+from tasks.fieldsets import SparseFieldsetMixin
+from tasks.renderers import EventStreamRenderer, format_event
+
+# Async implementations of the hot read endpoints, routed in when the app is
+# served over ASGI (TASKS_ASYNC_READS). They reuse the viewsets for all the
+# work that does not block -- querysets, filters, permissions, ETags,
+# serializers, rendering -- and go through the async ORM and the async cache
+# API for the rest, so one worker keeps serving while a request waits.
+
+
+async def authenticate_jwt(authenticator, request):
+    # JWTAuthentication.authenticate() with the user fetched asynchronously.
+    header = authenticator.get_header(request)
+    if header is None:
+        return None
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return None
+    validated_token = authenticator.get_validated_token(raw_token)
+    if isinstance(authenticator, CachedJWTAuthentication):
+        user = await authenticator.aget_user(validated_token)
+    else:
+        user = await afetch_user(authenticator.user_model, get_user_id(validated_token))
+        check_user(user, validated_token)
+    return user, validated_token
+
+
+async def authenticate(request):
+    # DRF would authenticate lazily, and synchronously, on the first access
+    # to request.user; this resolves it up front in the same order.
+    try:
+        for authenticator in request.authenticators:
+            if isinstance(authenticator, JWTAuthentication):
+                result = await authenticate_jwt(authenticator, request)
+            else:
+                result = await sync_to_async(authenticator.authenticate)(request)
+            if result is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = result
+                return
+    except APIException:
+        request._not_authenticated()
+        raise
+    request._not_authenticated()
+
+
+class AsyncReadView:
+    # Runs one read action of ``viewset_class``: ``list``, ``retrieve``,
+    # ``changes`` or ``export``.
+    def __init__(self, viewset_class, action):
+        self.viewset_class = viewset_class
+        self.action = action
+        # Extra actions carry their @action() overrides (renderers, ...).
+        self.initkwargs = getattr(getattr(viewset_class, action), "kwargs", {})
+
+    async def __call__(self, request, *args, **kwargs):
+        # The steps of APIView.dispatch() and APIView.initial().
+        viewset = self.viewset_class(
+            action_map={"get": self.action},
+            detail=self.action == "retrieve",
+            **self.initkwargs,
+        )
+        viewset.args = args
+        viewset.kwargs = kwargs
+        viewset.request = request = viewset.initialize_request(request, *args, **kwargs)
+        viewset.headers = viewset.default_response_headers
+        try:
+            viewset.format_kwarg = viewset.get_format_suffix(**kwargs)
+            neg = viewset.perform_content_negotiation(request)
+            request.accepted_renderer, request.accepted_media_type = neg
+            version, scheme = viewset.determine_version(request, *args, **kwargs)
+            request.version, request.versioning_scheme = version, scheme
+            await authenticate(request)
+            viewset.check_permissions(request)
+            viewset.check_throttles(request)
+            handler = getattr(self, self.action)
+            response = await handler(viewset, request)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+        viewset.response = viewset.finalize_response(request, response)
+        return viewset.response
+
+    async def list(self, viewset, request):
+        cached = isinstance(viewset, CachedResponseMixin)
+        if cached:
+            key = await cache.alist_key(viewset.get_representation_key())
+            entry = await cache.aget_entry(key, "list")
+            if entry is not None:
+                return viewset.get_cached_response(
+                    request, entry, honour_last_modified=False
+                )
+
+        conditional = isinstance(viewset, ConditionalGetMixin)
+        if conditional and "HTTP_IF_NONE_MATCH" in request.META:
+            page = await viewset.paginator.apaginate_queryset(
+                viewset.get_version_page_queryset(), request, view=viewset
+            )
+            validators = viewset.get_page_validators(page)
+            not_modified = viewset.get_not_modified(request, validators[0])
+            if not_modified is not None:
+                return viewset.set_validators(not_modified, *validators)
+
+        row_serializer = None
+        if isinstance(viewset, FastListMixin):
+            row_serializer = viewset.get_row_serializer()
+        if row_serializer is not None:
+            queryset = viewset.get_rows_queryset(row_serializer)
+        else:
+            queryset = viewset.filter_queryset(viewset.get_queryset())
+        page = await viewset.paginator.apaginate_queryset(
+            queryset, request, view=viewset
+        )
+        if row_serializer is not None:
+            data = row_serializer.serialize(page)
+        else:
+            data = viewset.get_serializer(page, many=True).data
+        validators = viewset.get_page_validators(page) if conditional else None
+        extra = {}
+        if isinstance(viewset, SparseFieldsetMixin):
+            users = viewset.get_included_users_queryset(data)
+            if users is not None:
+                extra["included_users"] = [user async for user in users]
+        response = viewset.get_paginated_response(data, **extra)
+        if validators is not None:
+            viewset.set_validators(response, *validators)
+        if cached:
+            await self.store(viewset, key, response)
+        return response
+
+    async def retrieve(self, viewset, request):
+        cached = isinstance(viewset, CachedResponseMixin)
+        if cached:
+            pk = viewset.kwargs[viewset.lookup_url_kwarg or viewset.lookup_field]
+            key = await cache.adetail_key(pk, viewset.get_representation_key())
+            entry = await cache.aget_entry(key, "detail")
+            if entry is not None:
+                return viewset.get_cached_response(
+                    request, entry, honour_last_modified=True
+                )
+
+        conditional = isinstance(viewset, ConditionalGetMixin)
+        if conditional and viewset.is_conditional(request):
+            queryset = viewset.get_object_version_queryset()
+            row = await queryset.afirst() if queryset is not None else None
+            if row is not None:
+                pk, version = row
+                etag = viewset.get_object_etag(pk, version)
+                not_modified = viewset.get_not_modified(
+                    request, etag, timestamp(version)
+                )
+                if not_modified is not None:
+                    return not_modified
+
+        instance = await self.get_object(viewset)
+        serializer = viewset.get_serializer(instance)
+        response = Response(serializer.data)
+        if conditional:
+            version = getattr(instance, viewset.version_field)
+            viewset.set_validators(
+                response,
+                viewset.get_object_etag(instance.pk, version),
+                timestamp(version),
+            )
+        if cached:
+            await self.store(viewset, key, response)
+        return response
+
+    async def changes(self, viewset, request):
+        after_id, limit, timeout = changes.get_feed_query(request)
+        if isinstance(request.accepted_renderer, EventStreamRenderer):
+            return StreamingHttpResponse(
+                self.stream_changes(after_id, limit),
+                content_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+        if after_id is None:
+            return Response({"cursor": await changes.acurrent_cursor(), "results": []})
+        deadline = time.monotonic() + timeout
+        while True:
+            page = [change async for change in changes.get_changes(after_id, limit)]
+            if page or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(changes.get_setting("POLL_INTERVAL", 1.0))
+        return Response(changes.get_feed(page, after_id))
+
+    async def stream_changes(self, after_id, limit):
+        # Polls the log and pushes new entries until TASKS_CHANGES_STREAM_SECONDS
+        # pass; the client then reconnects from its Last-Event-ID.
+        renderer = EventStreamRenderer()
+        poll_interval = changes.get_setting("POLL_INTERVAL", 1.0)
+        heartbeat = changes.get_setting("HEARTBEAT_SECONDS", 15)
+        ends_at = time.monotonic() + changes.get_setting("STREAM_SECONDS", 300)
+        yield f"retry: {renderer.retry}\n\n"
+        if after_id is None:
+            cursor = await changes.acurrent_cursor()
+            after_id = int(cursor.split(".")[0])
+            yield format_event(event_id=cursor)
+        last_sent = time.monotonic()
+        while time.monotonic() < ends_at:
+            page = [change async for change in changes.get_changes(after_id, limit)]
+            if page:
+                yield renderer.render_feed(changes.get_feed(page, after_id))
+                after_id = page[-1].id
+                last_sent = time.monotonic()
+                if len(page) == limit:
+                    continue
+            elif time.monotonic() - last_sent >= heartbeat:
+                # Keeps proxies from closing an idle connection.
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(poll_interval)
+
+    async def export(self, viewset, request):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        return export.streaming_response(
+            request.accepted_renderer,
+            viewset.export_columns,
+            queryset,
+            viewset.export_filename,
+            asynchronous=True,
+        )
+
+    async def get_object(self, viewset):
+        # GenericAPIView.get_object() with the query awaited.
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        lookup = {viewset.lookup_field: viewset.kwargs[lookup_url_kwarg]}
+        try:
+            instance = await queryset.filter(**lookup).afirst()
+        except (TypeError, ValueError, ValidationError):
+            instance = None
+        if instance is None:
+            raise Http404
+        viewset.check_object_permissions(viewset.request, instance)
+        return instance
+
+    async def store(self, viewset, key, response):
+        entry = viewset.get_response_entry(response)
+        if entry is not None:
+            await cache.aset_entry(key, entry)
+
+
+def async_reads(viewset_class, actions, read_action):
+    # A view for one router route: GET goes to the async implementation of
+    # ``read_action``, every other method to the regular viewset.
+    read_view = AsyncReadView(viewset_class, read_action)
+    sync_view = sync_to_async(viewset_class.as_view(actions))
+
+    async def view(request, *args, **kwargs):
+        if request.method == "GET":
+            return await read_view(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+
+    markcoroutinefunction(view)
+    view.cls = viewset_class
+    view.actions = actions
+    view.csrf_exempt = True
+    return view
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from tasks import metrics
+
+# Users resolved from access tokens are kept in the "auth" cache alias, one
+# entry per user shared by all of the user's tokens. Saving or deleting the
+# user drops the entry; the token checks (active flag, password change) run
+# on every request against the cached user. An in-process cache only sees
+# the invalidations of its own worker, which TASKS_AUTH_CACHE_TIMEOUT bounds.
+
+
+def get_auth_cache():
+    return caches[getattr(settings, "TASKS_AUTH_CACHE_ALIAS", "auth")]
+
+
+def user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user(user_id):
+    # Dropped right away and again after commit, like tasks.cache.bump().
+    key = user_key(user_id)
+    get_auth_cache().delete(key)
+    transaction.on_commit(lambda: get_auth_cache().delete(key))
+
+
+def get_user_id(validated_token):
+    try:
+        return validated_token[jwt_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken(_("Token contained no recognizable user identification"))
+
+
+def check_user(user, validated_token):
+    # The checks JWTAuthentication.get_user() makes after loading the user.
+    if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+        jwt_settings.REVOKE_TOKEN_CLAIM
+    ) != get_md5_hash_password(user.password):
+        raise AuthenticationFailed(
+            _("The user's password has been changed."), code="password_changed"
+        )
+
+
+def count_lookup(user):
+    metrics.increment(
+        "tasks_auth_cache_requests", result="miss" if user is None else "hit"
+    )
+    return user
+
+
+def get_stats():
+    stats = {"hits": 0, "misses": 0}
+    for (name, labels), value in metrics.get_counters().items():
+        if name == "tasks_auth_cache_requests":
+            stats["hits" if dict(labels)["result"] == "hit" else "misses"] += value
+    return stats
+
+
+async def afetch_user(user_model, user_id):
+    user = await user_model.objects.filter(
+        **{jwt_settings.USER_ID_FIELD: user_id}
+    ).afirst()
+    if user is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        key = user_key(get_user_id(validated_token))
+        user = count_lookup(get_auth_cache().get(key))
+        if user is None:
+            user = super().get_user(validated_token)
+            get_auth_cache().set(key, user)
+        else:
+            check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        # get_user() for tasks.async_views.
+        user_id = get_user_id(validated_token)
+        key = user_key(user_id)
+        user = count_lookup(await get_auth_cache().aget(key))
+        if user is None:
+            user = await afetch_user(self.user_model, user_id)
+            await get_auth_cache().aset(key, user)
+        check_user(user, validated_token)
+        return user
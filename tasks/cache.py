@@ -0,0 +1,185 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_http_date
+from rest_framework.response import Response
+
+from tasks import metrics
+from tasks.db_router import reading_from_replica
+
+# Serialized task responses are cached under keys that embed version
+# counters. Writers never delete entries: they bump the counters, which makes
+# every older entry unreachable, and the backend's eviction reclaims them.
+EPOCH_KEY = "tasks:epoch"
+LIST_VERSION_KEY = "tasks:list:version"
+
+
+def get_cache():
+    return caches[getattr(settings, "TASKS_CACHE_ALIAS", "tasks")]
+
+
+def task_version_key(task_id):
+    return f"tasks:detail:{task_id}:version"
+
+
+def new_version():
+    # Counters start from the clock, so a counter that was evicted (or lost
+    # with a restart of a shared cache) never comes back at an old value.
+    return time.time_ns()
+
+
+def get_versions(*keys):
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, missing.get(key)) for key in keys]
+
+
+async def aget_versions(*keys):
+    cache = get_cache()
+    versions = await cache.aget_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        for key, version in missing.items():
+            await cache.aadd(key, version, timeout=None)
+        versions.update(await cache.aget_many(missing))
+    return [versions.get(key, missing.get(key)) for key in keys]
+
+
+def _bump(keys):
+    cache = get_cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_version(), timeout=None)
+
+
+def bump(*keys):
+    # Bumped right away and again after commit: a reader that fills the cache
+    # between the write and the commit stores pre-commit data under a version
+    # that the second bump retires.
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_tasks(task_ids):
+    bump(LIST_VERSION_KEY, *(task_version_key(pk) for pk in task_ids))
+
+
+def invalidate_all():
+    bump(EPOCH_KEY)
+
+
+def detail_key(task_id, variant):
+    epoch, version = get_versions(EPOCH_KEY, task_version_key(task_id))
+    return f"tasks:detail:{task_id}:{epoch}:{version}:{variant}"
+
+
+def list_key(variant):
+    epoch, version = get_versions(EPOCH_KEY, LIST_VERSION_KEY)
+    return f"tasks:list:{epoch}:{version}:{variant}"
+
+
+async def adetail_key(task_id, variant):
+    epoch, version = await aget_versions(EPOCH_KEY, task_version_key(task_id))
+    return f"tasks:detail:{task_id}:{epoch}:{version}:{variant}"
+
+
+async def alist_key(variant):
+    epoch, version = await aget_versions(EPOCH_KEY, LIST_VERSION_KEY)
+    return f"tasks:list:{epoch}:{version}:{variant}"
+
+
+def count_lookup(entry, kind):
+    metrics.increment(
+        "tasks_response_cache_requests",
+        kind=kind,
+        result="miss" if entry is None else "hit",
+    )
+    return entry
+
+
+def get_entry(key, kind):
+    return count_lookup(get_cache().get(key), kind)
+
+
+async def aget_entry(key, kind):
+    return count_lookup(await get_cache().aget(key), kind)
+
+
+def get_timeout():
+    return getattr(settings, "TASKS_CACHE_TIMEOUT", 300)
+
+
+def set_entry(key, entry):
+    get_cache().set(key, entry, timeout=get_timeout())
+
+
+async def aset_entry(key, entry):
+    await get_cache().aset(key, entry, timeout=get_timeout())
+
+
+def get_stats():
+    stats = {}
+    for (name, labels), value in metrics.get_counters().items():
+        if name == "tasks_response_cache_requests":
+            labels = dict(labels)
+            kind = stats.setdefault(labels["kind"], {"hits": 0, "misses": 0})
+            kind["hits" if labels["result"] == "hit" else "misses"] += value
+    return stats
+
+
+class CachedResponseMixin:
+    # Goes in front of ConditionalGetMixin: a hit is answered (200 or 304)
+    # without touching the database, a miss falls through and is stored.
+    def retrieve(self, request, *args, **kwargs):
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        key = detail_key(pk, self.get_representation_key())
+        entry = get_entry(key, "detail")
+        if entry is not None:
+            return self.get_cached_response(request, entry, honour_last_modified=True)
+        response = super().retrieve(request, *args, **kwargs)
+        self.store_response(key, response)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        key = list_key(self.get_representation_key())
+        entry = get_entry(key, "list")
+        if entry is not None:
+            return self.get_cached_response(request, entry, honour_last_modified=False)
+        response = super().list(request, *args, **kwargs)
+        self.store_response(key, response)
+        return response
+
+    def get_cached_response(self, request, entry, honour_last_modified):
+        data, etag, last_modified = entry
+        not_modified = self.get_not_modified(
+            request, etag, last_modified if honour_last_modified else None
+        )
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified)
+        return self.set_validators(Response(data), etag, last_modified)
+
+    def store_response(self, key, response):
+        entry = self.get_response_entry(response)
+        if entry is not None:
+            set_entry(key, entry)
+
+    def get_response_entry(self, response):
+        if response.status_code != 200 or not response.has_header("ETag"):
+            return None
+        # A lagging replica may return rows older than the versions in the
+        # key; only primary reads are allowed to fill the cache.
+        if reading_from_replica():
+            return None
+        last_modified = response.get("Last-Modified")
+        if last_modified is not None:
+            last_modified = parse_http_date(last_modified)
+        return (response.data, response["ETag"], last_modified)
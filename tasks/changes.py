@@ -0,0 +1,145 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Max, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException, ValidationError
+
+from tasks.models import TaskChange
+
+# A change-feed cursor is "<last change id>.<unix time it was current at>".
+# The time tells whether entries the client has not seen yet may have been
+# trimmed since, in which case it has to resynchronise from the task list.
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Cursor is older than the change log; reload the task list."
+    default_code = "cursor_expired"
+
+
+def get_retention():
+    return timedelta(hours=getattr(settings, "TASKS_CHANGES_RETENTION_HOURS", 168))
+
+
+def make_cursor(change_id, checked_at=None):
+    return f"{change_id}.{int(checked_at if checked_at is not None else time.time())}"
+
+
+def parse_cursor(value):
+    try:
+        change_id, checked_at = value.split(".")
+        change_id, checked_at = int(change_id), int(checked_at)
+    except (AttributeError, ValueError):
+        raise ValidationError({"since": ["Invalid cursor."]})
+    if checked_at < time.time() - get_retention().total_seconds():
+        raise CursorExpired()
+    return change_id
+
+
+def get_setting(name, default):
+    return getattr(settings, f"TASKS_CHANGES_{name}", default)
+
+
+class ChangeFeedQuerySerializer(serializers.Serializer):
+    since = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+    # Long polling: how long to wait for the first change, in seconds.
+    timeout = serializers.FloatField(min_value=0, max_value=30, default=0)
+
+
+def get_feed_query(request):
+    # Returns (after_id, limit, timeout); after_id is None without a cursor.
+    # EventSource sends the last cursor it saw as Last-Event-ID.
+    params = request.query_params.dict()
+    if "since" not in params and request.headers.get("Last-Event-ID"):
+        params["since"] = request.headers["Last-Event-ID"]
+    serializer = ChangeFeedQuerySerializer(data=params)
+    if not serializer.is_valid():
+        raise ValidationError(serializer.errors)
+    query = serializer.validated_data
+    after_id = parse_cursor(query["since"]) if "since" in query else None
+    return after_id, query["limit"], query["timeout"]
+
+
+def record(kind, task_ids):
+    # Written in the caller's transaction, like the outbox: an entry commits
+    # or rolls back together with the change it describes.
+    entries = [TaskChange(task_id=task_id, kind=kind) for task_id in task_ids]
+    if entries:
+        TaskChange.objects.bulk_create(entries)
+
+
+def get_settle_seconds():
+    # Readers follow ids, but concurrent transactions may commit in another
+    # order than they took their ids, and an entry that commits behind an id
+    # a reader has passed would be missed. So the feed stops before the first
+    # entry younger than this, which has to outlast the longest writing
+    # transaction. SQLite has a single writer, so ids are commit order there.
+    default = 0 if connection.vendor == "sqlite" else 5
+    return get_setting("SETTLE_SECONDS", default)
+
+
+def get_settled():
+    # Entries below the first unsettled one (all of them when there is none).
+    cutoff = timezone.now() - timedelta(seconds=get_settle_seconds())
+    unsettled = TaskChange.objects.filter(created_at__gt=cutoff).order_by("id")
+    boundary = Coalesce(Subquery(unsettled.values("id")[:1]), F("id") + 1)
+    return TaskChange.objects.filter(id__lt=boundary)
+
+
+def get_changes(after_id, limit):
+    return get_settled().filter(id__gt=after_id).order_by("id")[:limit]
+
+
+def current_cursor():
+    latest = get_settled().aggregate(latest=Max("id"))["latest"]
+    return make_cursor(latest or 0)
+
+
+async def acurrent_cursor():
+    latest = (await get_settled().aaggregate(latest=Max("id")))["latest"]
+    return make_cursor(latest or 0)
+
+
+def get_feed(changes, after_id):
+    # Response body shared by the long-poll and streaming endpoints.
+    checked_at = time.time()
+    results = [
+        {
+            "id": change.id,
+            "task": change.task_id,
+            "kind": change.kind,
+            "created_at": change.created_at,
+            "cursor": make_cursor(change.id, checked_at),
+        }
+        for change in changes
+    ]
+    last_id = changes[-1].id if changes else after_id
+    return {"cursor": make_cursor(last_id, checked_at), "results": results}
+
+
+def trim(now=None):
+    # Drops entries older than the retention period.
+    cutoff = (now or timezone.now()) - get_retention()
+    deleted, _ = TaskChange.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def compact(before):
+    # Among entries older than ``before``, keeps only the latest one per task
+    # and kind: a client that resumes from an older cursor still learns that
+    # the task changed, which is all a feed entry says. Entries of deleted
+    # tasks collapse into the deletion.
+    old = TaskChange.objects.filter(created_at__lt=before)
+    keep = old.values("task_id", "kind").annotate(latest=Max("id")).values("latest")
+    deleted_tasks = old.filter(kind=TaskChange.DELETED).values("task_id")
+    superseded = old.exclude(id__in=keep) | old.filter(
+        task_id__in=deleted_tasks
+    ).exclude(kind=TaskChange.DELETED)
+    deleted, _ = superseded.delete()
+    return deleted
@@ -0,0 +1,185 @@
+import calendar
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+from rest_framework.response import Response
+
+
+def timestamp(value):
+    return calendar.timegm(value.utctimetuple())
+
+
+def version_token(value):
+    # Exact (microsecond) integer form of a version timestamp.
+    if value is None:
+        return 0
+    return timestamp(value) * 1_000_000 + value.microsecond
+
+
+def version_from_token(token):
+    return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=token)
+
+
+class ConditionalGetMixin:
+    # Answers If-None-Match / If-Modified-Since from a single indexed lookup
+    # on ``version_field`` before any serialization happens.
+    version_field = "updated_at"
+
+    def get_version_queryset(self):
+        return self.filter_queryset(self.queryset.model._default_manager.all())
+
+    def get_version_lookups(self):
+        # The columns every list row has to carry for the page ETag.
+        return [self.queryset.model._meta.pk.name, self.version_field]
+
+    def get_version_page_queryset(self):
+        # Just enough of each row to page through the list the same way and
+        # build its validators; the paginator reads the ordering fields.
+        queryset = self.get_version_queryset()
+        lookups = self.get_version_lookups()
+        for order in self.paginator.get_ordering(self.request, queryset, self):
+            lookups.append(order.lstrip("-"))
+        return queryset.values(*dict.fromkeys(lookups))
+
+    def get_representation_key(self):
+        # Query parameters and the negotiated format both change the body, and
+        # so does the user when a filter depends on it.
+        raw = f"{self.request.get_full_path()}|{self.request.accepted_media_type}"
+        if any(
+            getattr(backend, "user_param", None) in self.request.query_params
+            for backend in self.filter_backends
+        ):
+            raw = f"{raw}|{self.request.user.pk}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+    def get_object_etag(self, pk, version):
+        return f'"{pk}-{version_token(version)}-{self.get_representation_key()}"'
+
+    def get_page_validators(self, page):
+        # A page is made of its rows and of the links around it, so its ETag
+        # covers the version of each row and whether the neighbouring pages
+        # exist. Rows are model instances or .values() dicts.
+        pk_name, version_field = self.get_version_lookups()
+        parts = [self.get_representation_key()]
+        latest = None
+        for row in page:
+            if isinstance(row, dict):
+                pk, version = row[pk_name], row[version_field]
+            else:
+                pk, version = getattr(row, pk_name), getattr(row, version_field)
+            parts.append(f"{pk}-{version_token(version)}")
+            if latest is None or version > latest:
+                latest = version
+        parts.append(f"{self.paginator.has_previous:d}{self.paginator.has_next:d}")
+        raw = "|".join(parts)
+        etag = f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+        return etag, timestamp(latest) if latest is not None else None
+
+    # ``last_modified`` below is a POSIX timestamp, as in the HTTP headers.
+    def get_not_modified(self, request, etag, last_modified=None):
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_if_match_filter(self, request, pk):
+        # If-Match on writes, as a filter for the UPDATE. Only the version part
+        # of a detail ETag is compared, so the ETag of any representation of
+        # the object matches; weak ETags never do. None without the header.
+        header = request.META.get("HTTP_IF_MATCH")
+        if header is None:
+            return None
+        etags = parse_etags(header)
+        if etags == ["*"]:
+            return Q()
+        versions = []
+        for etag in etags:
+            parts = etag.strip('"').rsplit("-", 2)
+            if (
+                not etag.startswith("W/")
+                and len(parts) == 3
+                and parts[0] == str(pk)
+                and parts[1].isdigit()
+            ):
+                versions.append(version_from_token(int(parts[1])))
+        return Q(**{f"{self.version_field}__in": versions})
+
+    def is_conditional(self, request):
+        return (
+            "HTTP_IF_NONE_MATCH" in request.META
+            or "HTTP_IF_MODIFIED_SINCE" in request.META
+        )
+
+    def get_object_version_queryset(self):
+        # None when the lookup value cannot match any row.
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            return (
+                self.get_version_queryset()
+                .filter(**lookup)
+                .values_list("pk", self.version_field)
+            )
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    def get_object_version(self):
+        queryset = self.get_object_version_queryset()
+        return queryset.first() if queryset is not None else None
+
+    def retrieve(self, request, *args, **kwargs):
+        # Plain GETs go straight to the object; the extra version lookup only
+        # pays off when the client can be answered with a 304.
+        row = self.get_object_version() if self.is_conditional(request) else None
+        if row is not None:
+            pk, version = row
+            etag = self.get_object_etag(pk, version)
+            not_modified = self.get_not_modified(request, etag, timestamp(version))
+            if not_modified is not None:
+                return not_modified
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        version = getattr(instance, self.version_field)
+        return self.set_validators(
+            Response(serializer.data),
+            self.get_object_etag(instance.pk, version),
+            timestamp(version),
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            self.page_validators = self.get_page_validators(page)
+        return page
+
+    def list(self, request, *args, **kwargs):
+        # The validators come from the page being served, so a plain GET costs
+        # no extra query. Only If-None-Match reads the page's versions first:
+        # a 304 then skips the full rows. If-Modified-Since is not honoured on
+        # lists, since a row that went away leaves no newer version behind.
+        if self.paginator is not None and "HTTP_IF_NONE_MATCH" in request.META:
+            page = self.paginator.paginate_queryset(
+                self.get_version_page_queryset(), request, view=self
+            )
+            etag, last_modified = self.get_page_validators(page)
+            not_modified = self.get_not_modified(request, etag)
+            if not_modified is not None:
+                return self.set_validators(not_modified, etag, last_modified)
+        self.page_validators = None
+        response = super().list(request, *args, **kwargs)
+        if self.page_validators is not None:
+            self.set_validators(response, *self.page_validators)
+        return response
@@ -0,0 +1,121 @@
+from collections import Counter, defaultdict
+
+from django.db import router, transaction
+from django.db.models import Count, F, Q
+
+from tasks.models import Task, UserTaskCounts
+
+COLUMNS = ("created_open", "created_completed", "assigned_open", "assigned_completed")
+
+
+def counted(values):
+    # The (user_id, column) counters a task with these field values (see
+    # Task.get_counted_values) adds one to; None when some value is unknown.
+    if values is None:
+        return []
+    if any(name not in values for name in Task.COUNTED_FIELDS):
+        return None
+    if values["deleted_at"] is not None:
+        return []
+    status = "completed" if values["is_completed"] else "open"
+    pairs = [(values["creator_id"], f"created_{status}")]
+    if values["assignee_id"] is not None:
+        pairs.append((values["assignee_id"], f"assigned_{status}"))
+    return pairs
+
+
+def record(changes):
+    # ``changes`` are (before, after) field values of written tasks, None
+    # where there is no task. The differences are applied with one UPDATE per
+    # distinct set of deltas, in the caller's transaction. Changes that cannot
+    # be told (unknown values) are left to reconcile_task_counts; users
+    # without a row are skipped, as their row is computed in full when read.
+    deltas = defaultdict(Counter)
+    for before, after in changes:
+        old, new = counted(before), counted(after)
+        if old is None or new is None:
+            continue
+        for user_id, column in old:
+            deltas[user_id][column] -= 1
+        for user_id, column in new:
+            deltas[user_id][column] += 1
+    groups = defaultdict(list)
+    for user_id, delta in deltas.items():
+        key = tuple(sorted((column, n) for column, n in delta.items() if n))
+        if key:
+            groups[key].append(user_id)
+    for key, user_ids in groups.items():
+        UserTaskCounts.objects.filter(user_id__in=user_ids).update(
+            **{column: F(column) + n for column, n in key}
+        )
+
+
+def compute(user_ids, using=None):
+    # The counters of ``user_ids`` from the tasks themselves.
+    counts = {user_id: dict.fromkeys(COLUMNS, 0) for user_id in user_ids}
+    for role, field in [("created", "creator_id"), ("assigned", "assignee_id")]:
+        rows = (
+            Task.objects.using(using)
+            .filter(**{f"{field}__in": user_ids})
+            .order_by()
+            .values(field)
+            .annotate(
+                open=Count("pk", filter=Q(is_completed=False)),
+                completed=Count("pk", filter=Q(is_completed=True)),
+            )
+        )
+        for row in rows:
+            counts[row[field]][f"{role}_open"] = row["open"]
+            counts[row[field]][f"{role}_completed"] = row["completed"]
+    return counts
+
+
+def get_counts(user_id):
+    # One primary key lookup; the first read of a user computes the row.
+    # Everything goes to the primary, also in replica-read requests: a
+    # lagging replica would miss a row just created and count stale tasks.
+    # Concurrent first reads both insert and the conflict clause keeps one
+    # row (no IntegrityError to recover from).
+    using = router.db_for_write(UserTaskCounts)
+    try:
+        return UserTaskCounts.objects.using(using).get(pk=user_id)
+    except UserTaskCounts.DoesNotExist:
+        pass
+    with transaction.atomic(using=using):
+        counts = UserTaskCounts(
+            user_id=user_id, **compute([user_id], using=using)[user_id]
+        )
+        UserTaskCounts.objects.using(using).bulk_create([counts], ignore_conflicts=True)
+    return counts
+
+
+def summarize(counts):
+    summary = {}
+    for role, prefix in [("assigned_to_me", "assigned"), ("created_by_me", "created")]:
+        open_ = getattr(counts, f"{prefix}_open")
+        completed = getattr(counts, f"{prefix}_completed")
+        summary[role] = {
+            "open": open_,
+            "completed": completed,
+            "total": open_ + completed,
+        }
+    return summary
+
+
+def reconcile(user_ids):
+    # Rewrites the rows of ``user_ids`` that drifted from the tasks and
+    # creates the missing ones. Returns the number of rows written.
+    expected = compute(user_ids)
+    rows = UserTaskCounts.objects.in_bulk(user_ids)
+    stale, missing = [], []
+    for user_id, values in expected.items():
+        row = rows.get(user_id)
+        if row is None:
+            missing.append(UserTaskCounts(user_id=user_id, **values))
+        elif any(getattr(row, column) != n for column, n in values.items()):
+            for column, n in values.items():
+                setattr(row, column, n)
+            stale.append(row)
+    UserTaskCounts.objects.bulk_create(missing, ignore_conflicts=True)
+    UserTaskCounts.objects.bulk_update(stale, COLUMNS)
+    return len(stale) + len(missing)
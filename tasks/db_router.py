@@ -0,0 +1,100 @@
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# Set for the duration of a request whose ORM reads may go to the replica.
+_read_from_replica = ContextVar("tasks_read_from_replica", default=False)
+
+# Set on responses to mutations: until it expires, the client's reads stay on
+# the primary so that it sees its own writes despite replication lag.
+STICKY_COOKIE = "tasks_primary_until"
+
+
+def get_replica_alias():
+    return getattr(settings, "TASKS_READ_REPLICA", None)
+
+
+def reading_from_replica():
+    return _read_from_replica.get() and get_replica_alias() is not None
+
+
+class ReplicaRouter:
+    # Writes always go to the primary ("default"). Reads go to the replica
+    # only inside requests that ReplicaMiddleware marked as replica-safe.
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return get_replica_alias()
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives the schema through replication.
+        return db != get_replica_alias()
+
+
+class ReplicaMiddleware:
+    # Safe-method requests to views with ``read_from_replica = True`` read
+    # from the replica, unless the client wrote something recently.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_from_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = _read_from_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        return self.process_response(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "cls", None)
+        if (
+            request.method in ("GET", "HEAD", "OPTIONS")
+            and getattr(view_class, "read_from_replica", False)
+            and not self.is_sticky(request)
+        ):
+            _read_from_replica.set(True)
+
+    def is_sticky(self, request):
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def process_response(self, request, response):
+        if (
+            get_replica_alias() is not None
+            and request.method not in ("GET", "HEAD", "OPTIONS", "TRACE")
+            and response.status_code < 400
+        ):
+            seconds = getattr(settings, "TASKS_REPLICA_STICKY_SECONDS", 5)
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + seconds),
+                max_age=seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from tasks import search
+from tasks.models import Comment, Task, UserDeletion
+from tasks.signals import tasks_bulk_deleted
+
+User = get_user_model()
+
+# Deleting a task with its comments (or a user with their tasks) in one go
+# holds the write lock for as long as the cascade takes. Instead tasks are
+# soft-deleted with one UPDATE, which hides them and their comments at once,
+# and ``reap()`` purges the rows later in bounded steps, each in its own
+# short transaction (see the reap_deleted command).
+
+
+def soft_delete_tasks(queryset):
+    # Returns the ids of the tasks deleted.
+    with transaction.atomic():
+        tasks = list(queryset.only("creator", "assignee", "is_completed", "deleted_at"))
+        task_ids = [task.pk for task in tasks]
+        if task_ids:
+            now = timezone.now()
+            Task.objects.filter(pk__in=task_ids).update(deleted_at=now, updated_at=now)
+            tasks_bulk_deleted.send(sender=Task, tasks=tasks)
+    return task_ids
+
+
+def delete_user(user):
+    # The user can no longer log in, and their tasks are gone from the API;
+    # the row itself is deleted by the reaper after the tasks.
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        soft_delete_tasks(Task.objects.filter(creator=user))
+        UserDeletion.objects.get_or_create(user=user)
+
+
+def delete_rows(queryset):
+    # A plain DELETE: no collector, no per-row signals. Only for rows whose
+    # dependents are already gone and whose derived state is handled here.
+    return queryset._raw_delete(queryset.db)
+
+
+def reap_step(limit):
+    # Deletes at most ``limit`` rows: comments of soft-deleted tasks, then the
+    # tasks themselves, then the comments and rows of deleted users. Returns
+    # the number of rows deleted; 0 means there is nothing left to do.
+    with transaction.atomic():
+        task_ids = list(
+            Task.all_objects.filter(deleted_at__isnull=False)
+            .order_by("deleted_at")
+            .values_list("pk", flat=True)[:limit]
+        )
+        if task_ids:
+            comment_ids = list(
+                Comment.all_objects.filter(task_id__in=task_ids).values_list(
+                    "pk", flat=True
+                )[:limit]
+            )
+            if comment_ids:
+                delete_rows(Comment.all_objects.filter(pk__in=comment_ids))
+                search.remove_comments(comment_ids)
+                return len(comment_ids)
+            delete_rows(Task.all_objects.filter(pk__in=task_ids))
+            return len(task_ids)
+
+        # Comments of deleted users on live tasks go through Model.delete(),
+        # so that the tasks' counters and caches follow.
+        pending = UserDeletion.objects.values("user_id")
+        comments = list(Comment.all_objects.filter(author_id__in=pending)[:limit])
+        for comment in comments:
+            comment.delete()
+        if comments:
+            return len(comments)
+        users = list(
+            User.objects.filter(pk__in=pending)
+            .exclude(Exists(Task.all_objects.filter(creator_id=OuterRef("pk"))))
+            .order_by("pk")[:limit]
+        )
+        for user in users:
+            user.delete()
+        return len(users)
+
+
+def get_backlog():
+    # Rows waiting for the reaper, for the command's progress output.
+    return {
+        "tasks": Task.all_objects.filter(deleted_at__isnull=False).count(),
+        "users": UserDeletion.objects.count(),
+    }
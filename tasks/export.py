@@ -0,0 +1,109 @@
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from tasks.renderers import RowRenderer
+
+# Bulk export (GET /api/tasks/export/, GET /api/comments/export/ and the
+# export_tasks command). Rows are plain tuples read in chunks straight from
+# the cursor (a server-side cursor on PostgreSQL) and written out as they
+# arrive, so memory stays flat whatever the size of the table.
+
+TASK_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "creator",
+    "assignee",
+    "is_completed",
+    "created_at",
+    "updated_at",
+    "comments_count",
+    "last_activity_at",
+]
+COMMENT_COLUMNS = ["id", "task", "author", "text", "created_at"]
+
+
+def get_chunk_size():
+    return getattr(settings, "TASKS_EXPORT_CHUNK_SIZE", 2000)
+
+
+def get_rows(queryset, columns):
+    # FKs come out as ids ("creator" -> creator_id).
+    return queryset.values_list(*columns)
+
+
+def format_row(row, datetime_field=serializers.DateTimeField()):
+    # Datetimes as the API renders them.
+    return tuple(
+        (
+            datetime_field.to_representation(value)
+            if isinstance(value, datetime)
+            else value
+        )
+        for value in row
+    )
+
+
+def stream(renderer, columns, queryset, chunk_size=None):
+    # Yields the rendered export one chunk of rows at a time.
+    chunk_size = chunk_size or get_chunk_size()
+    header = renderer.render_header(columns)
+    if header:
+        yield header
+    lines = []
+    for row in get_rows(queryset, columns).iterator(chunk_size=chunk_size):
+        lines.append(renderer.render_row(columns, format_row(row)))
+        if len(lines) >= chunk_size:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+async def astream(renderer, columns, queryset, chunk_size=None):
+    # stream() over the async ORM, for the ASGI views.
+    chunk_size = chunk_size or get_chunk_size()
+    header = renderer.render_header(columns)
+    if header:
+        yield header
+    # QuerySet.aiterator() would run the values_list() query in the event
+    # loop; the lazy sync iterator is advanced a chunk at a time in the
+    # database thread instead.
+    rows = get_rows(queryset, columns).iterator(chunk_size=chunk_size)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while chunk := await next_chunk():
+        yield "".join(renderer.render_row(columns, format_row(row)) for row in chunk)
+
+
+class ExportMixin:
+    # Errors of the export actions (bad filters, authentication, an unknown
+    # ?format=) are rendered as JSON like the rest of the API, not by the
+    # CSV/NDJSON renderer negotiated for the rows.
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(response, "exception", False) and isinstance(
+            getattr(response, "accepted_renderer", None), RowRenderer
+        ):
+            renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+            response.accepted_renderer = renderer
+            response.accepted_media_type = renderer.media_type
+        return response
+
+
+def streaming_response(renderer, columns, queryset, filename, asynchronous=False):
+    chunks = (astream if asynchronous else stream)(renderer, columns, queryset)
+    return StreamingHttpResponse(
+        chunks,
+        content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{renderer.format}"'
+            )
+        },
+    )
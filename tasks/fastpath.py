@@ -0,0 +1,140 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from tasks.conditional import ConditionalGetMixin
+
+# Opt-in fast path for list endpoints (TASKS_FAST_LISTS). A ModelSerializer
+# is compiled once into the .values() lookups it reads and a generated
+# function that turns one such row into the dict the serializer would have
+# produced, field by field the same, so the rendered JSON is identical.
+# Serializers with fields it does not know how to compile keep the regular
+# path.
+
+
+class RowSerializer:
+    def __init__(self, lookups, to_dict):
+        self.lookups = lookups
+        self.to_dict = to_dict
+
+    def serialize(self, rows):
+        to_dict = self.to_dict
+        return [to_dict(row) for row in rows]
+
+
+def format_datetime(value):
+    # DateTimeField.to_representation() with the default ISO 8601 format.
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+class Unsupported(Exception):
+    pass
+
+
+# Fields whose to_representation() leaves a database value as it is.
+PLAIN_REPRESENTATIONS = {
+    serializers.IntegerField.to_representation,
+    serializers.CharField.to_representation,
+    serializers.BooleanField.to_representation,
+}
+
+
+def compile_fields(serializer, model, prefix, lookups):
+    # Returns the source of a dict display for ``serializer``'s readable
+    # fields, reading the row as ``r[<lookup>]`` and collecting the lookups.
+    entries = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if "." in field.source or field.source == "*":
+            raise Unsupported(name)
+        lookup = prefix + field.source
+        if isinstance(field, serializers.BaseSerializer):
+            if getattr(field, "many", False):
+                raise Unsupported(name)
+            related = model._meta.get_field(field.source)
+            # Read through the FK column: a missing relation renders as None.
+            nested = compile_fields(
+                field, related.related_model, f"{lookup}__", lookups
+            )
+            fk = prefix + related.attname
+            lookups.append(fk)
+            value = f"None if r[{fk!r}] is None else {nested}"
+        else:
+            lookups.append(lookup)
+            value = f"r[{lookup!r}]"
+            if isinstance(field, serializers.DateTimeField):
+                output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+                if (
+                    not settings.USE_TZ
+                    or output_format != ISO_8601
+                    or hasattr(field, "timezone")
+                ):
+                    raise Unsupported(name)
+                value = f"None if {value} is None else format_datetime({value})"
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                if field.pk_field is not None:
+                    raise Unsupported(name)
+            elif isinstance(field, serializers.BigIntegerField):
+                if getattr(
+                    field, "coerce_to_string", api_settings.COERCE_BIGINT_TO_STRING
+                ):
+                    raise Unsupported(name)
+            elif type(field).to_representation not in PLAIN_REPRESENTATIONS:
+                raise Unsupported(name)
+        entries.append(f"{name!r}: {value}")
+    return "{" + ", ".join(entries) + "}"
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    # A RowSerializer, or None when the serializer cannot be compiled.
+    lookups = []
+    try:
+        body = compile_fields(
+            serializer_class(), serializer_class.Meta.model, "", lookups
+        )
+    except Unsupported:
+        return None
+    namespace = {"format_datetime": format_datetime}
+    exec(f"def to_dict(r):\n    return {body}\n", namespace)
+    return RowSerializer(list(dict.fromkeys(lookups)), namespace["to_dict"])
+
+
+class FastListMixin:
+    def get_row_serializer(self):
+        if not getattr(settings, "TASKS_FAST_LISTS", False):
+            return None
+        if self.get_fieldset() is not None:
+            return None
+        return compile_serializer(self.get_serializer_class())
+
+    def get_rows_queryset(self, row_serializer):
+        # The page is read with .values(); the paginator also needs the
+        # values of the ordering fields, and the page ETag those of the
+        # version columns.
+        queryset = self.filter_queryset(self.get_queryset())
+        lookups = list(row_serializer.lookups)
+        if self.paginator is not None:
+            ordering = self.paginator.get_ordering(self.request, queryset, self)
+            lookups += [order.lstrip("-") for order in ordering]
+        if isinstance(self, ConditionalGetMixin):
+            lookups += self.get_version_lookups()
+        return queryset.values(*dict.fromkeys(lookups))
+
+    def list(self, request, *args, **kwargs):
+        row_serializer = self.get_row_serializer()
+        if row_serializer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_rows_queryset(row_serializer)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(row_serializer.serialize(queryset))
+        return self.get_paginated_response(row_serializer.serialize(page))
@@ -0,0 +1,131 @@
+from collections import namedtuple
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from tasks.conditional import ConditionalGetMixin
+from tasks.pagination import KeysetPagination
+
+# A requested representation: ``fields`` (None: all), the relations to
+# ``expand`` into objects, what to ``include`` alongside the page, and the
+# ``required`` columns the view itself reads (pagination keys, versions).
+Fieldset = namedtuple("Fieldset", ["fields", "expand", "include", "required"])
+
+INCLUDES = {"users"}
+
+
+def split_param(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class SparseFieldsetSerializerMixin:
+    # ``expandable_fields`` maps relation fields to the serializer used when
+    # they are expanded; otherwise, in a sparse representation, they are
+    # rendered as primary keys.
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get("fieldset")
+        if fieldset is None:
+            return fields
+        if fieldset.fields is not None:
+            fields = {name: fields[name] for name in fields if name in fieldset.fields}
+        for name in self.expandable_fields:
+            if name in fields and name not in fieldset.expand:
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+        return fields
+
+
+class SparseFieldsetMixin:
+    # ``?fields=``, ``?expand=`` and ``?include=users`` on list responses.
+    # Any of them switches to the compact representation: only the listed
+    # fields, and related users as ids unless expanded or side-loaded.
+    sparse_actions = ("list",)
+
+    def get_fieldset(self):
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = self.parse_fieldset()
+        return self._fieldset
+
+    def parse_fieldset(self):
+        request = self.request
+        fields = split_param(request, "fields")
+        expand = split_param(request, "expand")
+        include = split_param(request, "include")
+        if fields is None and expand is None and include is None:
+            return None
+
+        serializer_class = self.get_serializer_class()
+        available = serializer_class.Meta.fields
+        expandable = serializer_class.expandable_fields
+        errors = {}
+        if fields is not None and not set(fields) <= set(available):
+            errors["fields"] = [f"Choose from: {', '.join(available)}."]
+        if expand is not None and not set(expand) <= set(expandable):
+            errors["expand"] = [f"Choose from: {', '.join(expandable)}."]
+        if include is not None and not set(include) <= INCLUDES:
+            errors["include"] = [f"Choose from: {', '.join(sorted(INCLUDES))}."]
+        if errors:
+            raise ValidationError(errors)
+
+        required = [self.queryset.model._meta.pk.name]
+        if isinstance(self.paginator, KeysetPagination):
+            ordering = self.paginator.get_ordering(request, self.queryset, self)
+            required += [order.lstrip("-") for order in ordering]
+        if isinstance(self, ConditionalGetMixin):
+            required += self.get_version_lookups()
+        return Fieldset(
+            fields=set(fields) | {"id"} if fields is not None else None,
+            expand=set(expand or ()),
+            include=set(include or ()),
+            required=required,
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fieldset"] = self.get_fieldset()
+        return context
+
+    def get_included_users_queryset(self, data):
+        # Users referenced by the page, to be sent once each.
+        fieldset = self.get_fieldset()
+        if fieldset is None or "users" not in fieldset.include:
+            return None
+        user_ids = set()
+        for row in data:
+            for name in self.get_user_serializers():
+                if isinstance(row.get(name), int):
+                    user_ids.add(row[name])
+        user_serializer = self.get_included_users_serializer()
+        model = user_serializer.Meta.model
+        return (
+            model._default_manager.filter(pk__in=user_ids)
+            .only(*user_serializer.Meta.fields)
+            .order_by("pk")
+        )
+
+    def get_user_serializers(self):
+        # The expandable relations that point at users.
+        return self.get_serializer_class().expandable_fields
+
+    def get_included_users_serializer(self):
+        return next(iter(self.get_user_serializers().values()))
+
+    def get_paginated_response(self, data, included_users=None):
+        # The async views load ``included_users`` themselves.
+        response = super().get_paginated_response(data)
+        if included_users is None:
+            queryset = self.get_included_users_queryset(data)
+            included_users = list(queryset) if queryset is not None else None
+        if included_users is not None:
+            user_serializer = self.get_included_users_serializer()
+            response.data["users"] = {
+                str(user.pk): user_serializer(user).data for user in included_users
+            }
+        return response
@@ -0,0 +1,242 @@
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from tasks.models import Comment, Task
+from tasks.serializers import TaskCreateUpdateSerializer
+from tasks.signals import comments_bulk_created, tasks_bulk_created
+
+User = get_user_model()
+
+# Bulk import (the import_tasks command). Records are validated with the
+# API's serializer rules, users are referred to by username and resolved
+# through an in-memory map, and every kind is written with bulk_create() plus
+# the bulk signals that keep counters, the search index, caches and the
+# change log in step.
+
+
+class InvalidRecord:
+    # Stands in for a JSONL line that is not a JSON object, so that it is
+    # reported and checkpointed like a record that fails validation.
+    def __init__(self, message):
+        self.errors = {api_settings.NON_FIELD_ERRORS_KEY: [message]}
+
+
+def read_records(path, format):
+    # Yields input records one at a time. Empty CSV cells count as missing.
+    with open(path, newline="", encoding="utf-8") as file:
+        if format == "csv":
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if value != ""}
+        else:
+            for line in file:
+                if line.strip():
+                    yield parse_line(line)
+
+
+def parse_line(line):
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as exc:
+        return InvalidRecord(f"Invalid JSON: {exc}.")
+    if not isinstance(record, dict):
+        return InvalidRecord("Expected a JSON object.")
+    return record
+
+
+class UsernameField(serializers.CharField):
+    # A username in, the user's id out.
+    default_error_messages = {"unknown": "Unknown user {username}."}
+
+    def to_internal_value(self, data):
+        username = super().to_internal_value(data)
+        users = self.context["users"]
+        if username not in users:
+            self.fail("unknown", username=username)
+        return users[username]
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ["username", "email"]
+        # Existing usernames are skipped before validation rather than looked
+        # up one by one.
+        extra_kwargs = {"username": {"validators": [User.username_validator]}}
+
+
+class CommentImportSerializer(serializers.ModelSerializer):
+    author = UsernameField()
+    created_at = serializers.DateTimeField(required=False)
+
+    class Meta:
+        model = Comment
+        fields = ["author", "text", "created_at"]
+
+
+class CommentToTaskImportSerializer(CommentImportSerializer):
+    task = serializers.IntegerField()
+
+    class Meta(CommentImportSerializer.Meta):
+        fields = ["task", *CommentImportSerializer.Meta.fields]
+
+    def validate_task(self, value):
+        if value not in self.context["tasks"]:
+            raise serializers.ValidationError("Task does not exist.")
+        return value
+
+
+class TaskImportSerializer(TaskCreateUpdateSerializer):
+    creator = UsernameField()
+    assignee = UsernameField(required=False, allow_null=True)
+    is_completed = serializers.BooleanField(default=False)
+    created_at = serializers.DateTimeField(required=False)
+    comments = CommentImportSerializer(many=True, required=False)
+
+    class Meta(TaskCreateUpdateSerializer.Meta):
+        fields = [
+            *TaskCreateUpdateSerializer.Meta.fields,
+            "creator",
+            "assignee",
+            "is_completed",
+            "created_at",
+            "comments",
+        ]
+
+
+def restore_created_at(model, objects, timestamps, batch_size):
+    # created_at is auto_now_add, which bulk_create() overwrites; imported
+    # timestamps are put back in one UPDATE per batch.
+    restored = []
+    for obj, created_at in zip(objects, timestamps):
+        if created_at is not None:
+            obj.created_at = created_at
+            restored.append(obj)
+    if restored:
+        model.objects.bulk_update(restored, ["created_at"], batch_size=batch_size)
+
+
+def write_comments(rows, batch_size):
+    # ``rows``: (task_id, validated comment data) pairs.
+    comments = [
+        Comment(task_id=task_id, author_id=data["author"], text=data["text"])
+        for task_id, data in rows
+    ]
+    if comments:
+        Comment.objects.bulk_create(comments, batch_size=batch_size)
+        timestamps = [data.get("created_at") for _, data in rows]
+        restore_created_at(Comment, comments, timestamps, batch_size)
+        comments_bulk_created.send(sender=Comment, comments=comments)
+    return len(comments)
+
+
+class Importer:
+    serializer_class = None
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.context = {"users": dict(User.objects.values_list("username", "pk"))}
+        # One serializer validates every record, as a ListSerializer's child
+        # does, so its fields are built once.
+        self.serializer = self.serializer_class(context=self.context)
+
+    def prepare(self, records):
+        # Called with each chunk of records before they are validated.
+        pass
+
+    def validate(self, record):
+        # Returns (validated data, None) or (None, errors); (None, None)
+        # skips the record.
+        try:
+            return self.serializer.run_validation(record), None
+        except serializers.ValidationError as exc:
+            return None, exc.detail
+
+    def write(self, rows):
+        # Writes a chunk of validated rows; returns the number of rows.
+        raise NotImplementedError
+
+
+class UserImporter(Importer):
+    serializer_class = UserImportSerializer
+
+    def validate(self, record):
+        if record.get("username") in self.context["users"]:
+            return None, None
+        return super().validate(record)
+
+    def write(self, rows):
+        users = {}
+        for data in rows:
+            # The first occurrence of a username wins.
+            users.setdefault(
+                data["username"],
+                User(
+                    username=data["username"],
+                    email=data.get("email", ""),
+                    password=make_password(None),
+                ),
+            )
+        User.objects.bulk_create(users.values(), batch_size=self.batch_size)
+        self.context["users"].update(
+            (username, user.pk) for username, user in users.items()
+        )
+        return len(users)
+
+
+class TaskImporter(Importer):
+    serializer_class = TaskImportSerializer
+
+    def write(self, rows):
+        now = timezone.now()
+        tasks = [
+            Task(
+                title=data["title"],
+                description=data.get("description", ""),
+                creator_id=data["creator"],
+                assignee_id=data.get("assignee"),
+                is_completed=data["is_completed"],
+                last_activity_at=data.get("created_at", now),
+            )
+            for data in rows
+        ]
+        Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+        timestamps = [data.get("created_at") for data in rows]
+        restore_created_at(Task, tasks, timestamps, self.batch_size)
+        tasks_bulk_created.send(sender=Task, tasks=tasks)
+        write_comments(
+            [
+                (task.pk, comment)
+                for task, data in zip(tasks, rows)
+                for comment in data.get("comments", [])
+            ],
+            self.batch_size,
+        )
+        return len(tasks)
+
+
+class CommentImporter(Importer):
+    serializer_class = CommentToTaskImportSerializer
+
+    def prepare(self, records):
+        task_ids = {record.get("task") for record in records}
+        self.context["tasks"] = set(
+            Task.objects.filter(
+                pk__in=[pk for pk in task_ids if str(pk).isdigit()]
+            ).values_list("pk", flat=True)
+        )
+
+    def write(self, rows):
+        return write_comments([(data["task"], data) for data in rows], self.batch_size)
+
+
+IMPORTERS = {
+    "users": UserImporter,
+    "tasks": TaskImporter,
+    "comments": CommentImporter,
+}
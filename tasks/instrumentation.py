@@ -0,0 +1,174 @@
+import hmac
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+from tasks import metrics
+
+logger = logging.getLogger(__name__)
+
+# Per-request instrumentation (MetricsMiddleware) exported with the rest of
+# tasks.metrics at /metrics. Requests are labelled by view, such as
+# "TaskViewSet.list" or "RegisterView"; queries are counted by a wrapper
+# installed on every database connection, which sees the request through a
+# context variable, also from the threads that run ORM calls for async views.
+
+
+class RequestStats:
+    __slots__ = ("view", "queries", "db_time", "render_time")
+
+    def __init__(self):
+        self.view = "unmatched"
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = None
+
+
+_current = ContextVar("tasks_request_stats", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries += 1
+
+
+@receiver(connection_created)
+def install_query_wrapper(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def get_view_name(request, view_func):
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return f"{view_func.__module__}.{view_func.__name__}"
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(request.method.lower())
+    if action is None:
+        return view_class.__name__
+    return f"{view_class.__name__}.{action}"
+
+
+def get_query_budget():
+    return getattr(settings, "TASKS_QUERY_BUDGET", None)
+
+
+class MetricsMiddleware:
+    # Goes first in MIDDLEWARE: it times the whole request, and its
+    # process_template_response() runs last, right before rendering.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = _current.get()
+        if stats is not None:
+            stats.view = get_view_name(request, view_func)
+
+    def process_template_response(self, request, response):
+        # DRF serializes Response.data to bytes in render().
+        stats = _current.get()
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.render_time = time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def record(self, request, response, stats, duration):
+        view = stats.view
+        metrics.increment(
+            "tasks_http_requests", view=view, status=str(response.status_code)
+        )
+        metrics.observe("tasks_http_request_duration_seconds", duration, view=view)
+        metrics.observe(
+            "tasks_http_request_queries",
+            stats.queries,
+            metrics.COUNT_BUCKETS,
+            view=view,
+        )
+        metrics.observe(
+            "tasks_http_request_db_duration_seconds", stats.db_time, view=view
+        )
+        if stats.render_time is not None:
+            metrics.observe(
+                "tasks_http_response_render_duration_seconds",
+                stats.render_time,
+                view=view,
+            )
+        if not response.streaming:
+            metrics.observe(
+                "tasks_http_response_size_bytes",
+                len(response.content),
+                metrics.SIZE_BUCKETS,
+                view=view,
+            )
+        budget = get_query_budget()
+        if budget and stats.queries > budget:
+            metrics.increment("tasks_query_budget_exceeded", view=view)
+            logger.warning(
+                "%s %s (%s) ran %d queries in %.1f ms, over the budget of %d.",
+                request.method,
+                request.path,
+                view,
+                stats.queries,
+                stats.db_time * 1000,
+                budget,
+            )
+
+
+def metrics_view(request):
+    # Prometheus scrape endpoint. With TASKS_METRICS_TOKEN set, the scraper
+    # has to send it as a bearer token.
+    token = getattr(settings, "TASKS_METRICS_TOKEN", "")
+    if token and not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
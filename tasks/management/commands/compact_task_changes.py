@@ -0,0 +1,38 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks import changes
+
+
+class Command(BaseCommand):
+    help = "Compact and trim the task change log (GET /api/tasks/changes/)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--compact-after",
+            type=int,
+            default=60,
+            help="Compact entries older than this many minutes.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Repeat every N seconds instead of running once.",
+        )
+
+    def handle(self, *args, compact_after, interval, **options):
+        while True:
+            trimmed = changes.trim()
+            compacted = changes.compact(
+                timezone.now() - timedelta(minutes=compact_after)
+            )
+            self.stdout.write(
+                f"Trimmed {trimmed}, compacted {compacted} change log entries."
+            )
+            if not interval:
+                break
+            time.sleep(interval)
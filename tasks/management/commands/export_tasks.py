@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from tasks import export
+from tasks.models import Comment, Task
+from tasks.renderers import CSVRenderer, NDJSONRenderer
+
+RENDERERS = {renderer.format: renderer for renderer in [NDJSONRenderer, CSVRenderer]}
+
+
+class Command(BaseCommand):
+    help = "Export tasks (or comments) as NDJSON or CSV, like GET /api/tasks/export/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(RENDERERS), default="ndjson")
+        parser.add_argument(
+            "--output", help="File to write to; standard output by default."
+        )
+        parser.add_argument(
+            "--comments", action="store_true", help="Export comments instead."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=export.get_chunk_size(),
+            help="Rows fetched per round trip.",
+        )
+
+    def handle(self, *args, format, output, comments, chunk_size, **options):
+        if comments:
+            queryset, columns = Comment.objects.order_by("id"), export.COMMENT_COLUMNS
+        else:
+            queryset, columns = Task.objects.order_by("id"), export.TASK_COLUMNS
+        chunks = export.stream(RENDERERS[format](), columns, queryset, chunk_size)
+        if output is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(output, "w", encoding="utf-8", newline="") as file:
+            for chunk in chunks:
+                file.write(chunk)
+        self.stderr.write(f"Exported to {output}.")
@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks import imports
+from tasks.models import ImportCheckpoint
+
+
+def chunked(records, size):
+    # Lists of up to ``size`` (position, record) pairs; positions count
+    # records from 1.
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users, tasks (optionally with nested comments) or comments "
+        "from a JSONL or CSV file. Resumes from its checkpoint after a crash."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--kind", choices=list(imports.IMPORTERS), default="tasks")
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "csv"],
+            help="By default, csv for .csv files and jsonl otherwise.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Records per transaction (and per checkpoint).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows per INSERT."
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint name; by default the kind and the absolute path.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint and start from the first record.",
+        )
+
+    def handle(self, *args, path, kind, format, chunk_size, batch_size, **options):
+        format = format or ("csv" if path.endswith(".csv") else "jsonl")
+        name = options["checkpoint"] or f"{kind}:{os.path.abspath(path)}"
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(name=name)
+        start = 0 if options["restart"] else checkpoint.position
+        if start:
+            self.stdout.write(f"Resuming after record {start}.")
+
+        importer = imports.IMPORTERS[kind](batch_size)
+        records = enumerate(imports.read_records(path, format), start=1)
+        imported = invalid = handled = 0
+        started = time.monotonic()
+        for chunk in chunked(islice(records, start, None), chunk_size):
+            importer.prepare(
+                [
+                    record
+                    for _, record in chunk
+                    if not isinstance(record, imports.InvalidRecord)
+                ]
+            )
+            rows = []
+            for position, record in chunk:
+                if isinstance(record, imports.InvalidRecord):
+                    data, errors = None, record.errors
+                else:
+                    data, errors = importer.validate(record)
+                if errors:
+                    invalid += 1
+                    self.stderr.write(f"Record {position}: {json.dumps(errors)}")
+                elif data is not None:
+                    rows.append(data)
+            # The checkpoint moves in the same transaction as the rows, so a
+            # resumed run neither skips nor repeats any of them.
+            with transaction.atomic():
+                imported += importer.write(rows) if rows else 0
+                checkpoint.position = chunk[-1][0]
+                checkpoint.save(update_fields=["position", "updated_at"])
+            handled += len(chunk)
+            rate = handled / max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                f"Record {checkpoint.position}: {imported} imported, "
+                f"{invalid} invalid ({rate:.0f} records/s)."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} {kind}, {invalid} invalid record(s)."
+            )
+        )
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks import deletion
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge soft-deleted tasks, their comments and deleted users in small "
+        "transactions, at a bounded rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Rows deleted per transaction.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=2000,
+            help="Rows deleted per second at most (0: no limit).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running, checking for new work every N seconds.",
+        )
+
+    def handle(self, *args, chunk_size, rate, interval, **options):
+        while True:
+            backlog = deletion.get_backlog()
+            started = time.monotonic()
+            total = 0
+            while True:
+                step_started = time.monotonic()
+                deleted = deletion.reap_step(chunk_size)
+                if not deleted:
+                    break
+                total += deleted
+                if rate:
+                    # Leaves the database to other writers between steps.
+                    pause = deleted / rate - (time.monotonic() - step_started)
+                    time.sleep(max(pause, 0))
+            if total or not interval:
+                self.stdout.write(
+                    f"Deleted {total} rows of {backlog['tasks']} tasks and "
+                    f"{backlog['users']} users in {time.monotonic() - started:.1f} s."
+                )
+            if not interval:
+                break
+            time.sleep(interval)
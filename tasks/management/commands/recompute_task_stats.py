@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from tasks import cache
+from tasks.models import Comment, Task
+
+
+class Command(BaseCommand):
+    help = "Recompute Task.comments_count and Task.last_activity_at from comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        fixed = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Task.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                fixed += self.recompute(ids[0], ids[-1])
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"Updated {fixed} task(s)."))
+
+    def recompute(self, first_id, last_id):
+        comments = Comment.objects.filter(task=OuterRef("pk")).order_by()
+        expected_count = Coalesce(
+            Subquery(
+                comments.values("task").annotate(count=Count("pk")).values("count")
+            ),
+            0,
+        )
+        latest_comment = Subquery(
+            comments.order_by("-created_at").values("created_at")[:1]
+        )
+        # Only a newer comment moves last_activity_at forward; removing a
+        # comment never moves it back, here or in the signal handlers.
+        stale_ids = list(
+            Task.objects.filter(pk__gte=first_id, pk__lte=last_id)
+            .annotate(expected_count=expected_count, latest_comment=latest_comment)
+            .filter(
+                ~Q(comments_count=F("expected_count"))
+                | Q(last_activity_at__lt=F("latest_comment"))
+            )
+            .values_list("pk", flat=True)
+        )
+        if stale_ids:
+            # updated_at moves with the counters so ETags and cached responses
+            # notice the change.
+            Task.objects.filter(pk__in=stale_ids).update(
+                comments_count=expected_count,
+                last_activity_at=Greatest(
+                    F("last_activity_at"),
+                    Coalesce(latest_comment, F("last_activity_at")),
+                ),
+                updated_at=timezone.now(),
+            )
+            cache.invalidate_tasks(stale_ids)
+        return len(stale_ids)
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks import counters
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-user task counters (GET /api/tasks/summary/) from "
+        "the tasks and repair the rows that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        fixed = 0
+        last_id = 0
+        while True:
+            ids = list(
+                User.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                fixed += counters.reconcile(ids)
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"Updated {fixed} user(s)."))
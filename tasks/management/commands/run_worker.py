@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from tasks import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver outbox events to the TASKS_WEBHOOK_URLS in batches, retrying "
+        "failed deliveries with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=100, help="Events claimed at once."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Deliveries in flight at once.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when no event is due.",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Deliver what is due, then exit."
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="First make the events that ran out of attempts due again.",
+        )
+
+    def handle(self, *args, batch_size, concurrency, interval, once, **options):
+        if options["retry_failed"]:
+            self.stdout.write(f"Retrying {outbox.retry_failed()} failed events.")
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                results = outbox.process_batch(executor, batch_size)
+                if results:
+                    self.stdout.write(
+                        f"Delivered {results['delivered']}, retrying "
+                        f"{results['retrying']}, failed {results['failed']}."
+                    )
+                    continue
+                if once:
+                    break
+                time.sleep(interval)
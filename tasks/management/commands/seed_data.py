@@ -0,0 +1,131 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.imports import write_comments
+from tasks.models import Task
+from tasks.signals import tasks_bulk_created
+
+User = get_user_model()
+
+WORDS = (
+    "fix update review deploy write test migrate refactor document release "
+    "billing search login report export import cache index queue api"
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users, tasks and comments for benchmarks and load tests. The same "
+        "--seed produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=10000)
+        parser.add_argument("--comments", type=int, default=50000)
+        parser.add_argument(
+            "--prefix", default="bench", help="Usernames are <prefix><n>."
+        )
+        parser.add_argument(
+            "--password",
+            default="bench-password",
+            help="Password of every seeded user.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows per INSERT."
+        )
+
+    def handle(self, *args, batch_size, **options):
+        self.random = random.Random(options["seed"])
+        started = time.monotonic()
+        user_ids = self.seed_users(
+            options["users"], options["prefix"], options["password"], batch_size
+        )
+        task_ids = self.seed_tasks(options["tasks"], user_ids, batch_size)
+        comments = self.seed_comments(
+            options["comments"], task_ids, user_ids, batch_size
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(user_ids)} users, {len(task_ids)} tasks and "
+                f"{comments} comments in {time.monotonic() - started:.1f} s."
+            )
+        )
+
+    def random_text(self, words):
+        return " ".join(self.random.choice(WORDS) for _ in range(words)).capitalize()
+
+    def seed_users(self, count, prefix, password, batch_size):
+        # Existing users are reused; one password hash is shared by all.
+        usernames = [f"{prefix}{n}" for n in range(1, count + 1)]
+        existing = set(
+            User.objects.filter(username__in=usernames).values_list(
+                "username", flat=True
+            )
+        )
+        password = make_password(password)
+        User.objects.bulk_create(
+            [
+                User(
+                    username=username,
+                    email=f"{username}@example.com",
+                    password=password,
+                )
+                for username in usernames
+                if username not in existing
+            ],
+            batch_size=batch_size,
+        )
+        return list(
+            User.objects.filter(username__in=usernames)
+            .order_by("id")
+            .values_list("pk", flat=True)
+        )
+
+    def seed_tasks(self, count, user_ids, batch_size):
+        # Rows get the current time, like rows created through the API.
+        task_ids = []
+        for start in range(0, count, batch_size):
+            tasks = [
+                Task(
+                    title=self.random_text(4),
+                    description=self.random_text(12),
+                    creator_id=self.random.choice(user_ids),
+                    assignee_id=(
+                        self.random.choice(user_ids)
+                        if self.random.random() < 0.7
+                        else None
+                    ),
+                    is_completed=self.random.random() < 0.3,
+                )
+                for _ in range(min(batch_size, count - start))
+            ]
+            with transaction.atomic():
+                Task.objects.bulk_create(tasks, batch_size=batch_size)
+                tasks_bulk_created.send(sender=Task, tasks=tasks)
+            task_ids.extend(task.pk for task in tasks)
+        return task_ids
+
+    def seed_comments(self, count, task_ids, user_ids, batch_size):
+        if not task_ids:
+            return 0
+        for start in range(0, count, batch_size):
+            rows = [
+                (
+                    self.random.choice(task_ids),
+                    {
+                        "author": self.random.choice(user_ids),
+                        "text": self.random_text(8),
+                    },
+                )
+                for _ in range(min(batch_size, count - start))
+            ]
+            with transaction.atomic():
+                write_comments(rows, batch_size)
+        return count
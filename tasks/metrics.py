@@ -0,0 +1,93 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+# Process-local counters and histograms. Each key is (name, sorted label
+# pairs). Every worker process exposes its own values.
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_histograms = {}
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def increment(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] += value
+
+
+def get_counters():
+    with _lock:
+        return dict(_counters)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One count per bucket plus one for +Inf, not cumulative.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+
+def observe(name, value, buckets=DURATION_BUCKETS, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    index = bisect_left(buckets, value)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.counts[index] += 1
+        histogram.sum += value
+
+
+def get_histograms():
+    # {key: (buckets, counts, sum)}
+    with _lock:
+        return {
+            key: (histogram.buckets, list(histogram.counts), histogram.sum)
+            for key, histogram in _histograms.items()
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{escape_label(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def render_prometheus():
+    # The Prometheus text exposition format; counters get the _total suffix.
+    lines = []
+    typed = set()
+    for (name, labels), value in sorted(get_counters().items()):
+        name = f"{name}_total"
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{format_labels(labels)} {value}")
+    for (name, labels), (buckets, counts, total) in sorted(get_histograms().items()):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip([*buckets, "+Inf"], counts):
+            cumulative += count
+            bucket_labels = format_labels([*labels, ("le", bound)])
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {total}")
+        lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
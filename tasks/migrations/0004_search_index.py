@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import migrations
+
+# The search index lives outside the ORM: an FTS5 virtual table on SQLite and
+# a tsvector table with a GIN index on PostgreSQL. Tasks are stored under
+# rowid ``2 * id`` and comments under ``2 * id + 1`` (see tasks/search.py).
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE tasks_search_index USING fts5("
+    "title, body, task_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')",
+    # Title matches weigh ten times more than description or comment text.
+    "INSERT INTO tasks_search_index (tasks_search_index, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO tasks_search_index (rowid, task_id, title, body) "
+    "SELECT 2 * id, id, title, description FROM tasks_task",
+    "INSERT INTO tasks_search_index (rowid, task_id, title, body) "
+    "SELECT 2 * id + 1, task_id, '', text FROM tasks_comment",
+]
+
+POSTGRESQL_FORWARD = [
+    "CREATE TABLE tasks_search_index ("
+    "id bigint PRIMARY KEY, task_id bigint NOT NULL, document tsvector NOT NULL)",
+    "CREATE INDEX tasks_search_index_document ON tasks_search_index "
+    "USING GIN (document)",
+    "INSERT INTO tasks_search_index (id, task_id, document) "
+    "SELECT 2 * id, id, setweight(to_tsvector(%(config)s::regconfig, title), 'A') "
+    "|| setweight(to_tsvector(%(config)s::regconfig, description), 'B') "
+    "FROM tasks_task",
+    "INSERT INTO tasks_search_index (id, task_id, document) "
+    "SELECT 2 * id + 1, task_id, setweight(to_tsvector(%(config)s::regconfig, text), 'B') "
+    "FROM tasks_comment",
+]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        statements, params = SQLITE_FORWARD, None
+    elif connection.vendor == "postgresql":
+        config = getattr(settings, "TASKS_SEARCH_CONFIG", "simple")
+        statements, params = POSTGRESQL_FORWARD, {"config": config}
+    else:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            if params and "%(config)s" in statement:
+                cursor.execute(statement, params)
+            else:
+                cursor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP TABLE IF EXISTS tasks_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 03:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_stats(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    Comment = apps.get_model("tasks", "Comment")
+    comments = Comment.objects.filter(task=OuterRef("pk")).order_by()
+    Task.objects.update(
+        comments_count=Coalesce(
+            Subquery(
+                comments.values("task").annotate(count=Count("pk")).values("count")
+            ),
+            0,
+        ),
+        last_activity_at=Coalesce(
+            Subquery(comments.order_by("-created_at").values("created_at")[:1]),
+            F("created_at"),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_comment_stats, migrations.RunPython.noop),
+    ]
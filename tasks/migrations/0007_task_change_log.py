@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0006_comment_task_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("created", "created"),
+                            ("updated", "updated"),
+                            ("completed", "completed"),
+                            ("assigned", "assigned"),
+                            ("deleted", "deleted"),
+                            ("comment_added", "comment_added"),
+                            ("comment_updated", "comment_updated"),
+                            ("comment_deleted", "comment_deleted"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["task_id", "kind", "id"], name="change_task_kind_idx"
+                    ),
+                    models.Index(fields=["created_at"], name="change_created_idx"),
+                ],
+            },
+        ),
+    ]
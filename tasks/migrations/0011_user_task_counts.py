@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 04:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("tasks", "0010_soft_delete"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserTaskCounts",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="task_counts",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("created_open", models.IntegerField(default=0)),
+                ("created_completed", models.IntegerField(default=0)),
+                ("assigned_open", models.IntegerField(default=0)),
+                ("assigned_completed", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
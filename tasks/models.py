@@ -1,9 +1,23 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 User = get_user_model()
 
 
+class TaskManager(models.Manager):
+    # Soft-deleted tasks are hidden everywhere; ``Task.all_objects`` (also the
+    # base manager, used by cascades) still sees them.
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
+class CommentManager(models.Manager):
+    # Comments of soft-deleted tasks are hidden with them.
+    def get_queryset(self):
+        return super().get_queryset().filter(task__deleted_at=None)
+
+
 class Task(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -20,12 +34,61 @@ class Task(models.Model):
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized from comments; maintained by tasks.signals and repaired
+    # by the recompute_task_stats command.
+    comments_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    # Set by tasks.deletion.soft_delete_tasks(); the row and its comments are
+    # purged later by the reap_deleted command.
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TaskManager()
+    all_objects = models.Manager()
+
+    # Columns behind the per-user counters (tasks.counters). Their values as
+    # loaded are kept, so that a later write can tell what it changed.
+    COUNTED_FIELDS = ("creator_id", "assignee_id", "is_completed", "deleted_at")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_values = instance.get_counted_values()
+        return instance
+
+    def get_counted_values(self):
+        # Deferred fields are left out rather than loaded.
+        return {
+            name: self.__dict__[name]
+            for name in self.COUNTED_FIELDS
+            if name in self.__dict__
+        }
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="task_created_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="task_updated_id_idx"),
+            models.Index(
+                fields=["assignee", "is_completed", "created_at"],
+                name="task_assignee_open_idx",
+            ),
+            models.Index(
+                fields=["creator", "created_at"], name="task_creator_created_idx"
+            ),
+            models.Index(
+                fields=["is_completed", "created_at"],
+                name="task_completed_created_idx",
+            ),
+            # The reaper's backlog.
+            models.Index(
+                fields=["deleted_at"],
+                name="task_deleted_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -34,8 +97,127 @@ class Comment(models.Model):
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CommentManager()
+    all_objects = models.Manager()
+
     def __str__(self):
         return f"Comment by {self.author} on {self.task}"
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="comment_created_id_idx"),
+            # GET /api/comments/?task= and the latest comments of a task.
+            models.Index(
+                fields=["task", "created_at", "id"], name="comment_task_created_idx"
+            ),
+        ]
+
+
+class TaskChange(models.Model):
+    # Append-only feed of task changes, read by GET /api/tasks/changes/.
+    # ``task_id`` is a plain column: entries outlive deleted tasks.
+    CREATED = "created"
+    UPDATED = "updated"
+    COMPLETED = "completed"
+    ASSIGNED = "assigned"
+    DELETED = "deleted"
+    COMMENT_ADDED = "comment_added"
+    COMMENT_UPDATED = "comment_updated"
+    COMMENT_DELETED = "comment_deleted"
+    KIND_CHOICES = [
+        (kind, kind)
+        for kind in (
+            CREATED,
+            UPDATED,
+            COMPLETED,
+            ASSIGNED,
+            DELETED,
+            COMMENT_ADDED,
+            COMMENT_UPDATED,
+            COMMENT_DELETED,
+        )
+    ]
+
+    task_id = models.BigIntegerField()
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.task_id}"
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["task_id", "kind", "id"], name="change_task_kind_idx"),
+            models.Index(fields=["created_at"], name="change_created_idx"),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    # How far the import_tasks run called ``name`` got: the number of input
+    # records handled, committed together with each chunk they were written in.
+    name = models.CharField(max_length=255, unique=True)
+    position = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.position}"
+
+
+class OutboxEvent(models.Model):
+    # An event for one webhook ``target``, written in the transaction of the
+    # change it describes and delivered by ``manage.py run_worker``. Delivered
+    # events are deleted; ``failed_at`` marks those that ran out of attempts.
+    TASK_COMPLETED = "task.completed"
+    TASK_ASSIGNED = "task.assigned"
+    COMMENT_CREATED = "comment.created"
+
+    topic = models.CharField(max_length=64)
+    payload = models.JSONField()
+    target = models.CharField(max_length=2048)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Next attempt; moved ahead while a worker holds the event (``claim``).
+    available_at = models.DateTimeField(default=timezone.now)
+    claim = models.CharField(max_length=32, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.topic} -> {self.target}"
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["failed_at", "available_at", "id"], name="outbox_pending_idx"
+            ),
+            models.Index(fields=["claim"], name="outbox_claim_idx"),
+        ]
+
+
+class UserDeletion(models.Model):
+    # A user removed with tasks.deletion.delete_user(): deactivated at once
+    # and deleted by the reap_deleted command once their tasks are purged.
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.user)
+
+
+class UserTaskCounts(models.Model):
+    # Per-user task counters behind GET /api/tasks/summary/, kept up to date
+    # by tasks.counters and repaired by the reconcile_task_counts command.
+    # Rows are created on first read.
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="task_counts"
+    )
+    created_open = models.IntegerField(default=0)
+    created_completed = models.IntegerField(default=0)
+    assigned_open = models.IntegerField(default=0)
+    assigned_completed = models.IntegerField(default=0)
+
+    def __str__(self):
+        return str(self.user)
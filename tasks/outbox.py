@@ -0,0 +1,142 @@
+import json
+import random
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+from tasks.models import OutboxEvent
+
+# Webhook events go through the outbox table: requests only INSERT them, in
+# the transaction of the change, and ``manage.py run_worker`` delivers them,
+# so request latency does not depend on the consumers. Delivery is at least
+# once; consumers can deduplicate on the X-Event-Id header.
+
+
+def get_setting(name, default):
+    return getattr(settings, f"TASKS_OUTBOX_{name}", default)
+
+
+def get_targets():
+    return getattr(settings, "TASKS_WEBHOOK_URLS", [])
+
+
+def enqueue(topic, payloads):
+    # One event per payload and target. Called inside the caller's
+    # transaction: the events are committed (or rolled back) with the change.
+    events = [
+        OutboxEvent(topic=topic, payload=payload, target=target)
+        for payload in payloads
+        for target in get_targets()
+    ]
+    if events:
+        OutboxEvent.objects.bulk_create(events, batch_size=500)
+
+
+def claim(limit):
+    # Leases up to ``limit`` due events to the caller. The UPDATE re-checks
+    # ``available_at``, so of several workers racing for an event only one
+    # gets it, and the event of a worker that died is due again once its
+    # lease runs out. Attempts are counted here for the same reason.
+    now = timezone.now()
+    due = OutboxEvent.objects.filter(failed_at=None, available_at__lte=now)
+    ids = list(due.order_by("available_at", "id").values_list("pk", flat=True)[:limit])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    due.filter(pk__in=ids).update(
+        claim=token,
+        available_at=now + timedelta(seconds=get_setting("LEASE", 300)),
+        attempts=F("attempts") + 1,
+    )
+    return list(OutboxEvent.objects.filter(claim=token))
+
+
+def get_body(event):
+    return json.dumps(
+        {
+            "id": event.pk,
+            "topic": event.topic,
+            "created_at": event.created_at,
+            "payload": event.payload,
+        },
+        cls=DjangoJSONEncoder,
+    ).encode()
+
+
+def deliver(event):
+    # POSTs the event to its target; returns None on success, else the error.
+    request = urllib.request.Request(
+        event.target,
+        data=get_body(event),
+        method="POST",
+        headers={
+            "Content-Type": "application/json",
+            "X-Event-Id": str(event.pk),
+            "X-Event-Topic": event.topic,
+        },
+    )
+    try:
+        with urllib.request.urlopen(
+            request, timeout=get_setting("TIMEOUT", 5)
+        ) as response:
+            response.read()
+    except urllib.error.HTTPError as error:
+        return f"HTTP {error.code}"
+    except (OSError, ValueError) as error:
+        return str(error) or type(error).__name__
+    return None
+
+
+def get_backoff(attempts):
+    # Exponential and capped, with jitter so that events failed together do
+    # not come back together.
+    delay = min(
+        get_setting("BACKOFF", 1.0) * 2 ** (attempts - 1),
+        get_setting("MAX_BACKOFF", 3600),
+    )
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def process_batch(executor, limit):
+    # Claims and delivers one batch, at most ``executor``'s worker count at a
+    # time. Returns the number of events per outcome (empty: nothing was due).
+    events = claim(limit)
+    results = Counter()
+    if not events:
+        return results
+    errors = list(executor.map(deliver, events))
+    now = timezone.now()
+    delivered = []
+    for event, error in zip(events, errors):
+        if error is None:
+            delivered.append(event.pk)
+            continue
+        # Only while the lease holds: after it, the event may be another's.
+        pending = OutboxEvent.objects.filter(pk=event.pk, claim=event.claim)
+        if event.attempts >= get_setting("MAX_ATTEMPTS", 10):
+            pending.update(claim="", last_error=error, failed_at=now)
+            results["failed"] += 1
+        else:
+            pending.update(
+                claim="",
+                last_error=error,
+                available_at=now + get_backoff(event.attempts),
+            )
+            results["retrying"] += 1
+    OutboxEvent.objects.filter(pk__in=delivered, claim=events[0].claim).delete()
+    results["delivered"] = len(delivered)
+    return results
+
+
+def retry_failed():
+    # Gives the events that ran out of attempts a new set of them.
+    return OutboxEvent.objects.exclude(failed_at=None).update(
+        failed_at=None, attempts=0, available_at=timezone.now()
+    )
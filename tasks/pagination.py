@@ -0,0 +1,214 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    CursorPagination,
+    LimitOffsetPagination,
+    _reverse_ordering,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple("Cursor", ["reverse", "position"])
+
+
+class KeysetPagination(CursorPagination):
+    # Unlike DRF's CursorPagination the cursor stores a value for every
+    # ordering field, so a page is always a plain index seek and never falls
+    # back to OFFSET when several rows share a timestamp.
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering[-1].lstrip("-") not in ("id", "pk"):
+            # A unique tie-breaker keeps positions total.
+            tie_breaker = "-id" if ordering[-1].startswith("-") else "id"
+            ordering = (*ordering, tie_breaker)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Same as paginate_queryset, for async views (see tasks.async_views).
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page([obj async for obj in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.cursor is not None:
+            position = self._parse_position(queryset.model, self.cursor.position)
+            queryset = queryset.filter(self._seek_filter(position, reverse))
+        # One extra row tells whether the following page exists.
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        reverse = self.cursor is not None and self.cursor.reverse
+        has_following = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+            return self.encode_cursor(Cursor(reverse=False, position=position))
+        # An empty reversed page: step forward from where it started.
+        return self.encode_cursor(self.cursor._replace(reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+            return self.encode_cursor(Cursor(reverse=True, position=position))
+        return self.encode_cursor(self.cursor._replace(reverse=True))
+
+    def get_link_from_instance(self, base_url, instance, reverse=False):
+        # A cursor link that starts right after (or, reversed, right before)
+        # ``instance``; used to point from embedded items to the full list.
+        self.base_url = base_url
+        position = self._get_position_from_instance(instance, self.ordering)
+        return self.encode_cursor(Cursor(reverse=reverse, position=position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position = tokens["p"]
+            reverse = bool(tokens.get("r", False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # Positions are written by _get_position_from_instance: plain scalars,
+        # never null (ordering fields are not nullable).
+        if not all(isinstance(value, (str, int, float)) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {"p": cursor.position}
+        if cursor.reverse:
+            tokens["r"] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(tokens, separators=(",", ":")).encode("ascii")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            if isinstance(instance, dict):
+                value = instance[field_name]
+            else:
+                value = getattr(instance, field_name)
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def _parse_position(self, model, position):
+        values = []
+        for order, value in zip(self.ordering, position):
+            field_name = order.lstrip("-")
+            if field_name == "pk":
+                field = model._meta.pk
+            else:
+                field = model._meta.get_field(field_name)
+            try:
+                values.append(field.to_python(value))
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _seek_filter(self, position, reverse):
+        # Rows strictly after ``position``, written as
+        # ``a <= x AND (a < x OR (a = x AND b < y))`` so that the leading
+        # column bounds an index range scan.
+        lookups = []
+        for order, value in zip(self.ordering, position):
+            descending = order.startswith("-") != reverse
+            lookups.append((order.lstrip("-"), "lt" if descending else "gt", value))
+
+        after = None
+        for field_name, op, value in reversed(lookups):
+            strictly = Q(**{f"{field_name}__{op}": value})
+            if after is not None:
+                strictly |= Q(**{field_name: value}) & after
+            after = strictly
+        field_name, op, value = lookups[0]
+        return Q(**{f"{field_name}__{op}e": value}) & after
+
+
+class TaskCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class CommentCursorPagination(KeysetPagination):
+    ordering = ("created_at", "id")
+
+
+class SearchPagination(LimitOffsetPagination):
+    # Ranked results have no stable keyset, so they are paged by offset.
+    # The total is never counted; one extra hit tells whether a next page exists.
+    default_limit = 20
+    max_limit = 100
+
+    def paginate_search(self, search, request):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        results = search(self.limit + 1, self.offset)
+        self.has_next = len(results) > self.limit
+        return results[: self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
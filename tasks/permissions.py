@@ -1,22 +1,66 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
 from rest_framework import permissions
 
 
-class IsCreatorOrAdmin(permissions.BasePermission):
+class OwnerPermission(permissions.BasePermission):
+    # Foreign key columns that grant access when they point at the user. Only
+    # the raw ``*_id`` columns are compared, so no related rows are loaded.
+    owner_fields = ()
+
     def has_object_permission(self, request, view, obj):
         if request.user.is_staff:
             return True
-        return obj.creator == request.user
+        user_pk = request.user.pk
+        return user_pk is not None and any(
+            getattr(obj, field) == user_pk for field in self.owner_fields
+        )
 
+    def get_permitted_ids(self, request, view, objs):
+        # Set-wise variant for bulk actions.
+        return {
+            obj.pk for obj in objs if self.has_object_permission(request, view, obj)
+        }
 
-class IsCreatorOrAssigneeOrAdmin(permissions.BasePermission):
-    def has_object_permission(self, request, view, obj):
+    def get_filter(self, request):
+        # The same rule as a queryset filter, for conditional UPDATEs and for
+        # listing only the objects the user may change.
         if request.user.is_staff:
-            return True
-        return obj.creator == request.user or obj.assignee == request.user
+            return Q()
+        if request.user.pk is None:
+            # ``assignee_id=None`` would match unassigned tasks.
+            return Q(pk__in=[])
+        return reduce(
+            or_, (Q(**{field: request.user.pk}) for field in self.owner_fields)
+        )
 
 
-class IsAuthorOrAdmin(permissions.BasePermission):
-    def has_object_permission(self, request, view, obj):
-        if request.user.is_staff:
-            return True
-        return obj.author == request.user
+class IsCreatorOrAdmin(OwnerPermission):
+    owner_fields = ("creator_id",)
+
+
+class IsCreatorOrAssigneeOrAdmin(OwnerPermission):
+    owner_fields = ("creator_id", "assignee_id")
+
+
+class IsAuthorOrAdmin(OwnerPermission):
+    owner_fields = ("author_id",)
+
+
+class ObjectPermissionMixin:
+    # Owner permission of each write action. ``get_permissions`` adds it to
+    # the view's own classes; ``PermissionFilterBackend`` and the bulk and
+    # conditional writes use its queryset filter.
+    object_permissions = {}
+
+    def get_object_permission(self, action=None):
+        permission_class = self.object_permissions.get(action or self.action)
+        return permission_class() if permission_class else None
+
+    def get_permissions(self):
+        permission = self.get_object_permission()
+        if permission is None:
+            return super().get_permissions()
+        return [*super().get_permissions(), permission]
@@ -0,0 +1,79 @@
+from django.db.models import Prefetch
+
+
+class Latest:
+    # A ``prefetch_related_fields`` value that loads only the first ``limit``
+    # related rows in ``ordering`` into ``to_attr``. ``limit`` may be a
+    # callable so that it can follow settings.
+    def __init__(self, serializer, to_attr, ordering, limit):
+        self.serializer = serializer
+        self.to_attr = to_attr
+        self.ordering = ordering
+        self.limit = limit
+
+    def get_limit(self):
+        return self.limit() if callable(self.limit) else self.limit
+
+
+def apply_fieldset(queryset, serializer_class, fieldset):
+    # Loads only the columns of the requested fields, and joins only the
+    # relations that are expanded; collapsed ones are read from the FK column.
+    expandable = getattr(serializer_class, "expandable_fields", {})
+    requested = fieldset.fields or serializer_class.Meta.fields
+    columns = list(fieldset.required)
+    select_related = []
+    for name in serializer_class.Meta.fields:
+        if name not in requested:
+            continue
+        if name in expandable and name in fieldset.expand:
+            select_related.append(name)
+            columns += [f"{name}__{field}" for field in expandable[name].Meta.fields]
+        else:
+            columns.append(name)
+    if select_related:
+        # select_related() without arguments would follow every non-null FK.
+        queryset = queryset.select_related(*select_related)
+    return queryset.only(*columns)
+
+
+def optimize_queryset(queryset, serializer_class, fieldset=None):
+    if fieldset is not None:
+        return apply_fieldset(queryset, serializer_class, fieldset)
+
+    # Serializers declare the relations they render through
+    # ``select_related_fields`` (forward FKs) and ``prefetch_related_fields``
+    # (reverse relations, mapped to the serializer used for each item).
+    select_related = getattr(serializer_class, "select_related_fields", ())
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+
+    prefetch_related = getattr(serializer_class, "prefetch_related_fields", {})
+    for lookup, spec in prefetch_related.items():
+        child_serializer = getattr(spec, "serializer", spec)
+        related_model = queryset.model._meta.get_field(lookup).related_model
+        child_queryset = optimize_queryset(
+            related_model._default_manager.all(), child_serializer
+        )
+        if isinstance(spec, Latest):
+            # Sliced prefetches are limited per parent row (ROW_NUMBER()).
+            child_queryset = child_queryset.order_by(*spec.ordering)
+            prefetch = Prefetch(
+                lookup,
+                queryset=child_queryset[: spec.get_limit()],
+                to_attr=spec.to_attr,
+            )
+        else:
+            prefetch = Prefetch(lookup, queryset=child_queryset)
+        queryset = queryset.prefetch_related(prefetch)
+    return queryset
+
+
+class QueryPlanMixin:
+    def get_queryset(self):
+        return optimize_queryset(
+            super().get_queryset(), self.get_serializer_class(), self.get_fieldset()
+        )
+
+    def get_fieldset(self):
+        # Overridden by ``SparseFieldsetMixin``.
+        return None
@@ -0,0 +1,134 @@
+import csv
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def format_event(data=None, event_id=None, event=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    if data is not None:
+        payload = json.dumps(data, cls=JSONEncoder, ensure_ascii=False)
+        lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    # Renders a change feed page ({"cursor", "results"}) as server-sent
+    # events, one per change. The event ids are cursors, so a reconnecting
+    # EventSource resumes through its Last-Event-ID header.
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+    # How soon (ms) an EventSource reconnects after the response ends.
+    retry = 1000
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if "results" in data:
+            body = self.render_feed(data)
+        else:
+            # Errors, e.g. an expired cursor.
+            body = format_event(data, event="error")
+        return f"retry: {self.retry}\n\n{body}".encode()
+
+    def render_feed(self, data):
+        events = [
+            format_event(change, event_id=change["cursor"])
+            for change in data["results"]
+        ]
+        if not events:
+            # Moves the client's last event id forward without an event.
+            events.append(format_event(event_id=data["cursor"]))
+        return "".join(events)
+
+
+class FastJSONRenderer(JSONRenderer):
+    # JSONRenderer through orjson when it is installed, with the same bytes:
+    # compact, unescaped unicode, DRF's encoding of datetimes and other
+    # types (passed through to JSONEncoder.default) and escaped U+2028/2029.
+    # Anything else (indent, ASCII output, values orjson rejects) falls back
+    # to JSONRenderer.
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON)
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
+
+
+class Echo:
+    # A file-like object for csv.writer that returns the line instead of
+    # buffering it.
+    def write(self, value):
+        return value
+
+
+class RowRenderer(BaseRenderer):
+    # Renders flat rows one at a time (see tasks.export). render() handles
+    # the rest: a list of dicts, or a single dict.
+    charset = "utf-8"
+
+    def render_header(self, columns):
+        return ""
+
+    def render_row(self, columns, row):
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        columns = list(items[0]) if items else []
+        lines = [self.render_header(columns)]
+        lines += [self.render_row(columns, list(item.values())) for item in items]
+        return "".join(lines).encode(self.charset)
+
+
+class NDJSONRenderer(RowRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render_row(self, columns, row):
+        item = dict(zip(columns, row))
+        return json.dumps(item, cls=JSONEncoder, ensure_ascii=False) + "\n"
+
+
+class CSVRenderer(RowRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def __init__(self):
+        self.writer = csv.writer(Echo())
+
+    def render_header(self, columns):
+        return self.writer.writerow(columns)
+
+    def render_row(self, columns, row):
+        return self.writer.writerow(
+            [str(value).lower() if isinstance(value, bool) else value for value in row]
+        )
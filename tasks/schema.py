@@ -0,0 +1,8 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+# OpenAPI extensions, registered on import (see TasksConfig.ready()).
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    # The same bearer scheme ("jwtAuth") as simplejwt's JWTAuthentication.
+    target_class = "tasks.authentication.CachedJWTAuthentication"
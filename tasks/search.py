@@ -0,0 +1,139 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+
+# Task and comment documents share one index. Their keys never collide:
+# a task is stored under ``2 * id`` and a comment under ``2 * id + 1``.
+TABLE = "tasks_search_index"
+
+
+def task_key(task_id):
+    return 2 * task_id
+
+
+def comment_key(comment_id):
+    return 2 * comment_id + 1
+
+
+def tokenize(query):
+    return re.findall(r"\w+", query)
+
+
+class SQLiteSearchBackend:
+    # FTS5 virtual table, created by migration 0004.
+    def index(self, rows):
+        # ``rows`` are (key, task_id, title, body) tuples.
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {TABLE} (rowid, task_id, title, body) "
+                "VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, keys):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {TABLE} WHERE rowid = %s", [(key,) for key in keys]
+            )
+
+    def search(self, query, limit, offset):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Every term must match; quoting keeps FTS5 syntax out of user input.
+        match = " ".join(f'"{term}"' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT task_id, MIN(rank) AS score FROM {TABLE} "
+                f"WHERE {TABLE} MATCH %s "
+                "GROUP BY task_id ORDER BY score, task_id LIMIT %s OFFSET %s",
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend:
+    # tsvector documents with a GIN index, created by migration 0004.
+    def __init__(self):
+        self.config = getattr(settings, "TASKS_SEARCH_CONFIG", "simple")
+
+    def index(self, rows):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (id, task_id, document) VALUES "
+                "(%s, %s, setweight(to_tsvector(%s::regconfig, %s), 'A') "
+                "|| setweight(to_tsvector(%s::regconfig, %s), 'B')) "
+                "ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document",
+                [
+                    (key, task_id, self.config, title, self.config, body)
+                    for key, task_id, title, body in rows
+                ],
+            )
+
+    def remove(self, keys):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE id = ANY(%s)", [list(keys)])
+
+    def search(self, query, limit, offset):
+        if not tokenize(query):
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT task_id, MAX(ts_rank(document, query)) AS score "
+                f"FROM {TABLE}, plainto_tsquery(%s::regconfig, %s) query "
+                "WHERE document @@ query "
+                "GROUP BY task_id ORDER BY score DESC, task_id LIMIT %s OFFSET %s",
+                [self.config, query, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def get_search_backend():
+    if connection.vendor == "sqlite":
+        return SQLiteSearchBackend()
+    if connection.vendor == "postgresql":
+        return PostgreSQLSearchBackend()
+    return None
+
+
+def index_tasks(tasks):
+    backend = get_search_backend()
+    if backend is not None:
+        backend.index(
+            [
+                (task_key(task.pk), task.pk, task.title, task.description)
+                for task in tasks
+            ]
+        )
+
+
+def index_comments(comments):
+    backend = get_search_backend()
+    if backend is not None:
+        backend.index(
+            [
+                (comment_key(comment.pk), comment.task_id, "", comment.text)
+                for comment in comments
+            ]
+        )
+
+
+def remove_tasks(task_ids):
+    backend = get_search_backend()
+    if backend is not None:
+        backend.remove([task_key(task_id) for task_id in task_ids])
+
+
+def remove_comments(comment_ids):
+    backend = get_search_backend()
+    if backend is not None:
+        backend.remove([comment_key(comment_id) for comment_id in comment_ids])
+
+
+def search_tasks(query, limit, offset=0):
+    # Returns ranked task ids, best match first.
+    backend = get_search_backend()
+    if backend is None:
+        return []
+    return backend.search(query, limit, offset)
@@ -1,7 +1,15 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 
+from tasks.fieldsets import SparseFieldsetSerializerMixin
 from tasks.models import Comment, Task
+from tasks.pagination import CommentCursorPagination
+from tasks.query_plan import Latest
 
 User = get_user_model()
 
@@ -12,9 +20,12 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email"]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
 
+    select_related_fields = ["author"]
+    expandable_fields = {"author": UserSerializer}
+
     class Meta:
         model = Comment
         fields = ["id", "task", "author", "text", "created_at"]
@@ -25,10 +36,13 @@ class CommentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     assignee = UserSerializer(read_only=True)
 
+    select_related_fields = ["creator", "assignee"]
+    expandable_fields = {"creator": UserSerializer, "assignee": UserSerializer}
+
     class Meta:
         model = Task
         fields = [
@@ -38,13 +52,32 @@ class TaskListSerializer(serializers.ModelSerializer):
             "assignee",
             "is_completed",
             "created_at",
+            "comments_count",
+            "last_activity_at",
         ]
 
 
+def detail_comments_limit():
+    return getattr(settings, "TASKS_DETAIL_COMMENTS_LIMIT", 20)
+
+
 class TaskDetailSerializer(serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     assignee = UserSerializer(read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    # Only the latest comments are embedded (oldest first); ``comments_next``
+    # links to the older ones in GET /api/comments/?task=.
+    comments = serializers.SerializerMethodField()
+    comments_next = serializers.SerializerMethodField(allow_null=True)
+
+    select_related_fields = ["creator", "assignee"]
+    prefetch_related_fields = {
+        "comments": Latest(
+            CommentSerializer,
+            to_attr="latest_comments",
+            ordering=["-created_at", "-id"],
+            limit=detail_comments_limit,
+        )
+    }
 
     class Meta:
         model = Task
@@ -57,9 +90,40 @@ class TaskDetailSerializer(serializers.ModelSerializer):
             "is_completed",
             "created_at",
             "updated_at",
+            "comments_count",
             "comments",
+            "comments_next",
         ]
 
+    def get_latest_comments(self, obj):
+        latest = getattr(obj, "latest_comments", None)
+        if latest is None:
+            # Not loaded through the query plan (e.g. a freshly saved task).
+            latest = list(
+                obj.comments.select_related("author").order_by("-created_at", "-id")[
+                    : detail_comments_limit()
+                ]
+            )
+            obj.latest_comments = latest
+        return latest[::-1]
+
+    @extend_schema_field(CommentSerializer(many=True))
+    def get_comments(self, obj):
+        return CommentSerializer(
+            self.get_latest_comments(obj), many=True, context=self.context
+        ).data
+
+    @extend_schema_field(OpenApiTypes.URI)
+    def get_comments_next(self, obj):
+        comments = self.get_latest_comments(obj)
+        if not comments or obj.comments_count <= len(comments):
+            return None
+        url = reverse("comment-list", request=self.context.get("request"))
+        url = replace_query_param(url, "task", obj.pk)
+        return CommentCursorPagination().get_link_from_instance(
+            url, comments[0], reverse=True
+        )
+
 
 class TaskCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -71,15 +135,43 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class TaskCountsSerializer(serializers.Serializer):
+    open = serializers.IntegerField()
+    completed = serializers.IntegerField()
+    total = serializers.IntegerField()
+
+
+class TaskSummarySerializer(serializers.Serializer):
+    assigned_to_me = TaskCountsSerializer()
+    created_by_me = TaskCountsSerializer()
+
+
 class AssignSerializer(serializers.Serializer):
     assignee_id = serializers.IntegerField()
 
     def validate_assignee_id(self, value):
-        if not User.objects.filter(id=value).exists():
+        # Bulk callers resolve every assignee up front and pass them in;
+        # TaskViewSet.assign checks it in its UPDATE (check_exists=False).
+        if not self.context.get("check_exists", True):
+            return value
+        users = self.context.get("users")
+        if users is not None:
+            exists = value in users
+        else:
+            exists = User.objects.filter(id=value).exists()
+        if not exists:
             raise serializers.ValidationError("User does not exist")
         return value
 
 
+class TaskIdSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+
+
+class BulkAssignSerializer(AssignSerializer):
+    id = serializers.IntegerField()
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
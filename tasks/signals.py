@@ -0,0 +1,340 @@
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from tasks import authentication, cache, changes, counters, outbox, search
+from tasks.models import Comment, OutboxEvent, Task, TaskChange
+
+User = get_user_model()
+
+# Sent by bulk write paths that bypass Model.save()/delete(), so that derived
+# state (search index, caches, ...) can follow along. ``tasks`` is a list of
+# Task instances as written; ``fields`` lists the updated columns.
+tasks_bulk_created = Signal()
+tasks_bulk_updated = Signal()
+# ``comments``: the Comment instances written by bulk_create().
+comments_bulk_created = Signal()
+# ``tasks``: the tasks soft-deleted by tasks.deletion.soft_delete_tasks(), as
+# loaded before.
+tasks_bulk_deleted = Signal()
+
+SEARCH_FIELDS = {"title", "description"}
+BULK_STATS_BATCH_SIZE = 500
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        search.index_tasks([instance])
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, **kwargs):
+    search.remove_tasks([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    search.index_comments([instance])
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance, created, **kwargs):
+    # Comments are part of the task representation, so any change to them
+    # moves Task.updated_at (and with it the task's ETag). New comments also
+    # bump the denormalized counters in the same statement.
+    changes = {"updated_at": timezone.now()}
+    if created:
+        changes.update(
+            comments_count=F("comments_count") + 1,
+            last_activity_at=instance.created_at,
+        )
+    Task.objects.filter(pk=instance.task_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def record_comment_removal(sender, instance, **kwargs):
+    Task.objects.filter(pk=instance.task_id, comments_count__gt=0).update(
+        comments_count=F("comments_count") - 1, updated_at=timezone.now()
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.remove_comments([instance.pk])
+
+
+@receiver(tasks_bulk_created, sender=Task)
+def index_created_tasks(sender, tasks, **kwargs):
+    search.index_tasks(tasks)
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def index_updated_tasks(sender, tasks, fields, **kwargs):
+    if SEARCH_FIELDS & set(fields):
+        search.index_tasks(tasks)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task(sender, instance, **kwargs):
+    cache.invalidate_tasks([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_task(sender, instance, **kwargs):
+    cache.invalidate_tasks([instance.task_id])
+
+
+@receiver(tasks_bulk_created, sender=Task)
+@receiver(tasks_bulk_updated, sender=Task)
+def invalidate_bulk_tasks(sender, tasks, **kwargs):
+    cache.invalidate_tasks([task.pk for task in tasks])
+
+
+@receiver(tasks_bulk_deleted, sender=Task)
+def invalidate_deleted_tasks(sender, tasks, **kwargs):
+    cache.invalidate_tasks([task.pk for task in tasks])
+
+
+@receiver(tasks_bulk_deleted, sender=Task)
+def unindex_deleted_tasks(sender, tasks, **kwargs):
+    # Comment documents go when the reaper purges the comments; until then
+    # search results skip the hidden tasks.
+    search.remove_tasks([task.pk for task in tasks])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    # Users are nested into every task representation.
+    cache.invalidate_all()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    authentication.invalidate_user(instance.pk)
+
+
+# User fields nested into task representations (UserSerializer).
+REPRESENTED_USER_FIELDS = ("username", "email")
+
+
+def touch_user_tasks(user_id):
+    # Like a comment, a nested user is part of the task representation: a
+    # change to it moves Task.updated_at, and with it the ETags and
+    # Last-Modified of the tasks the user created, is assigned or commented.
+    commented = Comment.objects.filter(author_id=user_id).values("task_id")
+    Task.objects.filter(
+        Q(creator_id=user_id) | Q(assignee_id=user_id) | Q(pk__in=commented)
+    ).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=User)
+def check_represented_user_fields(sender, instance, update_fields=None, **kwargs):
+    # Compared with the stored row, so that saves of other fields (such as
+    # last_login) leave the tasks alone.
+    instance.representation_changed = False
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+        REPRESENTED_USER_FIELDS
+    ):
+        return
+    stored = (
+        User.objects.filter(pk=instance.pk)
+        .values_list(*REPRESENTED_USER_FIELDS)
+        .first()
+    )
+    current = tuple(getattr(instance, name) for name in REPRESENTED_USER_FIELDS)
+    instance.representation_changed = stored is not None and stored != current
+
+
+@receiver(post_save, sender=User)
+def touch_tasks_of_changed_user(sender, instance, **kwargs):
+    if getattr(instance, "representation_changed", False):
+        touch_user_tasks(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def touch_tasks_of_deleted_user(sender, instance, **kwargs):
+    # Before the deletion nulls Task.assignee with a plain UPDATE; in the
+    # same transaction.
+    touch_user_tasks(instance.pk)
+
+
+def change_kinds(fields):
+    # Feed entry kinds for an update of ``fields`` (None: unknown, any field).
+    if fields is None:
+        return [TaskChange.UPDATED]
+    fields = set(fields) - {"updated_at"}
+    kinds = []
+    if "is_completed" in fields:
+        kinds.append(TaskChange.COMPLETED)
+    if fields & {"assignee", "assignee_id"}:
+        kinds.append(TaskChange.ASSIGNED)
+    if fields - {"is_completed", "assignee", "assignee_id"} or not kinds:
+        kinds.append(TaskChange.UPDATED)
+    return kinds
+
+
+@receiver(post_save, sender=Task)
+def record_task_change(sender, instance, created, update_fields=None, **kwargs):
+    kinds = [TaskChange.CREATED] if created else change_kinds(update_fields)
+    for kind in kinds:
+        changes.record(kind, [instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def record_task_deletion(sender, instance, **kwargs):
+    changes.record(TaskChange.DELETED, [instance.pk])
+
+
+@receiver(tasks_bulk_deleted, sender=Task)
+def record_soft_deletion(sender, tasks, **kwargs):
+    changes.record(TaskChange.DELETED, [task.pk for task in tasks])
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_change(sender, instance, created, **kwargs):
+    kind = TaskChange.COMMENT_ADDED if created else TaskChange.COMMENT_UPDATED
+    changes.record(kind, [instance.task_id])
+
+
+@receiver(post_delete, sender=Comment)
+def record_comment_deletion(sender, instance, **kwargs):
+    changes.record(TaskChange.COMMENT_DELETED, [instance.task_id])
+
+
+@receiver(tasks_bulk_created, sender=Task)
+def record_bulk_creation(sender, tasks, **kwargs):
+    changes.record(TaskChange.CREATED, [task.pk for task in tasks])
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def record_bulk_update(sender, tasks, fields, **kwargs):
+    for kind in change_kinds(fields):
+        changes.record(kind, [task.pk for task in tasks])
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def record_bulk_comment_activity(sender, comments, **kwargs):
+    # record_comment_activity() for a batch. Tasks are grouped by the number
+    # of comments they received, so there is one UPDATE per count per
+    # BULK_STATS_BATCH_SIZE tasks; last_activity_at is read from the newest
+    # comment through the (task, created_at) index.
+    added = Counter(comment.task_id for comment in comments)
+    by_count = defaultdict(list)
+    for task_id, count in added.items():
+        by_count[count].append(task_id)
+    newest = (
+        Comment.objects.filter(task_id=OuterRef("pk"))
+        .order_by("-created_at")
+        .values("created_at")[:1]
+    )
+    now = timezone.now()
+    for count, task_ids in by_count.items():
+        for start in range(0, len(task_ids), BULK_STATS_BATCH_SIZE):
+            Task.objects.filter(
+                pk__in=task_ids[start : start + BULK_STATS_BATCH_SIZE]
+            ).update(
+                comments_count=F("comments_count") + count,
+                last_activity_at=Greatest(F("last_activity_at"), Subquery(newest)),
+                updated_at=now,
+            )
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def index_created_comments(sender, comments, **kwargs):
+    search.index_comments(comments)
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def invalidate_bulk_comment_tasks(sender, comments, **kwargs):
+    cache.invalidate_tasks({comment.task_id for comment in comments})
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def record_bulk_comments(sender, comments, **kwargs):
+    changes.record(TaskChange.COMMENT_ADDED, [comment.task_id for comment in comments])
+
+
+def comment_event(comment):
+    return {
+        "comment_id": comment.pk,
+        "task_id": comment.task_id,
+        "author_id": comment.author_id,
+    }
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def enqueue_task_events(sender, tasks, fields, **kwargs):
+    # Sent inside the transaction of the update (see TaskViewSet.transition).
+    kinds = change_kinds(fields)
+    if TaskChange.COMPLETED in kinds:
+        outbox.enqueue(
+            OutboxEvent.TASK_COMPLETED, [{"task_id": task.pk} for task in tasks]
+        )
+    if TaskChange.ASSIGNED in kinds:
+        outbox.enqueue(
+            OutboxEvent.TASK_ASSIGNED,
+            [{"task_id": task.pk, "assignee_id": task.assignee_id} for task in tasks],
+        )
+
+
+@receiver(post_save, sender=Comment)
+def enqueue_comment_event(sender, instance, created, **kwargs):
+    if created:
+        outbox.enqueue(OutboxEvent.COMMENT_CREATED, [comment_event(instance)])
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def enqueue_bulk_comment_events(sender, comments, **kwargs):
+    outbox.enqueue(
+        OutboxEvent.COMMENT_CREATED, [comment_event(comment) for comment in comments]
+    )
+
+
+# Per-user counters: each write is compared with the task's values as loaded
+# (Task.loaded_values); instances that were not loaded count as unknown.
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, "loaded_values", {})
+    instance.loaded_values = instance.get_counted_values()
+    counters.record([(before, instance.loaded_values)])
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    counters.record(
+        [(getattr(instance, "loaded_values", instance.get_counted_values()), None)]
+    )
+
+
+@receiver(tasks_bulk_created, sender=Task)
+def count_created_tasks(sender, tasks, **kwargs):
+    counters.record([(None, task.get_counted_values()) for task in tasks])
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def count_updated_tasks(sender, tasks, **kwargs):
+    written = []
+    for task in tasks:
+        after = task.get_counted_values()
+        written.append((getattr(task, "loaded_values", {}), after))
+        task.loaded_values = after
+    counters.record(written)
+
+
+@receiver(tasks_bulk_deleted, sender=Task)
+def count_soft_deleted_tasks(sender, tasks, **kwargs):
+    counters.record([(task.loaded_values, None) for task in tasks])
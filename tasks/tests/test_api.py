@@ -34,7 +34,7 @@ class TaskAPITest(APITestCase):
         self.client.force_authenticate(user=self.user1)
         response = self.client.get("/api/tasks/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_retrieve_task(self):
         task = Task.objects.create(title="Task", creator=self.user1)
@@ -143,7 +143,7 @@ class CommentAPITest(APITestCase):
         self.client.force_authenticate(user=self.user1)
         response = self.client.get(f"/api/comments/?task={self.task.id}")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_delete_own_comment(self):
         comment = Comment.objects.create(
@@ -195,3 +195,17 @@ class AuthAPITest(APITestCase):
     def test_unauthenticated_request_forbidden(self):
         response = self.client.get("/api/tasks/")
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SchemaTest(APITestCase):
+    def test_task_detail_documents_embedded_comments(self):
+        response = self.client.get("/api/schema/", {"format": "json"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        properties = response.json()["components"]["schemas"]["TaskDetail"][
+            "properties"
+        ]
+        self.assertEqual(
+            properties["comments"]["items"], {"$ref": "#/components/schemas/Comment"}
+        )
+        self.assertEqual(properties["comments_next"]["format"], "uri")
+        self.assertTrue(properties["comments_next"]["nullable"])
@@ -0,0 +1,144 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks import cache
+from tasks.models import Comment, Task
+from tasks.urls import async_urlpatterns, router
+
+User = get_user_model()
+
+# The URLconf used under ASGI (TASKS_ASYNC_READS).
+urlpatterns = [path("api/", include([*async_urlpatterns, *router.urls]))]
+
+DUMMY_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "tasks": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "auth": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+@override_settings(ROOT_URLCONF=__name__, CACHES=DUMMY_CACHES)
+class AsyncReadViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.other = User.objects.create_user(username="other", password="pass123")
+        cls.task = Task.objects.create(
+            title="Task", creator=cls.user, assignee=cls.other
+        )
+        Task.objects.create(title="Other", creator=cls.other)
+        for i in range(3):
+            Comment.objects.create(task=cls.task, author=cls.other, text=f"C{i}")
+
+    def setUp(self):
+        token = AccessToken.for_user(self.user)
+        self.auth = {"Authorization": f"Bearer {token}"}
+
+    @sync_to_async
+    def sync_get(self, url):
+        # The same request through the regular DRF viewsets.
+        with self.settings(ROOT_URLCONF="config.urls"):
+            return self.client.get(url, headers=self.auth)
+
+    async def test_task_list_matches_sync_view(self):
+        url = "/api/tasks/?page_size=1"
+        response = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await self.sync_get(url)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response["ETag"], expected["ETag"])
+
+    async def test_task_list_not_modified(self):
+        first = await self.async_client.get("/api/tasks/", headers=self.auth)
+        response = await self.async_client.get(
+            "/api/tasks/", headers={**self.auth, "If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_task_list_filters(self):
+        response = await self.async_client.get(
+            f"/api/tasks/?creator={self.other.id}", headers=self.auth
+        )
+        self.assertEqual(
+            [item["title"] for item in response.json()["results"]], ["Other"]
+        )
+
+    async def test_task_detail_matches_sync_view(self):
+        url = f"/api/tasks/{self.task.id}/"
+        response = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await self.sync_get(url)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(len(response.json()["comments"]), 3)
+
+    async def test_task_detail_not_modified(self):
+        url = f"/api/tasks/{self.task.id}/"
+        first = await self.async_client.get(url, headers=self.auth)
+        response = await self.async_client.get(
+            url, headers={**self.auth, "If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_task_detail_not_found(self):
+        for pk in ("999999", "abc"):
+            response = await self.async_client.get(
+                f"/api/tasks/{pk}/", headers=self.auth
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_comment_list(self):
+        response = await self.async_client.get(
+            f"/api/comments/?task={self.task.id}&page_size=2", headers=self.auth
+        )
+        data = response.json()
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNotNone(data["next"])
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get("/api/tasks/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.get(
+            "/api/tasks/", headers={"Authorization": "Bearer not-a-token"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_inactive_user_is_rejected(self):
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        response = await self.async_client.get("/api/tasks/", headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_writes_go_to_the_viewset(self):
+        response = await self.async_client.post(
+            "/api/tasks/",
+            {"title": "New"},
+            content_type="application/json",
+            headers=self.auth,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await Task.objects.filter(title="New").aexists())
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncReadCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.task = Task.objects.create(title="Task", creator=cls.user)
+
+    def setUp(self):
+        cache.get_cache().clear()
+        token = AccessToken.for_user(self.user)
+        self.auth = {"Authorization": f"Bearer {token}"}
+
+    async def test_detail_is_cached(self):
+        url = f"/api/tasks/{self.task.id}/"
+        first = await self.async_client.get(url, headers=self.auth)
+        await Task.objects.filter(pk=self.task.pk).aupdate(title="Changed")
+        # Not invalidated: a queryset update bypasses the signals.
+        second = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["ETag"], first["ETag"])
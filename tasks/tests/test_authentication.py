@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks import authentication, metrics
+from tasks.tests.test_async_views import DUMMY_CACHES
+
+User = get_user_model()
+
+AUTH_CACHES = {
+    **DUMMY_CACHES,
+    "auth": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=AUTH_CACHES)
+class CachedJWTAuthenticationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+
+    def setUp(self):
+        authentication.get_auth_cache().clear()
+        metrics.reset()
+        self.authorize(self.user)
+
+    def authorize(self, user):
+        token = AccessToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_hit_skips_user_query(self):
+        with CaptureQueriesContext(connection) as first:
+            self.client.get("/api/tasks/")
+        with self.assertNumQueries(len(first) - 1):
+            response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(authentication.get_stats(), {"hits": 1, "misses": 1})
+
+    def test_tokens_of_a_user_share_the_entry(self):
+        self.client.get("/api/tasks/")
+        self.authorize(self.user)
+        self.client.get("/api/tasks/")
+        self.assertEqual(authentication.get_stats(), {"hits": 1, "misses": 1})
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get("/api/tasks/")
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        user = User.objects.create_user(username="gone", password="pass123")
+        self.authorize(user)
+        self.client.get("/api/tasks/")
+        user.delete()
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_changes_to_user_are_seen(self):
+        self.client.get("/api/tasks/")
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get("/api/cache/stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_password_change_rejects_old_tokens(self):
+        with mock.patch.object(authentication.jwt_settings, "CHECK_REVOKE_TOKEN", True):
+            self.authorize(self.user)
+            self.assertEqual(self.client.get("/api/tasks/").status_code, 200)
+            self.assertEqual(self.client.get("/api/tasks/").status_code, 200)
+            self.user.set_password("changed123")
+            self.user.save()
+            response = self.client.get("/api/tasks/")
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.authorize(self.user)
+            self.assertEqual(self.client.get("/api/tasks/").status_code, 200)
+
+    def test_stats(self):
+        admin = User.objects.create_user(
+            username="admin", password="pass123", is_staff=True
+        )
+        self.authorize(admin)
+        self.client.get("/api/cache/stats/")
+        response = self.client.get("/api/cache/stats/")
+        self.assertEqual(response.data["auth"], {"hits": 1, "misses": 1})
+
+
+@override_settings(ROOT_URLCONF="tasks.tests.test_async_views", CACHES=AUTH_CACHES)
+class AsyncCachedJWTAuthenticationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+
+    def setUp(self):
+        authentication.get_auth_cache().clear()
+        metrics.reset()
+        token = AccessToken.for_user(self.user)
+        self.auth = {"Authorization": f"Bearer {token}"}
+
+    async def test_hit_skips_user_query(self):
+        await self.async_client.get("/api/tasks/", headers=self.auth)
+        response = await self.async_client.get("/api/tasks/", headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(authentication.get_stats(), {"hits": 1, "misses": 1})
+
+    async def test_deactivated_user_is_rejected(self):
+        await self.async_client.get("/api/tasks/", headers=self.auth)
+        self.user.is_active = False
+        await self.user.asave()
+        response = await self.async_client.get("/api/tasks/", headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
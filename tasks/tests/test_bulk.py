@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class BulkTaskAPITest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user1 = User.objects.create_user(username="user1", password="pass123")
+        cls.user2 = User.objects.create_user(username="user2", password="pass123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user1)
+
+    def test_bulk_create(self):
+        data = [{"title": f"Task {i}", "description": "Imported"} for i in range(5)]
+        # One of them updates the creator's counters, one logs the change.
+        with self.assertNumQueries(6):
+            response = self.client.post("/api/tasks/bulk_create/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(Task.objects.filter(creator=self.user1).count(), 5)
+
+    def test_bulk_create_reports_item_errors(self):
+        data = [{"title": "Valid"}, {"description": "No title"}]
+        response = self.client.post("/api/tasks/bulk_create/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("title", response.data[1])
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_bulk_create_rejects_non_list(self):
+        response = self.client.post(
+            "/api/tasks/bulk_create/", {"title": "Task"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        tasks = [Task.objects.create(title="Old", creator=self.user1) for _ in range(3)]
+        data = [{"id": task.id, "title": f"New {task.id}"} for task in tasks]
+        response = self.client.post("/api/tasks/bulk_update/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for task in tasks:
+            task.refresh_from_db()
+            self.assertEqual(task.title, f"New {task.id}")
+
+    def test_bulk_update_other_user_task_forbidden(self):
+        own = Task.objects.create(title="Own", creator=self.user1)
+        other = Task.objects.create(title="Other", creator=self.user2)
+        data = [{"id": own.id, "title": "A"}, {"id": other.id, "title": "B"}]
+        response = self.client.post("/api/tasks/bulk_update/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("id", response.data[1])
+        own.refresh_from_db()
+        self.assertEqual(own.title, "Own")
+
+    def test_bulk_complete(self):
+        created = Task.objects.create(title="Created", creator=self.user1)
+        assigned = Task.objects.create(
+            title="Assigned", creator=self.user2, assignee=self.user1
+        )
+        data = [{"id": created.id}, {"id": assigned.id}]
+        # Two of them update the counters of the two users, one logs the
+        # changes.
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                "/api/tasks/bulk_complete/", data, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Task.objects.filter(is_completed=True).count(), 2)
+
+    def test_bulk_complete_reports_missing_and_duplicate_ids(self):
+        task = Task.objects.create(title="Task", creator=self.user1)
+        data = [{"id": task.id}, {"id": task.id}, {"id": 9999}, {"id": "x"}]
+        response = self.client.post("/api/tasks/bulk_complete/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(len([e for e in response.data if e]), 3)
+        self.assertFalse(Task.objects.filter(is_completed=True).exists())
+
+    def test_bulk_assign(self):
+        tasks = [
+            Task.objects.create(title="Task", creator=self.user1) for _ in range(3)
+        ]
+        data = [{"id": task.id, "assignee_id": self.user2.id} for task in tasks]
+        # One of them updates the assignee's counters, one logs the changes.
+        with self.assertNumQueries(7):
+            response = self.client.post("/api/tasks/bulk_assign/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Task.objects.filter(assignee=self.user2).count(), 3)
+
+    def test_bulk_assign_nonexistent_user(self):
+        task = Task.objects.create(title="Task", creator=self.user1)
+        data = [{"id": task.id, "assignee_id": 9999}]
+        response = self.client.post("/api/tasks/bulk_assign/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("assignee_id", response.data[0])
+
+    def test_bulk_admin_can_complete_any_task(self):
+        admin = User.objects.create_user(
+            username="admin", password="pass123", is_staff=True
+        )
+        task = Task.objects.create(title="Task", creator=self.user2)
+        self.client.force_authenticate(user=admin)
+        response = self.client.post(
+            "/api/tasks/bulk_complete/", [{"id": task.id}], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
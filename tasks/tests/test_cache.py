@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks import cache, metrics
+from tasks.models import Comment, Task
+
+User = get_user_model()
+
+
+class ResponseCacheTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.admin = User.objects.create_user(
+            username="admin", password="pass123", is_staff=True
+        )
+
+    def setUp(self):
+        cache.get_cache().clear()
+        metrics.reset()
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(title="Task", creator=self.user)
+        self.url = f"/api/tasks/{self.task.id}/"
+
+    def test_detail_hit_skips_database(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_detail_hit_answers_conditional_request(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_task_save_invalidates_detail_and_list(self):
+        self.client.get(self.url)
+        self.client.get("/api/tasks/")
+        self.client.patch(self.url, {"title": "Renamed"})
+        self.assertEqual(self.client.get(self.url).data["title"], "Renamed")
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.data["results"][0]["title"], "Renamed")
+
+    def test_complete_and_assign_invalidate_detail(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        self.client.get(self.url)
+        self.client.post(f"{self.url}complete/")
+        self.assertTrue(self.client.get(self.url).data["is_completed"])
+        self.client.post(f"{self.url}assign/", {"assignee_id": other.id})
+        self.assertEqual(self.client.get(self.url).data["assignee"]["id"], other.id)
+
+    def test_comment_invalidates_detail(self):
+        self.client.get(self.url)
+        Comment.objects.create(task=self.task, author=self.user, text="Hi")
+        self.assertEqual(len(self.client.get(self.url).data["comments"]), 1)
+
+    def test_bulk_update_invalidates_list(self):
+        self.client.get("/api/tasks/")
+        self.client.post(
+            "/api/tasks/bulk_update/",
+            [{"id": self.task.id, "title": "Bulk"}],
+            format="json",
+        )
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.data["results"][0]["title"], "Bulk")
+
+    def test_user_change_invalidates_nested_users(self):
+        self.client.get(self.url)
+        self.user.username = "renamed"
+        self.user.save()
+        self.assertEqual(
+            self.client.get(self.url).data["creator"]["username"], "renamed"
+        )
+
+    def test_lost_version_counter_does_not_revive_old_entries(self):
+        self.client.get(self.url)
+        Task.objects.filter(pk=self.task.pk).update(title="Changed")
+        cache.get_cache().delete(cache.task_version_key(self.task.pk))
+        self.assertEqual(self.client.get(self.url).data["title"], "Changed")
+
+    def test_stats(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get("/api/cache/stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["detail"], {"hits": 1, "misses": 1})
+
+    def test_stats_admin_only(self):
+        response = self.client.get("/api/cache/stats/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
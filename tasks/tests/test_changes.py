@@ -0,0 +1,257 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks import changes
+from tasks.models import Comment, Task, TaskChange
+
+User = get_user_model()
+
+
+class ChangeLogTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.other = User.objects.create_user(username="other", password="pass123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def kinds(self):
+        return list(TaskChange.objects.values_list("task_id", "kind"))
+
+    def test_api_writes_are_logged(self):
+        self.client.post("/api/tasks/", {"title": "Task"})
+        task_id = Task.objects.get(title="Task").id
+        self.client.patch(f"/api/tasks/{task_id}/", {"title": "Renamed"})
+        self.client.post(f"/api/tasks/{task_id}/complete/")
+        self.client.post(
+            f"/api/tasks/{task_id}/assign/", {"assignee_id": self.other.id}
+        )
+        self.client.delete(f"/api/tasks/{task_id}/")
+        self.assertEqual(
+            self.kinds(),
+            [
+                (task_id, TaskChange.CREATED),
+                (task_id, TaskChange.UPDATED),
+                (task_id, TaskChange.COMPLETED),
+                (task_id, TaskChange.ASSIGNED),
+                (task_id, TaskChange.DELETED),
+            ],
+        )
+
+    def test_comments_are_logged(self):
+        task = Task.objects.create(title="Task", creator=self.user)
+        comment = Comment.objects.create(task=task, author=self.user, text="Hi")
+        comment.delete()
+        self.assertEqual(
+            self.kinds()[-2:],
+            [
+                (task.id, TaskChange.COMMENT_ADDED),
+                (task.id, TaskChange.COMMENT_DELETED),
+            ],
+        )
+
+    def test_bulk_writes_are_logged(self):
+        tasks = [
+            Task.objects.create(title=f"T{i}", creator=self.user) for i in range(2)
+        ]
+        TaskChange.objects.all().delete()
+        self.client.post(
+            "/api/tasks/bulk_complete/",
+            [{"id": task.id} for task in tasks],
+            format="json",
+        )
+        self.assertEqual(
+            sorted(self.kinds()),
+            [(task.id, TaskChange.COMPLETED) for task in tasks],
+        )
+
+    def test_rolled_back_writes_are_not_logged(self):
+        response = self.client.post(
+            "/api/tasks/bulk_create/",
+            [{"title": "Ok"}, {"title": ""}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.kinds(), [])
+        task = Task.objects.create(title="Task", creator=self.user)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Comment.objects.create(task=task, author=self.user, text="Hi")
+                raise RuntimeError
+        self.assertEqual(self.kinds(), [(task.id, TaskChange.CREATED)])
+
+
+@override_settings(TASKS_CHANGES_POLL_INTERVAL=0.01)
+class ChangeFeedTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.task = Task.objects.create(title="Task", creator=cls.user)
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_without_cursor_returns_current_position(self):
+        latest = TaskChange.objects.create(task_id=self.task.id, kind="created").id
+        response = self.client.get("/api/tasks/changes/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
+        self.assertTrue(response.data["cursor"].startswith(f"{latest}."))
+
+    def test_returns_only_deltas(self):
+        cursor = self.client.get("/api/tasks/changes/").data["cursor"]
+        TaskChange.objects.create(task_id=self.task.id, kind=TaskChange.COMPLETED)
+        response = self.client.get("/api/tasks/changes/", {"since": cursor})
+        self.assertEqual(
+            [(item["task"], item["kind"]) for item in response.data["results"]],
+            [(self.task.id, TaskChange.COMPLETED)],
+        )
+        response = self.client.get(
+            "/api/tasks/changes/", {"since": response.data["cursor"]}
+        )
+        self.assertEqual(response.data["results"], [])
+
+    def test_limit(self):
+        cursor = self.client.get("/api/tasks/changes/").data["cursor"]
+        for _ in range(3):
+            TaskChange.objects.create(task_id=self.task.id, kind=TaskChange.UPDATED)
+        first = self.client.get("/api/tasks/changes/", {"since": cursor, "limit": 2})
+        self.assertEqual(len(first.data["results"]), 2)
+        rest = self.client.get(
+            "/api/tasks/changes/", {"since": first.data["cursor"], "limit": 2}
+        )
+        self.assertEqual(len(rest.data["results"]), 1)
+
+    def test_long_poll_waits_for_timeout(self):
+        cursor = self.client.get("/api/tasks/changes/").data["cursor"]
+        started = time.monotonic()
+        response = self.client.get(
+            "/api/tasks/changes/", {"since": cursor, "timeout": 0.1}
+        )
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+        self.assertEqual(response.data["results"], [])
+
+    @override_settings(TASKS_CHANGES_SETTLE_SECONDS=60)
+    def test_unsettled_entries_are_held_back(self):
+        TaskChange.objects.all().delete()
+        settled = TaskChange.objects.create(task_id=self.task.id, kind="created")
+        TaskChange.objects.filter(pk=settled.pk).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        # An entry that may still be behind an uncommitted one, and a later
+        # entry that only looks settled.
+        recent = TaskChange.objects.create(task_id=self.task.id, kind="updated")
+        later = TaskChange.objects.create(task_id=self.task.id, kind="completed")
+        TaskChange.objects.filter(pk=later.pk).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        cursor = self.client.get("/api/tasks/changes/").data["cursor"]
+        self.assertTrue(cursor.startswith(f"{settled.id}."))
+        response = self.client.get(
+            "/api/tasks/changes/", {"since": changes.make_cursor(0)}
+        )
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], [settled.id]
+        )
+        TaskChange.objects.filter(pk=recent.pk).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        response = self.client.get("/api/tasks/changes/", {"since": cursor})
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], [recent.id, later.id]
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/tasks/changes/", {"since": "nope"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(TASKS_CHANGES_RETENTION_HOURS=1)
+    def test_expired_cursor(self):
+        cursor = changes.make_cursor(0, time.time() - 7200)
+        response = self.client.get("/api/tasks/changes/", {"since": cursor})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_event_stream_batch_resumes_from_last_event_id(self):
+        cursor = self.client.get("/api/tasks/changes/").data["cursor"]
+        change = TaskChange.objects.create(
+            task_id=self.task.id, kind=TaskChange.ASSIGNED
+        )
+        response = self.client.get(
+            "/api/tasks/changes/",
+            HTTP_ACCEPT="text/event-stream",
+            HTTP_LAST_EVENT_ID=cursor,
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream; charset=utf-8")
+        body = response.content.decode()
+        self.assertIn(f"id: {change.id}.", body)
+        self.assertIn('"kind": "assigned"', body)
+
+
+@override_settings(
+    ROOT_URLCONF="tasks.tests.test_async_views",
+    TASKS_CHANGES_POLL_INTERVAL=0.01,
+    TASKS_CHANGES_STREAM_SECONDS=0.2,
+)
+class ChangeStreamTest(TestCase):
+    async def test_stream_pushes_new_changes(self):
+        user = await User.objects.acreate(username="user")
+        headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(user)}",
+            "Accept": "text/event-stream",
+        }
+        response = await self.async_client.get("/api/tasks/changes/", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk if isinstance(chunk, str) else chunk.decode())
+            if len(chunks) == 2:
+                await TaskChange.objects.acreate(task_id=1, kind=TaskChange.CREATED)
+        body = "".join(chunks)
+        self.assertTrue(body.startswith("retry: "))
+        self.assertIn('"kind": "created"', body)
+
+
+class CompactChangesTest(TestCase):
+    def add(self, task_id, kind, age):
+        change = TaskChange.objects.create(task_id=task_id, kind=kind)
+        TaskChange.objects.filter(pk=change.pk).update(created_at=timezone.now() - age)
+        return change.id
+
+    def test_compact_keeps_latest_entry_per_task_and_kind(self):
+        hours = timedelta(hours=2)
+        self.add(1, TaskChange.UPDATED, hours)
+        kept = self.add(1, TaskChange.UPDATED, hours)
+        completed = self.add(1, TaskChange.COMPLETED, hours)
+        self.add(2, TaskChange.CREATED, hours)
+        deleted = self.add(2, TaskChange.DELETED, hours)
+        recent = [
+            self.add(3, TaskChange.UPDATED, timedelta()),
+            self.add(3, TaskChange.UPDATED, timedelta()),
+        ]
+        out = StringIO()
+        call_command("compact_task_changes", stdout=out)
+        self.assertIn("compacted 2", out.getvalue())
+        self.assertEqual(
+            list(TaskChange.objects.values_list("id", flat=True)),
+            [kept, completed, deleted, *recent],
+        )
+
+    @override_settings(TASKS_CHANGES_RETENTION_HOURS=24)
+    def test_trim_drops_old_entries(self):
+        self.add(1, TaskChange.UPDATED, timedelta(days=2))
+        recent = self.add(1, TaskChange.UPDATED, timedelta())
+        call_command("compact_task_changes", stdout=StringIO())
+        self.assertEqual(
+            list(TaskChange.objects.values_list("id", flat=True)), [recent]
+        )
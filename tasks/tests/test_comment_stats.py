@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.models import Comment, Task
+
+User = get_user_model()
+
+
+class CommentStatsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(title="Task", creator=self.user)
+
+    def test_new_task_has_no_comments(self):
+        self.assertEqual(self.task.comments_count, 0)
+        self.assertIsNotNone(self.task.last_activity_at)
+
+    def test_comment_create_updates_stats(self):
+        response = self.client.post(
+            "/api/comments/", {"task": self.task.id, "text": "Hi"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        comment = Comment.objects.get(pk=response.data["id"])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comments_count, 1)
+        self.assertEqual(self.task.last_activity_at, comment.created_at)
+
+    def test_comment_delete_updates_count(self):
+        comment = Comment.objects.create(task=self.task, author=self.user, text="Hi")
+        Comment.objects.create(task=self.task, author=self.user, text="Hi again")
+        response = self.client.delete(f"/api/comments/{comment.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comments_count, 1)
+
+    def test_list_includes_stats(self):
+        Comment.objects.create(task=self.task, author=self.user, text="Hi")
+        response = self.client.get("/api/tasks/")
+        item = response.data["results"][0]
+        self.assertEqual(item["comments_count"], 1)
+        self.assertIn("last_activity_at", item)
+
+    def test_recompute_command_fixes_drift(self):
+        comment = Comment.objects.create(task=self.task, author=self.user, text="Hi")
+        other = Task.objects.create(title="Other", creator=self.user)
+        Task.objects.filter(pk=self.task.pk).update(comments_count=7)
+        out = StringIO()
+        call_command("recompute_task_stats", "--batch-size", "1", stdout=out)
+        self.assertIn("Updated 1 task(s).", out.getvalue())
+        self.task.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.task.comments_count, 1)
+        self.assertEqual(self.task.last_activity_at, comment.created_at)
+        self.assertEqual(other.comments_count, 0)
+
+    def test_recompute_command_moves_activity_forward(self):
+        comment = Comment.objects.create(task=self.task, author=self.user, text="Hi")
+        Task.objects.filter(pk=self.task.pk).update(
+            last_activity_at=self.task.created_at
+        )
+        call_command("recompute_task_stats", stdout=StringIO())
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.last_activity_at, comment.created_at)
@@ -0,0 +1,137 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.models import Comment, Task
+
+User = get_user_model()
+
+
+# The response cache would answer these requests before the database is
+# consulted; it has its own tests in test_cache.py.
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "tasks": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "auth": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    }
+)
+class ConditionalGetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(title="Task", creator=self.user)
+        self.url = f"/api/tasks/{self.task.id}/"
+
+    def test_retrieve_sets_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+    def test_retrieve_not_modified_without_serialization(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_retrieve_if_modified_since(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.post(f"{self.url}complete/")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_new_comment_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.post("/api/comments/", {"task": self.task.id, "text": "Hi"})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["comments"]), 1)
+
+    def test_deleted_comment_changes_etag(self):
+        comment = Comment.objects.create(task=self.task, author=self.user, text="Hi")
+        etag = self.client.get(self.url)["ETag"]
+        comment.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_user_change_changes_etag(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        Task.objects.filter(pk=self.task.pk).update(assignee=other)
+        etag = self.client.get(self.url)["ETag"]
+        list_etag = self.client.get("/api/tasks/")["ETag"]
+        other.last_login = timezone.now()
+        other.save(update_fields=["last_login"])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        other.username = "renamed"
+        other.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["assignee"]["username"], "renamed")
+        response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        other.delete()
+        response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["results"][0]["assignee"])
+
+    def test_missing_task_with_etag(self):
+        response = self.client.get("/api/tasks/9999/", HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_not_modified(self):
+        etag = self.client.get("/api/tasks/")["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_changes_on_delete(self):
+        other = Task.objects.create(title="Other", creator=self.user)
+        etag = self.client.get("/api/tasks/")["ETag"]
+        other.delete()
+        response = self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_depends_on_query(self):
+        etag = self.client.get("/api/tasks/")["ETag"]
+        response = self.client.get(
+            "/api/tasks/?is_completed=true", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_covers_only_the_page(self):
+        newer = Task.objects.create(title="Newer", creator=self.user)
+        url = "/api/tasks/?page_size=1"
+        etag = self.client.get(url)["ETag"]
+        # The task on the second page changes, the first page does not.
+        self.task.title = "Renamed"
+        self.task.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        newer.title = "Renamed"
+        newer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(TASKS_FAST_LISTS=True)
+    def test_list_validators_on_every_list_path(self):
+        for url in ["/api/tasks/", "/api/tasks/?fields=title"]:
+            with self.assertNumQueries(1):
+                etag = self.client.get(url)["ETag"]
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
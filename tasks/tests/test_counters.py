@@ -0,0 +1,180 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks import counters, deletion
+from tasks.models import Task, UserTaskCounts
+from tasks.tests.test_async_views import DUMMY_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=DUMMY_CACHES)
+class TaskCountersTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username="alice", password="pass123")
+        cls.bob = User.objects.create_user(username="bob", password="pass123")
+        cls.carol = User.objects.create_user(username="carol", password="pass123")
+
+    def setUp(self):
+        self.users = [self.alice, self.bob, self.carol]
+        self.client.force_authenticate(user=self.alice)
+        # Rows exist from here on, so every write has to keep them right.
+        for user in self.users:
+            counters.get_counts(user.pk)
+
+    def assertCountsMatchTasks(self):
+        expected = counters.compute([user.pk for user in self.users])
+        for user in self.users:
+            row = UserTaskCounts.objects.get(pk=user.pk)
+            actual = {column: getattr(row, column) for column in counters.COLUMNS}
+            self.assertEqual(actual, expected[user.pk], user.username)
+
+    def test_summary(self):
+        Task.objects.create(title="Mine", creator=self.alice)
+        Task.objects.create(
+            title="Done", creator=self.bob, assignee=self.alice, is_completed=True
+        )
+        Task.objects.create(title="Open", creator=self.bob, assignee=self.alice)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tasks/summary/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "assigned_to_me": {"open": 1, "completed": 1, "total": 2},
+                "created_by_me": {"open": 1, "completed": 0, "total": 1},
+            },
+        )
+
+    def test_first_read_computes_the_row(self):
+        UserTaskCounts.objects.all().delete()
+        Task.objects.create(title="Mine", creator=self.alice)
+        response = self.client.get("/api/tasks/summary/")
+        self.assertEqual(response.data["created_by_me"]["open"], 1)
+        self.assertTrue(UserTaskCounts.objects.filter(pk=self.alice.pk).exists())
+
+    def test_api_writes(self):
+        self.client.post("/api/tasks/", {"title": "Task"})
+        task_id = Task.objects.get().id
+        self.assertCountsMatchTasks()
+        # Between assignees, back to nobody's but the creator's.
+        for assignee in [self.bob, self.carol, self.alice]:
+            self.client.post(
+                f"/api/tasks/{task_id}/assign/", {"assignee_id": assignee.id}
+            )
+            self.assertCountsMatchTasks()
+        self.client.post(f"/api/tasks/{task_id}/complete/")
+        self.assertCountsMatchTasks()
+        # Completing twice changes nothing.
+        self.client.post(f"/api/tasks/{task_id}/complete/")
+        self.assertCountsMatchTasks()
+        self.client.patch(f"/api/tasks/{task_id}/", {"title": "Renamed"})
+        self.client.delete(f"/api/tasks/{task_id}/")
+        self.assertCountsMatchTasks()
+        self.assertEqual(
+            counters.summarize(UserTaskCounts.objects.get(pk=self.alice.pk)),
+            {
+                "assigned_to_me": {"open": 0, "completed": 0, "total": 0},
+                "created_by_me": {"open": 0, "completed": 0, "total": 0},
+            },
+        )
+
+    def test_transition_after_a_concurrent_write(self):
+        task = Task.objects.create(title="Task", creator=self.alice, assignee=self.bob)
+        first = QuerySet.first
+        reads = []
+
+        def read_then_reassign(queryset):
+            # Another request reassigns the task between the read and the
+            # UPDATE of this one.
+            instance = first(queryset)
+            reads.append(instance.assignee_id)
+            if len(reads) == 1:
+                concurrent = Task.objects.get(pk=task.pk)
+                concurrent.assignee = self.carol
+                concurrent.save(update_fields=["assignee"])
+            return instance
+
+        with mock.patch.object(
+            QuerySet, "first", autospec=True, side_effect=read_then_reassign
+        ):
+            response = self.client.post(
+                f"/api/tasks/{task.id}/assign/", {"assignee_id": self.alice.id}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The first UPDATE expected bob and matched nothing.
+        self.assertEqual(reads, [self.bob.id, self.carol.id])
+        self.assertCountsMatchTasks()
+
+    def test_bulk_writes(self):
+        data = [{"title": f"Task {n}"} for n in range(4)]
+        ids = [
+            task["id"]
+            for task in self.client.post(
+                "/api/tasks/bulk_create/", data, format="json"
+            ).data
+        ]
+        self.assertCountsMatchTasks()
+        self.client.post(
+            "/api/tasks/bulk_assign/",
+            [{"id": pk, "assignee_id": self.bob.id} for pk in ids[:3]],
+            format="json",
+        )
+        self.assertCountsMatchTasks()
+        self.client.post(
+            "/api/tasks/bulk_assign/",
+            [{"id": pk, "assignee_id": self.carol.id} for pk in ids[1:]],
+            format="json",
+        )
+        self.assertCountsMatchTasks()
+        self.client.post(
+            "/api/tasks/bulk_complete/", [{"id": pk} for pk in ids[:2]], format="json"
+        )
+        self.assertCountsMatchTasks()
+
+    def test_model_writes(self):
+        task = Task.objects.create(title="Task", creator=self.alice, assignee=self.bob)
+        task.is_completed = True
+        task.save()
+        self.assertCountsMatchTasks()
+        task = Task.objects.get(pk=task.pk)
+        task.assignee = self.carol
+        task.save(update_fields=["assignee"])
+        self.assertCountsMatchTasks()
+        task.delete()
+        self.assertCountsMatchTasks()
+
+    def test_user_deletion(self):
+        Task.objects.create(title="Bob's", creator=self.bob, assignee=self.carol)
+        Task.objects.create(title="For Bob", creator=self.carol, assignee=self.bob)
+        deletion.delete_user(self.bob)
+        self.assertCountsMatchTasks()
+        self.users.remove(self.bob)
+        call_command("reap_deleted", rate=0, stdout=StringIO())
+        self.assertCountsMatchTasks()
+
+    def test_reconcile(self):
+        Task.objects.create(title="Task", creator=self.alice, assignee=self.bob)
+        UserTaskCounts.objects.filter(pk=self.alice.pk).update(created_open=7)
+        UserTaskCounts.objects.filter(pk=self.bob.pk).delete()
+        stdout = StringIO()
+        call_command("reconcile_task_counts", batch_size=2, stdout=stdout)
+        self.assertIn("Updated 2 user(s).", stdout.getvalue())
+        self.assertCountsMatchTasks()
+        stdout = StringIO()
+        call_command("reconcile_task_counts", stdout=stdout)
+        self.assertIn("Updated 0 user(s).", stdout.getvalue())
+
+    @override_settings(ROOT_URLCONF="tasks.tests.test_async_views")
+    def test_summary_under_asgi_routes(self):
+        response = self.client.get("/api/tasks/summary/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("assigned_to_me", response.data)
@@ -0,0 +1,108 @@
+import time
+
+from django.http import HttpResponse
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from tasks import counters
+from tasks.db_router import STICKY_COOKIE, ReplicaMiddleware, ReplicaRouter
+from tasks.models import Task, UserTaskCounts
+from tasks.views import RegisterView, TaskViewSet
+
+router = ReplicaRouter()
+
+
+@override_settings(TASKS_READ_REPLICA="replica", TASKS_REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def route(self, request, view=TaskViewSet.as_view({"get": "list"})):
+        # Runs the middleware around a stand-in view that records where a
+        # read of Task would go.
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen["read"] = router.db_for_read(Task)
+            seen["write"] = router.db_for_write(Task)
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        response = middleware(request)
+        return seen, response
+
+    def test_safe_reads_go_to_replica(self):
+        seen, response = self.route(self.factory.get("/api/tasks/"))
+        self.assertEqual(seen, {"read": "replica", "write": "default"})
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_routing_ends_with_the_request(self):
+        self.route(self.factory.get("/api/tasks/"))
+        self.assertEqual(router.db_for_read(Task), "default")
+
+    def test_mutation_reads_primary_and_sets_sticky_cookie(self):
+        seen, response = self.route(self.factory.post("/api/tasks/"))
+        self.assertEqual(seen["read"], "default")
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 5)
+
+    def test_sticky_client_reads_primary(self):
+        request = self.factory.get("/api/tasks/")
+        request.COOKIES[STICKY_COOKIE] = str(time.time() + 5)
+        self.assertEqual(self.route(request)[0]["read"], "default")
+
+        request = self.factory.get("/api/tasks/")
+        request.COOKIES[STICKY_COOKIE] = str(time.time() - 1)
+        self.assertEqual(self.route(request)[0]["read"], "replica")
+
+    def test_other_views_read_primary(self):
+        seen, _ = self.route(self.factory.get("/"), view=RegisterView.as_view())
+        self.assertEqual(seen["read"], "default")
+
+    @override_settings(TASKS_READ_REPLICA=None)
+    def test_without_replica_everything_goes_to_primary(self):
+        seen, response = self.route(self.factory.get("/api/tasks/"))
+        self.assertEqual(seen["read"], "default")
+        _, response = self.route(self.factory.post("/api/tasks/"))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_replica_is_not_migrated(self):
+        self.assertFalse(router.allow_migrate("replica", "tasks"))
+        self.assertTrue(router.allow_migrate("default", "tasks"))
+
+    async def test_async_requests_are_routed(self):
+        view = TaskViewSet.as_view({"get": "list"})
+        seen = {}
+
+        async def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen["read"] = router.db_for_read(Task)
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        await middleware(self.factory.get("/api/tasks/"))
+        self.assertEqual(seen["read"], "replica")
+        self.assertEqual(router.db_for_read(Task), "default")
+
+
+@override_settings(TASKS_READ_REPLICA="replica")
+class ReplicaCountersTest(TestCase):
+    def test_summary_counters_use_the_primary(self):
+        # There is no "replica" connection here: a query routed to it fails.
+        user = get_user_model().objects.create_user(username="user")
+        Task.objects.create(title="Task", creator=user)
+        view = TaskViewSet.as_view({"get": "summary"})
+        seen = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen.append(router.db_for_read(UserTaskCounts))
+            counts = counters.get_counts(user.pk)
+            self.assertEqual(counts.created_open, 1)
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        for _ in range(2):
+            middleware(RequestFactory().get("/api/tasks/summary/"))
+        self.assertEqual(seen, ["replica", "replica"])
+        self.assertTrue(UserTaskCounts.objects.filter(pk=user.pk).exists())
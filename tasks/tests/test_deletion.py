@@ -0,0 +1,136 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks import deletion
+from tasks.models import Comment, Task, TaskChange, UserDeletion
+from tasks.search import search_tasks
+from tasks.tests.test_async_views import DUMMY_CACHES
+
+User = get_user_model()
+
+
+def reap(**options):
+    stdout = StringIO()
+    call_command("reap_deleted", stdout=stdout, **{"rate": 0, **options})
+    return stdout.getvalue()
+
+
+@override_settings(CACHES=DUMMY_CACHES)
+class SoftDeleteTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.other = User.objects.create_user(username="other", password="pass123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def create_task(self, comments=0, creator=None, **fields):
+        task = Task.objects.create(title="Task", creator=creator or self.user, **fields)
+        for n in range(comments):
+            Comment.objects.create(task=task, author=self.other, text=f"Note {n}")
+        return task
+
+    def test_destroy_hides_task_and_comments(self):
+        task = self.create_task(comments=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/api/tasks/{task.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+        self.assertIsNotNone(Task.all_objects.get(pk=task.pk).deleted_at)
+        self.assertEqual(Comment.all_objects.filter(task=task).count(), 3)
+        response = self.client.get(f"/api/tasks/{task.id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get("/api/tasks/").data["results"], [])
+        response = self.client.get(f"/api/comments/?task={task.id}")
+        self.assertEqual(response.data["results"], [])
+        self.assertTrue(
+            TaskChange.objects.filter(task_id=task.id, kind=TaskChange.DELETED)
+        )
+        # No comments on deleted tasks.
+        response = self.client.post("/api/comments/", {"task": task.id, "text": "Hi"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_destroy_does_not_touch_comments(self):
+        counts = []
+        for comments in [0, 30]:
+            task = self.create_task(comments=comments)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.delete(f"/api/tasks/{task.id}/")
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_reaper_purges_in_chunks(self):
+        doomed = [self.create_task(comments=4), self.create_task(comments=3)]
+        kept = self.create_task(comments=2)
+        for task in doomed:
+            self.client.delete(f"/api/tasks/{task.id}/")
+        with mock.patch.object(
+            deletion, "reap_step", wraps=deletion.reap_step
+        ) as reap_step:
+            output = reap(chunk_size=3)
+        self.assertIn("Deleted 9 rows of 2 tasks and 0 users", output)
+        # 7 comments in chunks of 3, the 2 tasks, then the empty step.
+        self.assertEqual(reap_step.call_count, 5)
+        self.assertEqual(Task.all_objects.count(), 1)
+        self.assertEqual(Comment.all_objects.count(), 2)
+        self.assertEqual(search_tasks("Note", limit=10), [kept.id])
+        self.assertEqual(kept.comments.count(), 2)
+
+    def test_reaper_rate(self):
+        task = self.create_task(comments=10)
+        self.client.delete(f"/api/tasks/{task.id}/")
+        with mock.patch("tasks.management.commands.reap_deleted.time.sleep") as sleep:
+            reap(chunk_size=5, rate=10)
+        # Two chunks of 5 comments, then the task: about 0.5 s each.
+        pauses = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(pauses), 3)
+        self.assertAlmostEqual(pauses[0], 0.5, delta=0.1)
+        self.assertAlmostEqual(pauses[2], 0.1, delta=0.1)
+
+    def test_delete_user(self):
+        doomed = User.objects.create_user(username="doomed", password="pass123")
+        own = self.create_task(comments=2, creator=doomed)
+        assigned = self.create_task(assignee=doomed)
+        Comment.objects.create(task=assigned, author=doomed, text="Mine")
+        deletion.delete_user(doomed)
+
+        doomed.refresh_from_db()
+        self.assertFalse(doomed.is_active)
+        self.assertFalse(Task.objects.filter(pk=own.pk).exists())
+        self.assertTrue(Task.objects.filter(pk=assigned.pk).exists())
+        self.assertEqual(reap(chunk_size=100).count("Deleted"), 1)
+
+        self.assertFalse(User.objects.filter(pk=doomed.pk).exists())
+        self.assertFalse(UserDeletion.objects.exists())
+        self.assertFalse(Task.all_objects.filter(pk=own.pk).exists())
+        assigned.refresh_from_db()
+        self.assertIsNone(assigned.assignee_id)
+        self.assertEqual(assigned.comments_count, 0)
+
+    def test_admin_deletes_in_the_background(self):
+        admin = User.objects.create_superuser(username="admin", password="pass123")
+        doomed = User.objects.create_user(username="doomed", password="pass123")
+        task = self.create_task(comments=2, creator=doomed)
+        self.client.force_login(admin)
+        response = self.client.post(
+            reverse("admin:tasks_task_delete", args=[task.pk]), {"post": "yes"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertIsNotNone(Task.all_objects.get(pk=task.pk).deleted_at)
+        response = self.client.post(
+            reverse("admin:auth_user_delete", args=[doomed.pk]), {"post": "yes"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertTrue(UserDeletion.objects.filter(user=doomed).exists())
+        reap()
+        self.assertFalse(User.objects.filter(pk=doomed.pk).exists())
@@ -0,0 +1,132 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.models import Comment, Task
+from tasks.tests.test_async_views import DUMMY_CACHES
+
+User = get_user_model()
+
+
+def read_body(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@override_settings(TASKS_EXPORT_CHUNK_SIZE=2)
+class ExportTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.tasks = [
+            Task.objects.create(title=f"Task, {i}", creator=cls.user) for i in range(5)
+        ]
+        Task.objects.filter(pk=cls.tasks[0].pk).update(
+            is_completed=True, assignee=cls.user
+        )
+        Comment.objects.create(task=cls.tasks[0], author=cls.user, text='Say "hi"')
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_ndjson(self):
+        response = self.client.get("/api/tasks/export/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        rows = [json.loads(line) for line in read_body(response).splitlines()]
+        self.assertEqual(len(rows), 5)
+        row = next(row for row in rows if row["id"] == self.tasks[0].id)
+        self.assertEqual(row["creator"], self.user.id)
+        self.assertEqual(row["assignee"], self.user.id)
+        self.assertIs(row["is_completed"], True)
+        self.assertEqual(row["comments_count"], 1)
+
+    def test_csv(self):
+        response = self.client.get("/api/tasks/export/?format=csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="tasks.csv"', response["Content-Disposition"])
+        rows = list(csv.DictReader(StringIO(read_body(response))))
+        self.assertEqual(len(rows), 5)
+        row = next(row for row in rows if row["id"] == str(self.tasks[0].id))
+        self.assertEqual(row["title"], "Task, 0")
+        self.assertEqual(row["is_completed"], "true")
+
+    def test_respects_list_filters(self):
+        response = self.client.get("/api/tasks/export/?is_completed=true")
+        rows = read_body(response).splitlines()
+        self.assertEqual([json.loads(row)["id"] for row in rows], [self.tasks[0].id])
+
+    def test_comments(self):
+        response = self.client.get(
+            f"/api/comments/export/?task={self.tasks[0].id}&format=csv"
+        )
+        rows = list(csv.DictReader(StringIO(read_body(response))))
+        self.assertEqual(rows[0]["text"], 'Say "hi"')
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get("/api/tasks/export/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_errors_are_json(self):
+        for url in [
+            "/api/tasks/export/?format=csv&can=fly",
+            "/api/tasks/export/?can=fly",
+            "/api/comments/export/?format=csv&can=fly",
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response["Content-Type"], "application/json")
+            self.assertIn("can", response.json())
+        self.client.force_authenticate(user=None)
+        response = self.client.get("/api/tasks/export/?format=csv")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tasks.csv")
+            call_command("export_tasks", format="csv", output=path, stderr=StringIO())
+            with open(path, newline="") as file:
+                rows = list(csv.DictReader(file))
+        self.assertEqual([int(row["id"]) for row in rows], [t.id for t in self.tasks])
+
+    def test_command_stdout(self):
+        out = StringIO()
+        call_command("export_tasks", comments=True, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["text"], 'Say "hi"')
+
+
+@override_settings(ROOT_URLCONF="tasks.tests.test_async_views", CACHES=DUMMY_CACHES)
+class AsyncExportTest(TestCase):
+    async def test_streams_from_async_iterator(self):
+        user = await User.objects.acreate(username="user")
+        await Task.objects.acreate(title="Task", creator=user)
+        response = await self.async_client.get(
+            "/api/tasks/export/",
+            headers={"Authorization": f"Bearer {AccessToken.for_user(user)}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertEqual(json.loads(body)["title"], "Task")
+
+    async def test_errors_are_json(self):
+        user = await User.objects.acreate(username="user")
+        response = await self.async_client.get(
+            "/api/tasks/export/?format=csv&can=fly",
+            headers={"Authorization": f"Bearer {AccessToken.for_user(user)}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response["Content-Type"], "application/json")
@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks import cache
+from tasks.fastpath import compile_serializer
+from tasks.models import Comment, Task
+from tasks.renderers import FastJSONRenderer
+from tasks.serializers import TaskDetailSerializer, TaskListSerializer
+from tasks.tests.test_async_views import DUMMY_CACHES
+from tasks.views import CommentViewSet, TaskViewSet
+
+User = get_user_model()
+
+
+class FastListTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="пользователь", password="pass123", email="u@example.com"
+        )
+        cls.task = Task.objects.create(
+            title='Ünïcode "quoted" \u2028 line\nbreak', creator=cls.user
+        )
+        Task.objects.create(title="Assigned", creator=cls.user, assignee=cls.user)
+        for i in range(3):
+            Task.objects.create(title=f"Task {i}", creator=cls.user)
+        Comment.objects.create(task=cls.task, author=cls.user, text="Привет\t\x01")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def get_both(self, url):
+        # The same request through the regular and the fast path.
+        cache.get_cache().clear()
+        regular = self.client.get(url)
+        cache.get_cache().clear()
+        # TASKS_FAST_LISTS=1 also makes FastJSONRenderer the default renderer.
+        renderers = [FastJSONRenderer]
+        with (
+            self.settings(TASKS_FAST_LISTS=True),
+            mock.patch.object(TaskViewSet, "renderer_classes", renderers),
+            mock.patch.object(CommentViewSet, "renderer_classes", renderers),
+        ):
+            fast = self.client.get(url)
+        self.assertEqual(fast.status_code, 200)
+        self.assertIsInstance(fast.accepted_renderer, FastJSONRenderer)
+        return regular, fast
+
+    def assertSameBytes(self, url):
+        regular, fast = self.get_both(url)
+        self.assertEqual(fast.content, regular.content)
+        return fast
+
+    def test_task_list(self):
+        self.assertSameBytes("/api/tasks/")
+
+    def test_pages_and_ordering(self):
+        fast = self.assertSameBytes("/api/tasks/?page_size=2&ordering=updated_at")
+        self.assertSameBytes(fast.data["next"])
+
+    def test_comment_list(self):
+        self.assertSameBytes(f"/api/comments/?task={self.task.id}")
+
+    def test_reads_values_instead_of_instances(self):
+        cache.get_cache().clear()
+        with self.settings(TASKS_FAST_LISTS=True):
+            response = self.client.get("/api/tasks/")
+        # The regular serializer returns a ReturnList.
+        self.assertIs(type(response.data["results"]), list)
+
+    def test_sparse_fieldsets_keep_the_regular_path(self):
+        self.assertSameBytes("/api/tasks/?fields=title&include=users")
+
+
+@override_settings(ROOT_URLCONF="tasks.tests.test_async_views", CACHES=DUMMY_CACHES)
+class AsyncFastListTest(TestCase):
+    async def test_matches_regular_path(self):
+        user = await User.objects.acreate(username="user")
+        await Task.objects.acreate(title="Task", creator=user, assignee=user)
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        regular = await self.async_client.get("/api/tasks/", headers=headers)
+        with self.settings(TASKS_FAST_LISTS=True):
+            fast = await self.async_client.get("/api/tasks/", headers=headers)
+        self.assertEqual(fast.content, regular.content)
+
+
+class CompileTest(SimpleTestCase):
+    def test_unsupported_serializers_are_not_compiled(self):
+        self.assertIsNone(compile_serializer(TaskDetailSerializer))
+
+    def test_lookups(self):
+        lookups = compile_serializer(TaskListSerializer).lookups
+        self.assertIn("creator__username", lookups)
+        self.assertIn("assignee_id", lookups)
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def assertSameBytes(self, data, media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
+
+    def test_matches_json_renderer(self):
+        self.assertSameBytes(
+            {
+                "text": "é \u2028\u2029 \x00 </script>",
+                "when": datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=timezone.utc),
+                "lazy": gettext_lazy("This field is required."),
+                "items": [1, None, True, 2.5],
+            }
+        )
+
+    def test_indent_falls_back(self):
+        self.assertSameBytes({"a": [1]}, "application/json; indent=4")
+
+    def test_none(self):
+        self.assertSameBytes(None)
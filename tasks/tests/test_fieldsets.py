@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks import cache
+from tasks.models import Comment, Task
+from tasks.tests.test_async_views import DUMMY_CACHES
+
+User = get_user_model()
+
+
+class SparseFieldsetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="user", password="pass123", email="user@example.com"
+        )
+        cls.other = User.objects.create_user(username="other", password="pass123")
+        cls.task = Task.objects.create(
+            title="Task", creator=cls.user, assignee=cls.other
+        )
+        Task.objects.create(title="Other", creator=cls.user)
+        cls.comment = Comment.objects.create(task=cls.task, author=cls.other, text="Hi")
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.client.force_authenticate(user=self.user)
+
+    def test_default_representation_is_unchanged(self):
+        response = self.client.get("/api/tasks/")
+        row = response.data["results"][-1]
+        self.assertEqual(row["creator"]["username"], "user")
+        self.assertNotIn("users", response.data)
+
+    def test_fields_limit_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/tasks/?fields=title,assignee")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"][-1],
+            {"id": self.task.id, "title": "Task", "assignee": self.other.id},
+        )
+        page_query = queries.captured_queries[-1]["sql"]
+        self.assertNotIn("JOIN", page_query)
+        self.assertNotIn('"description"', page_query)
+
+    def test_users_collapse_to_ids_unless_expanded(self):
+        response = self.client.get("/api/tasks/?expand=assignee")
+        row = response.data["results"][-1]
+        self.assertEqual(row["creator"], self.user.id)
+        self.assertEqual(
+            row["assignee"],
+            {"id": self.other.id, "username": "other", "email": ""},
+        )
+        self.assertIn("is_completed", row)
+
+    def test_include_users_side_loads_each_user_once(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/tasks/?include=users")
+        self.assertEqual(
+            [row["creator"] for row in response.data["results"]],
+            [self.user.id, self.user.id],
+        )
+        self.assertEqual(
+            response.data["users"],
+            {
+                str(self.user.id): {
+                    "id": self.user.id,
+                    "username": "user",
+                    "email": "user@example.com",
+                },
+                str(self.other.id): {
+                    "id": self.other.id,
+                    "username": "other",
+                    "email": "",
+                },
+            },
+        )
+
+    def test_pagination_keeps_working(self):
+        first = self.client.get("/api/tasks/?fields=title&page_size=1")
+        second = self.client.get(first.data["next"])
+        self.assertEqual(
+            second.data["results"], [{"id": self.task.id, "title": "Task"}]
+        )
+
+    def test_comments(self):
+        response = self.client.get(
+            f"/api/comments/?task={self.task.id}&fields=text,author&include=users"
+        )
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.comment.id, "author": self.other.id, "text": "Hi"}],
+        )
+        self.assertEqual(list(response.data["users"]), [str(self.other.id)])
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get("/api/tasks/?fields=secret&expand=title&include=x")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {"fields", "expand", "include"})
+
+
+@override_settings(ROOT_URLCONF="tasks.tests.test_async_views", CACHES=DUMMY_CACHES)
+class AsyncSparseFieldsetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        Task.objects.create(title="Task", creator=cls.user)
+
+    async def test_include_users(self):
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        response = await self.async_client.get(
+            "/api/tasks/?fields=creator&include=users", headers=headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body["results"][0]["creator"], self.user.id)
+        self.assertEqual(body["users"][str(self.user.id)]["username"], "user")
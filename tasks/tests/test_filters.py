@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class TaskFilterTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user1 = User.objects.create_user(username="user1", password="pass123")
+        cls.user2 = User.objects.create_user(username="user2", password="pass123")
+        cls.open_task = Task.objects.create(
+            title="Open", creator=cls.user1, assignee=cls.user2
+        )
+        cls.done_task = Task.objects.create(
+            title="Done", creator=cls.user1, assignee=cls.user2, is_completed=True
+        )
+        cls.other_task = Task.objects.create(title="Other", creator=cls.user2)
+        Task.objects.filter(pk=cls.other_task.pk).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user1)
+
+    def get_ids(self, query):
+        response = self.client.get(f"/api/tasks/?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data["results"]]
+
+    def test_filter_open_tasks_by_assignee(self):
+        ids = self.get_ids(f"assignee={self.user2.id}&is_completed=false")
+        self.assertEqual(ids, [self.open_task.id])
+
+    def test_filter_by_creator(self):
+        ids = self.get_ids(f"creator={self.user2.id}")
+        self.assertEqual(ids, [self.other_task.id])
+
+    def test_filter_by_created_range(self):
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        ids = self.get_ids(f"created_after={since.replace('+', '%2B')}")
+        self.assertEqual(set(ids), {self.open_task.id, self.done_task.id})
+
+    def test_invalid_filter_value(self):
+        response = self.client.get("/api/tasks/?assignee=abc")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("assignee", response.data)
+
+    def test_ordering_by_updated_at(self):
+        Task.objects.filter(pk=self.other_task.pk).update(
+            updated_at=timezone.now() + timedelta(days=1)
+        )
+        ids = self.get_ids("ordering=-updated_at")
+        self.assertEqual(ids[0], self.other_task.id)
+
+    def test_ordering_pages_follow_requested_order(self):
+        expected = list(
+            Task.objects.order_by("updated_at", "id").values_list("id", flat=True)
+        )
+        response = self.client.get("/api/tasks/?ordering=updated_at&page_size=2")
+        ids = [item["id"] for item in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        ids += [item["id"] for item in response.data["results"]]
+        self.assertEqual(ids, expected)
+
+    def test_ordering_outside_whitelist_is_ignored(self):
+        ids = self.get_ids("ordering=title")
+        expected = list(
+            Task.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
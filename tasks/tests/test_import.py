@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from tasks.imports import TaskImporter
+from tasks.models import Comment, ImportCheckpoint, Task, TaskChange
+from tasks.search import search_tasks
+
+User = get_user_model()
+
+
+class ImportTasksTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def write_jsonl(self, name, records):
+        return self.write_file(name, "".join(json.dumps(r) + "\n" for r in records))
+
+    def run_import(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command("import_tasks", path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_users_then_tasks_with_comments(self):
+        users = self.write_file(
+            "users.csv", "username,email\nalice,alice@example.com\nbob,\nalice,\n"
+        )
+        self.run_import(users, kind="users")
+        self.assertEqual(User.objects.get(username="alice").email, "alice@example.com")
+        self.assertFalse(User.objects.get(username="bob").has_usable_password())
+
+        path = self.write_jsonl(
+            "tasks.jsonl",
+            [
+                {
+                    "title": "Migrated",
+                    "description": "from the old tracker",
+                    "creator": "alice",
+                    "assignee": "bob",
+                    "is_completed": True,
+                    "created_at": "2020-01-02T03:04:05Z",
+                    "comments": [
+                        {
+                            "author": "bob",
+                            "text": "First",
+                            "created_at": "2020-01-03T00:00:00Z",
+                        },
+                        {"author": "alice", "text": "Second"},
+                    ],
+                }
+            ],
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            out, _ = self.run_import(path)
+        self.assertIn("Imported 1 tasks, 0 invalid", out)
+        task = Task.objects.get()
+        self.assertEqual(task.creator.username, "alice")
+        self.assertEqual(task.assignee.username, "bob")
+        self.assertTrue(task.is_completed)
+        self.assertEqual(
+            task.created_at, datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        )
+        self.assertEqual(task.comments_count, 2)
+        self.assertGreater(task.last_activity_at, task.created_at)
+        self.assertEqual(
+            Comment.objects.get(text="First").created_at,
+            datetime(2020, 1, 3, tzinfo=timezone.utc),
+        )
+        self.assertEqual(search_tasks("tracker", 10), [task.id])
+        self.assertEqual(
+            sorted(TaskChange.objects.values_list("kind", flat=True)),
+            ["comment_added", "comment_added", "created"],
+        )
+
+    def test_invalid_records_are_reported_and_skipped(self):
+        User.objects.create_user(username="alice")
+        path = self.write_jsonl(
+            "tasks.jsonl",
+            [
+                {"title": "", "creator": "alice"},
+                {"title": "Ok", "creator": "alice"},
+                {"title": "Orphan", "creator": "nobody"},
+            ],
+        )
+        out, err = self.run_import(path)
+        self.assertIn("Record 1:", err)
+        self.assertIn("Unknown user nobody.", err)
+        self.assertIn("Imported 1 tasks, 2 invalid", out)
+        self.assertEqual(list(Task.objects.values_list("title", flat=True)), ["Ok"])
+
+    def test_malformed_lines_are_reported_and_skipped(self):
+        User.objects.create_user(username="alice")
+        path = self.write_file(
+            "users.jsonl",
+            '{"username": "bob"}\n{bad json\n["carol"]\n{"username": "dave"}\n',
+        )
+        out, err = self.run_import(path, kind="users", chunk_size=2)
+        self.assertIn("Record 2: ", err)
+        self.assertIn("Invalid JSON", err)
+        self.assertIn("Record 3: ", err)
+        self.assertIn("Expected a JSON object.", err)
+        self.assertIn("Imported 2 users, 2 invalid", out)
+        self.assertEqual(ImportCheckpoint.objects.get().position, 4)
+        self.assertEqual(User.objects.filter(username__in=["bob", "dave"]).count(), 2)
+
+    def test_resumes_from_checkpoint_after_crash(self):
+        User.objects.create_user(username="alice")
+        path = self.write_jsonl(
+            "tasks.jsonl", [{"title": f"T{i}", "creator": "alice"} for i in range(5)]
+        )
+        write = TaskImporter.write
+        calls = []
+
+        def crash_on_second_chunk(importer, rows):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError("crash")
+            return write(importer, rows)
+
+        with mock.patch.object(TaskImporter, "write", crash_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.run_import(path, chunk_size=2)
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get().position, 2)
+
+        out, _ = self.run_import(path, chunk_size=2)
+        self.assertIn("Resuming after record 2.", out)
+        self.assertEqual(
+            sorted(Task.objects.values_list("title", flat=True)),
+            [f"T{i}" for i in range(5)],
+        )
+        self.run_import(path, chunk_size=2)
+        self.assertEqual(Task.objects.count(), 5)
+
+    def test_comments_for_existing_tasks(self):
+        alice = User.objects.create_user(username="alice")
+        task = Task.objects.create(title="Task", creator=alice)
+        path = self.write_file(
+            "comments.csv",
+            f"task,author,text\n{task.id},alice,Hello\n999,alice,Lost\n",
+        )
+        out, err = self.run_import(path, kind="comments")
+        self.assertIn("Task does not exist.", err)
+        self.assertEqual(list(task.comments.values_list("text", flat=True)), ["Hello"])
+        task.refresh_from_db()
+        self.assertEqual(task.comments_count, 1)
@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks import metrics
+from tasks.models import Task
+from tasks.tests.test_async_views import DUMMY_CACHES
+
+User = get_user_model()
+
+
+def histogram(name, view):
+    # (counts, sum) of the histogram of ``view``.
+    _, counts, total = metrics.get_histograms()[(name, (("view", view),))]
+    return counts, total
+
+
+@override_settings(CACHES=DUMMY_CACHES)
+class MetricsMiddlewareTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.task = Task.objects.create(title="Task", creator=cls.user)
+
+    def setUp(self):
+        metrics.reset()
+        self.client.force_authenticate(user=self.user)
+
+    def test_views_are_labelled_by_action(self):
+        self.client.get("/api/tasks/")
+        self.client.get(f"/api/tasks/{self.task.id}/")
+        self.client.post(f"/api/tasks/{self.task.id}/complete/")
+        self.client.post(
+            "/api/auth/register/",
+            {"username": "new", "password": "pass12345", "password2": "pass12345"},
+        )
+        counters = metrics.get_counters()
+        for view, status_code in [
+            ("TaskViewSet.list", "200"),
+            ("TaskViewSet.retrieve", "200"),
+            ("TaskViewSet.complete", "200"),
+        ]:
+            key = ("tasks_http_requests", (("status", status_code), ("view", view)))
+            self.assertEqual(counters[key], 1)
+        self.assertIn(
+            ("tasks_http_request_duration_seconds", (("view", "RegisterView"),)),
+            metrics.get_histograms(),
+        )
+
+    def test_queries_and_size_are_recorded(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/tasks/")
+        counts, total = histogram("tasks_http_request_queries", "TaskViewSet.list")
+        self.assertEqual(total, len(queries))
+        self.assertEqual(sum(counts), 1)
+        _, size = histogram("tasks_http_response_size_bytes", "TaskViewSet.list")
+        self.assertEqual(size, len(response.content))
+        _, render = histogram(
+            "tasks_http_response_render_duration_seconds", "TaskViewSet.list"
+        )
+        self.assertGreater(render, 0)
+
+    def test_unmatched_requests(self):
+        self.client.get("/api/nothing/")
+        key = ("tasks_http_requests", (("status", "404"), ("view", "unmatched")))
+        self.assertEqual(metrics.get_counters()[key], 1)
+
+    @override_settings(TASKS_QUERY_BUDGET=1)
+    def test_query_budget(self):
+        # A stale ETag: the versions of the page, then the page itself.
+        with self.assertLogs("tasks.instrumentation", "WARNING") as logs:
+            self.client.get("/api/tasks/", HTTP_IF_NONE_MATCH='"stale"')
+        self.assertIn("TaskViewSet.list", logs.output[0])
+        key = ("tasks_query_budget_exceeded", (("view", "TaskViewSet.list"),))
+        self.assertEqual(metrics.get_counters()[key], 1)
+
+    def test_metrics_endpoint(self):
+        self.client.get("/api/tasks/")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("# TYPE tasks_http_requests_total counter", body)
+        self.assertIn(
+            'tasks_http_requests_total{status="200",view="TaskViewSet.list"} 1', body
+        )
+        self.assertIn("# TYPE tasks_http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'tasks_http_request_duration_seconds_bucket{view="TaskViewSet.list",'
+            'le="+Inf"} 1',
+            body,
+        )
+        self.assertIn(
+            'tasks_http_request_duration_seconds_count{view="TaskViewSet.list"} 1',
+            body,
+        )
+
+    @override_settings(TASKS_METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class PrometheusFormatTest(TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in [0, 1, 1, 7, 500]:
+            metrics.observe("queries", value, metrics.COUNT_BUCKETS, view='a"b')
+        lines = metrics.render_prometheus().splitlines()
+        self.assertIn('queries_bucket{view="a\\"b",le="0"} 1', lines)
+        self.assertIn('queries_bucket{view="a\\"b",le="1"} 3', lines)
+        self.assertIn('queries_bucket{view="a\\"b",le="5"} 3', lines)
+        self.assertIn('queries_bucket{view="a\\"b",le="10"} 4', lines)
+        self.assertIn('queries_bucket{view="a\\"b",le="100"} 4', lines)
+        self.assertIn('queries_bucket{view="a\\"b",le="+Inf"} 5', lines)
+        self.assertIn('queries_sum{view="a\\"b"} 509', lines)
+        self.assertIn('queries_count{view="a\\"b"} 5', lines)
+
+
+@override_settings(ROOT_URLCONF="tasks.tests.test_async_views", CACHES=DUMMY_CACHES)
+class AsyncMetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        Task.objects.create(title="Task", creator=cls.user)
+
+    def setUp(self):
+        metrics.reset()
+        token = AccessToken.for_user(self.user)
+        self.auth = {"Authorization": f"Bearer {token}"}
+
+    async def test_async_list(self):
+        response = await self.async_client.get("/api/tasks/", headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        counts, queries = histogram("tasks_http_request_queries", "TaskViewSet.list")
+        self.assertEqual(sum(counts), 1)
+        self.assertGreater(queries, 0)
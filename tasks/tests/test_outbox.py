@@ -0,0 +1,240 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks import outbox
+from tasks.models import Comment, OutboxEvent, Task
+from tasks.tests.test_async_views import DUMMY_CACHES
+
+User = get_user_model()
+
+
+class WebhookReceiver:
+    # Local HTTP stand-in for a webhook consumer. Records the JSON bodies it
+    # receives and answers each with ``status`` after ``delay`` seconds.
+    def __init__(self, status=200, delay=0):
+        self.status = status
+        self.delay = delay
+        self.events = []
+
+    def __enter__(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(receiver.delay)
+                receiver.events.append(
+                    {**json.loads(body), "event_id": self.headers["X-Event-Id"]}
+                )
+                self.send_response(receiver.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run_worker(**options):
+    stdout = StringIO()
+    call_command("run_worker", once=True, stdout=stdout, **options)
+    return stdout.getvalue()
+
+
+@override_settings(CACHES=DUMMY_CACHES)
+class OutboxWriteTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.other = User.objects.create_user(username="other", password="pass123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(title="Task", creator=self.user)
+
+    @override_settings(TASKS_WEBHOOK_URLS=["http://a.invalid/", "http://b.invalid/"])
+    def test_transitions_and_comments_enqueue_events(self):
+        self.client.post(f"/api/tasks/{self.task.id}/complete/")
+        self.client.post(
+            f"/api/tasks/{self.task.id}/assign/", {"assignee_id": self.other.id}
+        )
+        response = self.client.post(
+            "/api/comments/", {"task": self.task.id, "text": "Hi"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        events = list(OutboxEvent.objects.values_list("topic", "target", "payload"))
+        self.assertEqual(len(events), 6)
+        self.assertIn(
+            (
+                OutboxEvent.TASK_COMPLETED,
+                "http://a.invalid/",
+                {"task_id": self.task.id},
+            ),
+            events,
+        )
+        self.assertIn(
+            (
+                OutboxEvent.TASK_ASSIGNED,
+                "http://b.invalid/",
+                {"task_id": self.task.id, "assignee_id": self.other.id},
+            ),
+            events,
+        )
+        self.assertIn(
+            (
+                OutboxEvent.COMMENT_CREATED,
+                "http://a.invalid/",
+                {
+                    "comment_id": response.data["id"],
+                    "task_id": self.task.id,
+                    "author_id": self.user.id,
+                },
+            ),
+            events,
+        )
+
+    @override_settings(TASKS_WEBHOOK_URLS=["http://a.invalid/"])
+    def test_rolled_back_change_leaves_no_event(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Comment.objects.create(task=self.task, author=self.user, text="Hi")
+                raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    @override_settings(TASKS_WEBHOOK_URLS=["http://a.invalid/"])
+    def test_failed_transition_leaves_no_event(self):
+        self.client.force_authenticate(user=self.other)
+        response = self.client.post(f"/api/tasks/{self.task.id}/complete/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_no_targets_no_events(self):
+        self.client.post(f"/api/tasks/{self.task.id}/complete/")
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+@override_settings(TASKS_OUTBOX_TIMEOUT=2, TASKS_OUTBOX_BACKOFF=60)
+class OutboxWorkerTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+
+    def enqueue(self, receiver, count=1):
+        with override_settings(TASKS_WEBHOOK_URLS=[receiver.url]):
+            outbox.enqueue(
+                OutboxEvent.TASK_COMPLETED, [{"task_id": n} for n in range(count)]
+            )
+
+    def test_delivers_in_batches(self):
+        with WebhookReceiver() as receiver:
+            self.enqueue(receiver, 5)
+            output = run_worker(batch_size=2, concurrency=2)
+        self.assertEqual(len(receiver.events), 5)
+        self.assertEqual(output.count("Delivered"), 3)
+        self.assertEqual(
+            sorted(event["payload"]["task_id"] for event in receiver.events),
+            list(range(5)),
+        )
+        self.assertEqual(receiver.events[0]["topic"], OutboxEvent.TASK_COMPLETED)
+        self.assertEqual(receiver.events[0]["event_id"], str(receiver.events[0]["id"]))
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_slow_consumer_does_not_delay_the_request(self):
+        task = Task.objects.create(title="Task", creator=self.user)
+        self.client.force_authenticate(user=self.user)
+        with WebhookReceiver(delay=1) as receiver:
+            with override_settings(
+                TASKS_WEBHOOK_URLS=[receiver.url], CACHES=DUMMY_CACHES
+            ):
+                started = time.monotonic()
+                response = self.client.post(f"/api/tasks/{task.id}/complete/")
+                self.assertLess(time.monotonic() - started, 1)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(receiver.events, [])
+            run_worker()
+        self.assertEqual(len(receiver.events), 1)
+
+    def test_concurrent_deliveries(self):
+        with WebhookReceiver(delay=0.3) as receiver:
+            self.enqueue(receiver, 4)
+            started = time.monotonic()
+            run_worker(concurrency=4)
+            self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(len(receiver.events), 4)
+
+    def test_failure_is_retried_with_backoff(self):
+        with WebhookReceiver(status=503) as receiver:
+            self.enqueue(receiver)
+            output = run_worker()
+        self.assertIn("retrying 1", output)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, "HTTP 503")
+        self.assertEqual(event.claim, "")
+        self.assertIsNone(event.failed_at)
+        # Not due again for 30 to 60 seconds.
+        delay = (event.available_at - timezone.now()).total_seconds()
+        self.assertTrue(25 < delay <= 60, delay)
+
+        OutboxEvent.objects.update(available_at=timezone.now())
+        with WebhookReceiver() as receiver:
+            OutboxEvent.objects.update(target=receiver.url)
+            run_worker()
+        self.assertEqual(len(receiver.events), 1)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    @override_settings(TASKS_OUTBOX_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        with WebhookReceiver(status=500) as receiver:
+            self.enqueue(receiver)
+            run_worker()
+            OutboxEvent.objects.update(available_at=timezone.now())
+            output = run_worker()
+        self.assertIn("failed 1", output)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 2)
+        self.assertIsNotNone(event.failed_at)
+        # No longer due, until retried by hand.
+        self.assertEqual(run_worker(), "")
+        with WebhookReceiver() as receiver:
+            OutboxEvent.objects.update(target=receiver.url)
+            output = run_worker(retry_failed=True)
+        self.assertIn("Retrying 1 failed events.", output)
+        self.assertEqual(len(receiver.events), 1)
+
+    def test_unreachable_target(self):
+        with WebhookReceiver() as receiver:
+            pass
+        self.enqueue(receiver)
+        run_worker()
+        event = OutboxEvent.objects.get()
+        self.assertIn("refused", event.last_error)
+
+    def test_claimed_events_are_not_claimed_again(self):
+        with WebhookReceiver() as receiver:
+            self.enqueue(receiver, 3)
+        self.assertEqual(len(outbox.claim(2)), 2)
+        self.assertEqual(len(outbox.claim(10)), 1)
+        self.assertEqual(outbox.claim(10), [])
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(outbox.process_batch(executor, 10), {})
@@ -0,0 +1,152 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks import cache
+from tasks.models import Comment, Task
+
+User = get_user_model()
+
+
+class TaskCursorPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        now = timezone.now()
+        tasks = [Task(title=f"Task {i}", creator=cls.user) for i in range(7)]
+        Task.objects.bulk_create(tasks)
+        # Several rows share a timestamp to exercise the id tie-breaker.
+        for i, task in enumerate(Task.objects.order_by("id")):
+            Task.objects.filter(pk=task.pk).update(
+                created_at=now - timedelta(minutes=i // 3)
+            )
+        cls.expected = list(
+            Task.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_first_page(self):
+        response = self.client.get("/api/tasks/?page_size=3")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], self.expected[:3]
+        )
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_walk_forward_visits_every_task_once(self):
+        self.assertEqual(self.walk("/api/tasks/?page_size=2"), self.expected)
+
+    def test_previous_link_returns_preceding_page(self):
+        first = self.client.get("/api/tasks/?page_size=3")
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+        self.assertEqual(back.data["next"], first.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/tasks/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_invalid_position(self):
+        positions = [
+            [[1], 1],
+            [{"a": 1}, 1],
+            [None, None],
+            ["2024-01-01T00:00:00", "x"],
+            ["not a date", 1],
+        ]
+        for position in positions:
+            cursor = urlsafe_b64encode(json.dumps({"p": position}).encode()).decode()
+            response = self.client.get(f"/api/tasks/?cursor={cursor}")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get("/api/tasks/?page_size=100000")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), len(self.expected))
+
+
+class CommentCursorPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.task = Task.objects.create(title="Task", creator=cls.user)
+        Comment.objects.bulk_create(
+            Comment(task=cls.task, author=cls.user, text=f"Comment {i}")
+            for i in range(5)
+        )
+
+    def test_comments_are_paged_oldest_first(self):
+        self.client.force_authenticate(user=self.user)
+        url = f"/api/comments/?task={self.task.id}&page_size=2"
+        ids = []
+        while url:
+            response = self.client.get(url)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        expected = list(
+            Comment.objects.order_by("created_at", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+
+@override_settings(TASKS_DETAIL_COMMENTS_LIMIT=3)
+class TaskDetailCommentsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.task = Task.objects.create(title="Task", creator=cls.user)
+        for i in range(7):
+            Comment.objects.create(task=cls.task, author=cls.user, text=f"C{i}")
+        cls.expected = list(
+            Comment.objects.order_by("created_at", "id").values_list("id", flat=True)
+        )
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.client.force_authenticate(user=self.user)
+
+    def test_detail_embeds_latest_comments(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/tasks/{self.task.id}/")
+        self.assertEqual(response.data["comments_count"], 7)
+        self.assertEqual(
+            [item["id"] for item in response.data["comments"]], self.expected[-3:]
+        )
+
+    def test_comments_next_walks_back_to_the_oldest(self):
+        response = self.client.get(f"/api/tasks/{self.task.id}/")
+        ids = [item["id"] for item in response.data["comments"]]
+        url = response.data["comments_next"]
+        while url:
+            page = self.client.get(url)
+            self.assertEqual(page.status_code, status.HTTP_200_OK)
+            ids = [item["id"] for item in page.data["results"]] + ids
+            url = page.data["previous"]
+        self.assertEqual(ids, self.expected)
+
+    def test_no_link_when_everything_is_embedded(self):
+        task = Task.objects.create(title="Short", creator=self.user)
+        Comment.objects.create(task=task, author=self.user, text="Only")
+        response = self.client.get(f"/api/tasks/{task.id}/")
+        self.assertEqual(len(response.data["comments"]), 1)
+        self.assertIsNone(response.data["comments_next"])
@@ -1,6 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.test import RequestFactory, TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
 
+from tasks import cache
 from tasks.models import Comment, Task
 from tasks.permissions import (
     IsAuthorOrAdmin,
@@ -40,6 +44,13 @@ class IsCreatorOrAdminTest(TestCase):
         request.user = self.admin
         self.assertTrue(self.permission.has_object_permission(request, None, self.task))
 
+    def test_related_users_are_not_loaded(self):
+        task = Task.objects.get(pk=self.task.pk)
+        request = self.factory.get("/")
+        request.user = self.creator
+        with self.assertNumQueries(0):
+            self.assertTrue(self.permission.has_object_permission(request, None, task))
+
 
 class IsCreatorOrAssigneeOrAdminTest(TestCase):
     @classmethod
@@ -78,6 +89,26 @@ class IsCreatorOrAssigneeOrAdminTest(TestCase):
         request.user = self.admin
         self.assertTrue(self.permission.has_object_permission(request, None, self.task))
 
+    def test_filter_matches_object_check(self):
+        Task.objects.create(title="Unassigned", creator=self.creator)
+        Task.objects.create(title="Other", creator=self.other_user)
+        for user in [self.creator, self.assignee, self.other_user, self.admin]:
+            request = self.factory.get("/")
+            request.user = user
+            expected = {
+                task.pk
+                for task in Task.objects.all()
+                if self.permission.has_object_permission(request, None, task)
+            }
+            permitted = Task.objects.filter(self.permission.get_filter(request))
+            self.assertEqual(set(permitted.values_list("pk", flat=True)), expected)
+
+    def test_anonymous_user_matches_nothing(self):
+        Task.objects.create(title="Unassigned", creator=self.creator)
+        request = self.factory.get("/")
+        request.user = AnonymousUser()
+        self.assertFalse(Task.objects.filter(self.permission.get_filter(request)))
+
 
 class IsAuthorOrAdminTest(TestCase):
     @classmethod
@@ -114,3 +145,57 @@ class IsAuthorOrAdminTest(TestCase):
         self.assertTrue(
             self.permission.has_object_permission(request, None, self.comment)
         )
+
+
+class PermissionFilterTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+        cls.other = User.objects.create_user(username="other", password="pass123")
+        cls.own = Task.objects.create(title="Own", creator=cls.user)
+        cls.assigned = Task.objects.create(
+            title="Assigned", creator=cls.other, assignee=cls.user
+        )
+        cls.foreign = Task.objects.create(title="Foreign", creator=cls.other)
+        cls.comment = Comment.objects.create(task=cls.own, author=cls.user, text="A")
+        Comment.objects.create(task=cls.own, author=cls.other, text="B")
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.client.force_authenticate(user=self.user)
+
+    def ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item["id"] for item in response.data["results"]}
+
+    def test_tasks_user_can_change(self):
+        self.assertEqual(self.ids("/api/tasks/?can=update"), {self.own.id})
+        self.assertEqual(
+            self.ids("/api/tasks/?can=complete"), {self.own.id, self.assigned.id}
+        )
+        self.assertEqual(len(self.ids("/api/tasks/")), 3)
+
+    def test_combines_with_filters(self):
+        self.assertEqual(
+            self.ids(f"/api/tasks/?can=complete&creator={self.other.id}"),
+            {self.assigned.id},
+        )
+
+    def test_comments_user_can_delete(self):
+        self.assertEqual(self.ids("/api/comments/?can=destroy"), {self.comment.id})
+
+    def test_unknown_action(self):
+        response = self.client.get("/api/tasks/?can=fly")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("can", response.data)
+
+    def test_cached_list_is_per_user(self):
+        first = self.client.get("/api/tasks/?can=update")
+        self.client.force_authenticate(user=self.other)
+        second = self.client.get("/api/tasks/?can=update")
+        self.assertEqual(
+            {item["id"] for item in second.data["results"]},
+            {self.assigned.id, self.foreign.id},
+        )
+        self.assertNotEqual(first["ETag"], second["ETag"])
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.models import Comment, Task
+
+User = get_user_model()
+
+
+class QueryCountTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f"user{i}", password="pass123")
+            for i in range(4)
+        ]
+        cls.user = cls.users[0]
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def create_tasks(self, count):
+        tasks = []
+        for i in range(count):
+            task = Task.objects.create(
+                title=f"Task {i}",
+                creator=self.users[i % 4],
+                assignee=self.users[(i + 1) % 4],
+            )
+            for author in self.users:
+                Comment.objects.create(task=task, author=author, text="Comment")
+            tasks.append(task)
+        return tasks
+
+    def test_list_query_count_is_constant(self):
+        self.create_tasks(3)
+        # The page alone: the list ETag is built from its rows.
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+
+        self.create_tasks(12)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tasks/")
+        self.assertEqual(len(response.data["results"]), 15)
+
+    def test_retrieve_query_count_is_constant(self):
+        task = self.create_tasks(1)[0]
+        for _ in range(10):
+            Comment.objects.create(task=task, author=self.users[2], text="More")
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/tasks/{task.id}/")
+        self.assertEqual(len(response.data["comments"]), 14)
+
+    def test_complete_query_count(self):
+        task = self.create_tasks(1)[0]
+        # The read, then in a savepoint the UPDATE, the counters of the creator
+        # and of the assignee and the change log entry. Then the task with its
+        # comments.
+        with self.assertNumQueries(9):
+            response = self.client.post(f"/api/tasks/{task.id}/complete/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_comment_list_query_count_is_constant(self):
+        task = self.create_tasks(1)[0]
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/comments/?task={task.id}")
+        self.assertEqual(len(response.data["results"]), 4)
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.models import Comment, Task
+
+User = get_user_model()
+
+
+class TaskSearchTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="user", password="pass123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def search(self, query):
+        response = self.client.get("/api/tasks/search/", {"q": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data["results"]]
+
+    def test_search_matches_title_description_and_comments(self):
+        by_title = Task.objects.create(title="Deploy server", creator=self.user)
+        by_description = Task.objects.create(
+            title="Other", description="restart the server", creator=self.user
+        )
+        by_comment = Task.objects.create(title="Third", creator=self.user)
+        Comment.objects.create(task=by_comment, author=self.user, text="Server down")
+        Task.objects.create(title="Unrelated", creator=self.user)
+
+        ids = self.search("server")
+        self.assertEqual(set(ids), {by_title.id, by_description.id, by_comment.id})
+        # Title matches rank first.
+        self.assertEqual(ids[0], by_title.id)
+
+    def test_index_follows_updates_and_deletes(self):
+        task = Task.objects.create(title="Alpha", creator=self.user)
+        comment = Comment.objects.create(task=task, author=self.user, text="Gamma")
+        task.title = "Beta"
+        task.save()
+        self.assertEqual(self.search("alpha"), [])
+        self.assertEqual(self.search("beta"), [task.id])
+
+        comment.delete()
+        self.assertEqual(self.search("gamma"), [])
+        task.delete()
+        self.assertEqual(self.search("beta"), [])
+
+    def test_all_terms_must_match(self):
+        task = Task.objects.create(title="Fix login page", creator=self.user)
+        Task.objects.create(title="Fix signup page", creator=self.user)
+        self.assertEqual(self.search("login fix"), [task.id])
+
+    def test_query_syntax_is_escaped(self):
+        task = Task.objects.create(title="Quote test", creator=self.user)
+        self.assertEqual(self.search('"quote (test*'), [task.id])
+
+    def test_bulk_created_tasks_are_indexed(self):
+        self.client.post(
+            "/api/tasks/bulk_create/", [{"title": "Imported report"}], format="json"
+        )
+        self.assertEqual(len(self.search("report")), 1)
+
+    def test_results_are_paginated(self):
+        for i in range(5):
+            Task.objects.create(title=f"Report {i}", creator=self.user)
+        response = self.client.get("/api/tasks/search/", {"q": "report", "limit": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["previous"])
+        ids = [item["id"] for item in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            ids += [item["id"] for item in response.data["results"]]
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_missing_query(self):
+        response = self.client.get("/api/tasks/search/")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
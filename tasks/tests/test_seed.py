@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from tasks.models import Comment, Task
+from tasks.search import search_tasks
+
+User = get_user_model()
+
+
+class SeedDataTest(TestCase):
+    def seed(self, **options):
+        options = {"users": 5, "tasks": 30, "comments": 80, "batch_size": 7, **options}
+        call_command("seed_data", stdout=StringIO(), **options)
+
+    def test_volumes_and_derived_state(self):
+        self.seed()
+        self.assertEqual(User.objects.filter(username__startswith="bench").count(), 5)
+        self.assertEqual(Task.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 80)
+        self.assertTrue(self.client.login(username="bench1", password="bench-password"))
+        # The bulk signals kept the counters and the search index in step.
+        for task in Task.objects.annotate(actual=Count("comments")):
+            self.assertEqual(task.comments_count, task.actual)
+        task = Task.objects.first()
+        self.assertIn(task.pk, search_tasks(task.title, limit=30))
+
+    def test_same_seed_same_data(self):
+        self.seed(seed=3)
+        first = list(Task.objects.order_by("id").values_list("title", "is_completed"))
+        Task.objects.all().delete()
+        self.seed(seed=3)
+        second = list(Task.objects.order_by("id").values_list("title", "is_completed"))
+        self.assertEqual(first, second)
+        # Users are reused.
+        self.assertEqual(User.objects.count(), 5)
@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.models import Task
+from tasks.tests.test_async_views import DUMMY_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=DUMMY_CACHES)
+class TransitionTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(username="creator", password="pass123")
+        cls.other = User.objects.create_user(username="other", password="pass123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.creator)
+        self.task = Task.objects.create(title="Task", creator=self.creator)
+        self.url = f"/api/tasks/{self.task.id}/"
+
+    def test_assign_checks_assignee_in_the_update(self):
+        # The read, then in a savepoint the UPDATE, the assignee's counters and
+        # the change log entry. Then the task with its users and comments.
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                f"{self.url}assign/", {"assignee_id": self.other.id}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["assignee"]["id"], self.other.id)
+        self.assertIn("ETag", response)
+
+    def test_assign_unknown_user_changes_nothing(self):
+        response = self.client.post(f"{self.url}assign/", {"assignee_id": 9999})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"assignee_id": ["User does not exist"]})
+        self.task.refresh_from_db()
+        self.assertIsNone(self.task.assignee_id)
+
+    def test_invalid_assignee_id(self):
+        response = self.client.post(f"{self.url}assign/", {"assignee_id": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_access_is_checked_before_the_body(self):
+        response = self.client.post("/api/tasks/9999/assign/", {"assignee_id": "x"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.other)
+        response = self.client.post(f"{self.url}assign/", {"assignee_id": "x"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_forbidden_transition_changes_nothing(self):
+        self.client.force_authenticate(user=self.other)
+        response = self.client.post(f"{self.url}complete/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.is_completed)
+
+    def test_unassigned_task_is_not_open_to_anonymous_users(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(f"{self.url}complete/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.is_completed)
+
+    def test_missing_task(self):
+        for url in ["/api/tasks/9999/complete/", "/api/tasks/abc/complete/"]:
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_if_match_current_version(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.post(f"{self.url}complete/", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["is_completed"])
+        # The new ETag can be used for the next write.
+        response = self.client.post(
+            f"{self.url}assign/",
+            {"assignee_id": self.other.id},
+            HTTP_IF_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_match_stale_version(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.post(f"{self.url}assign/", {"assignee_id": self.other.id})
+        response = self.client.post(f"{self.url}complete/", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.is_completed)
+
+    def test_if_match_other_forms(self):
+        etag = self.client.get(self.url)["ETag"]
+        for header in [f"W/{etag}", '"garbage"', f'"{self.task.id + 1}-1-abc"']:
+            response = self.client.post(f"{self.url}complete/", HTTP_IF_MATCH=header)
+            self.assertEqual(
+                response.status_code, status.HTTP_412_PRECONDITION_FAILED, header
+            )
+        response = self.client.post(
+            f"{self.url}complete/", HTTP_IF_MATCH=f'"stale", {etag}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(f"{self.url}complete/", HTTP_IF_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_match_is_checked_after_permission(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_authenticate(user=self.other)
+        response = self.client.post(f"{self.url}complete/", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,9 +1,62 @@
+from django.conf import settings
+from django.urls import path, re_path
 from rest_framework.routers import DefaultRouter
 
-from tasks.views import CommentViewSet, TaskViewSet
+from tasks.async_views import async_reads
+from tasks.views import CacheStatsView, CommentViewSet, TaskViewSet
 
 router = DefaultRouter()
 router.register(r"tasks", TaskViewSet, basename="task")
 router.register(r"comments", CommentViewSet, basename="comment")
 
-urlpatterns = router.urls
+# Under ASGI these take over the router's routes of the same name, serving
+# GET from tasks.async_views and every other method from the viewsets.
+async_urlpatterns = [
+    re_path(
+        r"^tasks/$",
+        async_reads(TaskViewSet, {"get": "list", "post": "create"}, "list"),
+        name="task-list",
+    ),
+    re_path(
+        r"^tasks/changes/$",
+        async_reads(TaskViewSet, {"get": "changes"}, "changes"),
+        name="task-changes",
+    ),
+    re_path(
+        r"^tasks/export/$",
+        async_reads(TaskViewSet, {"get": "export"}, "export"),
+        name="task-export",
+    ),
+    # Numeric ids only: tasks/search/, tasks/summary/ and the other list
+    # actions are left to the router.
+    re_path(
+        r"^tasks/(?P<pk>[0-9]+)/$",
+        async_reads(
+            TaskViewSet,
+            {
+                "get": "retrieve",
+                "put": "update",
+                "patch": "partial_update",
+                "delete": "destroy",
+            },
+            "retrieve",
+        ),
+        name="task-detail",
+    ),
+    re_path(
+        r"^comments/$",
+        async_reads(CommentViewSet, {"get": "list", "post": "create"}, "list"),
+        name="comment-list",
+    ),
+    re_path(
+        r"^comments/export/$",
+        async_reads(CommentViewSet, {"get": "export"}, "export"),
+        name="comment-export",
+    ),
+]
+
+urlpatterns = [
+    path("cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
+    *(async_urlpatterns if settings.TASKS_ASYNC_READS else []),
+    *router.urls,
+]
@@ -1,74 +1,429 @@
+import time
+
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Exists, Q
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+from tasks import authentication, cache, changes, counters, deletion, export
+from tasks.cache import CachedResponseMixin
+from tasks.conditional import ConditionalGetMixin, timestamp
+from tasks.export import ExportMixin
+from tasks.fastpath import FastListMixin
+from tasks.fieldsets import SparseFieldsetMixin
+from tasks.filters import PermissionFilterBackend, TaskFilterBackend
 from tasks.models import Comment, Task
+from tasks.pagination import (
+    CommentCursorPagination,
+    SearchPagination,
+    TaskCursorPagination,
+)
 from tasks.permissions import (
     IsAuthorOrAdmin,
     IsCreatorOrAdmin,
     IsCreatorOrAssigneeOrAdmin,
+    ObjectPermissionMixin,
 )
+from tasks.query_plan import QueryPlanMixin
+from tasks.renderers import CSVRenderer, EventStreamRenderer, NDJSONRenderer
+from tasks.search import search_tasks
 from tasks.serializers import (
     AssignSerializer,
+    BulkAssignSerializer,
     CommentSerializer,
     TaskCreateUpdateSerializer,
     TaskDetailSerializer,
+    TaskIdSerializer,
     TaskListSerializer,
+    TaskSummarySerializer,
     UserRegistrationSerializer,
 )
+from tasks.signals import tasks_bulk_created, tasks_bulk_updated
 
 User = get_user_model()
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    SparseFieldsetMixin,
+    FastListMixin,
+    QueryPlanMixin,
+    ObjectPermissionMixin,
+    ExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Task.objects.all()
+    pagination_class = TaskCursorPagination
+    read_from_replica = True
+    filter_backends = [TaskFilterBackend, PermissionFilterBackend, OrderingFilter]
+    ordering_fields = ["created_at", "updated_at"]
+    bulk_actions = ["bulk_create", "bulk_update", "bulk_complete", "bulk_assign"]
+    bulk_max_size = 1000
+    # The bulk actions check the rule of the matching single-task action.
+    object_permissions = {
+        "update": IsCreatorOrAdmin,
+        "partial_update": IsCreatorOrAdmin,
+        "destroy": IsCreatorOrAdmin,
+        "complete": IsCreatorOrAssigneeOrAdmin,
+        "assign": IsCreatorOrAdmin,
+    }
+    export_columns = export.TASK_COLUMNS
+    export_filename = "tasks"
 
     def get_serializer_class(self):
-        if self.action == "list":
+        if (
+            self.action in ["list", "search", "export"]
+            or self.action in self.bulk_actions
+        ):
             return TaskListSerializer
         elif self.action in ["create", "update", "partial_update"]:
             return TaskCreateUpdateSerializer
+        elif self.action == "summary":
+            return TaskSummarySerializer
         return TaskDetailSerializer
 
-    def get_permissions(self):
-        if self.action in ["update", "partial_update", "destroy"]:
-            return [IsCreatorOrAdmin()]
-        return super().get_permissions()
+    def perform_destroy(self, instance):
+        # Hidden at once; the reap_deleted command purges it and its comments.
+        deletion.soft_delete_tasks(Task.objects.filter(pk=instance.pk))
 
-    @action(
-        detail=True, methods=["post"], permission_classes=[IsCreatorOrAssigneeOrAdmin]
-    )
+    def transition(self, request, values, *conditions):
+        # Writes ``values`` with a conditional UPDATE whose WHERE clause also
+        # holds the permission rule, the If-Match versions and ``conditions``.
+        # The per-user counters need the fields the UPDATE overwrites, so the
+        # row is read first and the UPDATE also requires those values: when
+        # another write changed them in between, nothing matches and the task
+        # is read again. No lock is held across the read, so this is the same
+        # on every database and SQLite profile. When no row matches at all,
+        # the task is read again to tell why.
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        if_match = self.get_if_match_filter(request, lookup)
+        now = timezone.now()
+        try:
+            queryset = Task.objects.filter(
+                self.get_object_permission().get_filter(request),
+                *conditions,
+                if_match if if_match is not None else Q(),
+                pk=lookup,
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            return self.explain_failed_transition(request, if_match)
+        while True:
+            task = queryset.only(
+                "creator", "assignee", "is_completed", "deleted_at"
+            ).first()
+            if task is None:
+                return self.explain_failed_transition(request, if_match)
+            # The counters and outbox events written by the signal commit
+            # with the UPDATE.
+            with transaction.atomic():
+                updated = queryset.filter(**task.loaded_values).update(
+                    **values, updated_at=now
+                )
+                if updated:
+                    for field, value in values.items():
+                        setattr(task, field, value)
+                    task.updated_at = now
+                    tasks_bulk_updated.send(
+                        sender=Task, tasks=[task], fields=[*values, "updated_at"]
+                    )
+            if updated:
+                break
+
+        task = get_object_or_404(self.get_queryset(), pk=lookup)
+        return self.set_validators(
+            Response(self.get_serializer(task).data),
+            self.get_object_etag(task.pk, now),
+            timestamp(now),
+        )
+
+    def explain_failed_transition(self, request, if_match):
+        # 404/401/403 from get_object(), then 412 for a stale If-Match. A
+        # failed condition of the action itself is reported by the caller.
+        self.get_object()
+        if if_match is not None:
+            return Response(status=status.HTTP_412_PRECONDITION_FAILED)
+        return None
+
+    @action(detail=True, methods=["post"])
     def complete(self, request, pk=None):
-        task = self.get_object()
-        task.is_completed = True
-        task.save()
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        response = self.transition(request, {"is_completed": True})
+        if response is None:
+            # The task was changed concurrently so that the user lost access.
+            raise PermissionDenied()
+        return response
 
-    @action(detail=True, methods=["post"], permission_classes=[IsCreatorOrAdmin])
+    @action(detail=True, methods=["post"])
     def assign(self, request, pk=None):
-        task = self.get_object()
-        serializer = AssignSerializer(data=request.data)
-        if serializer.is_valid():
-            task.assignee = User.objects.get(
-                id=serializer.validated_data["assignee_id"]
+        serializer = AssignSerializer(
+            data=request.data, context={"check_exists": False}
+        )
+        if not serializer.is_valid():
+            # Access to the task is reported before a bad body.
+            self.get_object()
+            raise ValidationError(serializer.errors)
+        assignee_id = serializer.validated_data["assignee_id"]
+        response = self.transition(
+            request,
+            {"assignee_id": assignee_id},
+            Exists(User.objects.filter(pk=assignee_id)),
+        )
+        if response is None:
+            # Reported as before: the full validation fails on the assignee.
+            AssignSerializer(data=request.data).is_valid(raise_exception=True)
+            raise PermissionDenied()
+        return response
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        # One primary key lookup of the user's counters, whatever the number
+        # of tasks behind them.
+        counts = counters.get_counts(request.user.pk)
+        return Response(self.get_serializer(counters.summarize(counts)).data)
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": ["This query parameter is required."]})
+        paginator = SearchPagination()
+        task_ids = paginator.paginate_search(
+            lambda limit, offset: search_tasks(query, limit, offset), request
+        )
+        tasks = self.get_queryset().in_bulk(task_ids)
+        page = [tasks[pk] for pk in task_ids if pk in tasks]
+        return paginator.get_paginated_response(
+            self.get_serializer(page, many=True).data
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer],
+    )
+    def changes(self, request):
+        # Long-poll change feed. Without ``since`` it only returns the current
+        # cursor. Streaming SSE is served by tasks.async_views under ASGI;
+        # here text/event-stream gets one batch per request.
+        after_id, limit, timeout = changes.get_feed_query(request)
+        if after_id is None:
+            return Response({"cursor": changes.current_cursor(), "results": []})
+        deadline = time.monotonic() + timeout
+        while True:
+            page = list(changes.get_changes(after_id, limit))
+            if page or time.monotonic() >= deadline:
+                break
+            time.sleep(changes.get_setting("POLL_INTERVAL", 1.0))
+        return Response(changes.get_feed(page, after_id))
+
+    @action(
+        detail=False, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer]
+    )
+    def export(self, request):
+        # ?format=ndjson (default) or ?format=csv, with the list filters.
+        queryset = self.filter_queryset(self.get_queryset())
+        return export.streaming_response(
+            request.accepted_renderer,
+            self.export_columns,
+            queryset,
+            self.export_filename,
+        )
+
+    def get_bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError("Expected a non-empty list of items.")
+        if len(items) > self.bulk_max_size:
+            raise ValidationError(
+                f"Ensure the batch has no more than {self.bulk_max_size} items."
             )
-            task.save()
-            return Response(TaskDetailSerializer(task).data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return items
+
+    def get_bulk_tasks(self, request, items, action):
+        # Resolves every item's "id" with a single query and checks the object
+        # permission of ``action`` for the whole set on the loaded id columns;
+        # returns per-item errors alongside.
+        ids, errors = [], []
+        for item in items:
+            serializer = TaskIdSerializer(data=item)
+            if serializer.is_valid():
+                ids.append(serializer.validated_data["id"])
+                errors.append({})
+            else:
+                ids.append(None)
+                errors.append(dict(serializer.errors))
 
+        tasks = self.get_queryset().in_bulk([pk for pk in ids if pk is not None])
+        permission = self.get_object_permission(action)
+        permitted = permission.get_permitted_ids(request, self, tasks.values())
+        seen = set()
+        for pk, item_errors in zip(ids, errors):
+            if pk is None:
+                continue
+            if pk in seen:
+                item_errors["id"] = ["Duplicate id."]
+            elif pk not in tasks:
+                item_errors["id"] = ["Not found."]
+            elif pk not in permitted:
+                item_errors["id"] = [str(PermissionDenied.default_detail)]
+            seen.add(pk)
+        return ids, tasks, errors
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["post"])
+    def bulk_create(self, request):
+        items = self.get_bulk_items(request)
+        tasks, errors = [], []
+        for item in items:
+            serializer = TaskCreateUpdateSerializer(data=item)
+            if serializer.is_valid():
+                tasks.append(Task(creator=request.user, **serializer.validated_data))
+                errors.append({})
+            else:
+                errors.append(serializer.errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            tasks_bulk_created.send(sender=Task, tasks=tasks)
+        return Response(
+            TaskListSerializer(tasks, many=True).data, status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=["post"])
+    def bulk_update(self, request):
+        items = self.get_bulk_items(request)
+        ids, tasks, errors = self.get_bulk_tasks(request, items, "update")
+        fields = {"updated_at"}
+        for pk, item, item_errors in zip(ids, items, errors):
+            if item_errors:
+                continue
+            data = {key: value for key, value in item.items() if key != "id"}
+            serializer = TaskCreateUpdateSerializer(tasks[pk], data=data, partial=True)
+            if not serializer.is_valid():
+                item_errors.update(serializer.errors)
+                continue
+            for attr, value in serializer.validated_data.items():
+                setattr(tasks[pk], attr, value)
+            fields.update(serializer.validated_data)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = [tasks[pk] for pk in ids]
+        now = timezone.now()
+        for task in updated:
+            task.updated_at = now
+        with transaction.atomic():
+            Task.objects.bulk_update(updated, sorted(fields))
+            tasks_bulk_updated.send(sender=Task, tasks=updated, fields=sorted(fields))
+        return Response(TaskListSerializer(updated, many=True).data)
+
+    @action(detail=False, methods=["post"])
+    def bulk_complete(self, request):
+        items = self.get_bulk_items(request)
+        ids, tasks, errors = self.get_bulk_tasks(request, items, "complete")
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Every row gets the same values, so one UPDATE covers the batch.
+        now = timezone.now()
+        completed = [tasks[pk] for pk in ids]
+        for task in completed:
+            task.is_completed = True
+            task.updated_at = now
+        with transaction.atomic():
+            Task.objects.filter(id__in=ids).update(is_completed=True, updated_at=now)
+            tasks_bulk_updated.send(
+                sender=Task, tasks=completed, fields=["is_completed", "updated_at"]
+            )
+        return Response(TaskListSerializer(completed, many=True).data)
+
+    @action(detail=False, methods=["post"])
+    def bulk_assign(self, request):
+        items = self.get_bulk_items(request)
+        ids, tasks, errors = self.get_bulk_tasks(request, items, "assign")
+
+        assignee_ids = set()
+        for item in items:
+            try:
+                assignee_ids.add(int(item["assignee_id"]))
+            except (KeyError, TypeError, ValueError):
+                pass
+        users = User.objects.in_bulk(assignee_ids)
+        for index, item in enumerate(items):
+            serializer = BulkAssignSerializer(data=item, context={"users": users})
+            if not serializer.is_valid():
+                errors[index] = {**serializer.errors, **errors[index]}
+            elif not errors[index]:
+                tasks[ids[index]].assignee = users[
+                    serializer.validated_data["assignee_id"]
+                ]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        assigned = [tasks[pk] for pk in ids]
+        now = timezone.now()
+        for task in assigned:
+            task.updated_at = now
+        with transaction.atomic():
+            Task.objects.bulk_update(assigned, ["assignee", "updated_at"])
+            tasks_bulk_updated.send(
+                sender=Task, tasks=assigned, fields=["assignee", "updated_at"]
+            )
+        return Response(TaskListSerializer(assigned, many=True).data)
+
+
+class CommentViewSet(
+    SparseFieldsetMixin,
+    FastListMixin,
+    QueryPlanMixin,
+    ObjectPermissionMixin,
+    ExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    pagination_class = CommentCursorPagination
+    read_from_replica = True
+    export_columns = export.COMMENT_COLUMNS
+    export_filename = "comments"
+    filter_backends = [PermissionFilterBackend]
+    object_permissions = {"destroy": IsAuthorOrAdmin}
+
+    # The comment row and the task's denormalized counters (updated by
+    # tasks.signals) are written in one transaction.
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
 
-    def get_permissions(self):
-        if self.action == "destroy":
-            return [IsAuthorOrAdmin()]
-        return super().get_permissions()
+    @action(
+        detail=False, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer]
+    )
+    def export(self, request):
+        # Accepts ?task= like the list.
+        queryset = self.filter_queryset(self.get_queryset())
+        return export.streaming_response(
+            request.accepted_renderer,
+            self.export_columns,
+            queryset,
+            self.export_filename,
+        )
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -87,3 +442,11 @@ class RegisterView(APIView):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response({**cache.get_stats(), "auth": authentication.get_stats()})